@@ -1,12 +1,48 @@
 import dash
-from dash import dcc, html, Output, Input
+from dash import dcc, html, callback, no_update, Output, Input, State
 import dash_mantine_components as dmc
 import os
 
 app = dash.Dash(__name__, use_pages=True, suppress_callback_exceptions=True)
+# The Flask app, for WSGI servers: gunicorn app:server (see gunicorn.conf.py)
+server = app.server
 
 app.title = "MIS Dashboard"
 
+from pages import structure_call_data_ELT
+from metrics import register_metrics
+
+# Prometheus metrics at /metrics (see metrics.py)
+register_metrics(app)
+
+def cube_stores():
+    # CLIENTSIDE_FILTERS: the call cube for the gross and analyst pages, kept
+    # in memory for the browser tab (sessionStorage is capped at about 5 MB).
+    # The interval re-checks the small tag store on the refresh schedule, and
+    # the cube is only sent again when the data behind it changed.
+    if not structure_call_data_ELT.CLIENTSIDE_FILTERS:
+        return []
+    interval = structure_call_data_ELT.REFRESH_INTERVAL_SECONDS
+    return [
+        dcc.Store(id="clientside-cube-store"),
+        dcc.Store(id="clientside-cube-tag"),
+        dcc.Interval(id="clientside-cube-check", interval=max(interval, 1) * 1000, disabled=interval <= 0),
+    ]
+
+if structure_call_data_ELT.CLIENTSIDE_FILTERS:
+    @callback(
+        Output("clientside-cube-store", "data"),
+        Output("clientside-cube-tag", "data"),
+        Input("clientside-cube-check", "n_intervals"),
+        State("clientside-cube-tag", "data"),
+    )
+    def load_cube(_, tag):
+        payload = structure_call_data_ELT.get_backend().clientside_payload()
+        current = payload["tag"] if payload else None
+        if tag == current:
+            return no_update, no_update
+        return payload, current
+
 dash.register_page(
     "home",
     path="/",
@@ -21,7 +57,7 @@ def layout():
         withGlobalClasses=True,
         deduplicateCssVariables=True,
         children=[
-            html.Div([
+            html.Div(cube_stores() + [
                 dmc.Container([
                     dmc.Group(
                         [
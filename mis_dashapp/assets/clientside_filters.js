@@ -0,0 +1,417 @@
+// Browser-side versions of the gross and analyst page callbacks, used when the
+// app runs with CLIENTSIDE_FILTERS=1. They filter and sum the call cube from
+// clientside-cube-store (backend_sender.clientside_payload) and return the
+// same tables the server callbacks build, so filter changes need no request.
+(function () {
+    var ALL_DATES_START = "2024-11-01";
+    var MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+                  "August", "September", "October", "November", "December"];
+    var BORDER = "1px solid #000000";
+    var CELL_STYLE = {"border": BORDER, "textAlign": "right"};
+    var TABLE_PROPS = {
+        "withTableBorder": true,
+        "withColumnBorders": true,
+        "striped": true,
+        "highlightOnHover": true,
+        "horizontalSpacing": "sm",
+        "verticalSpacing": "xs",
+        "style": {"borderCollapse": "collapse", "width": "100%", "marginTop": "20px"}
+    };
+    var PAPER_STYLE = {
+        "backgroundColor": "#ffffff",
+        "padding": "32px",
+        "borderRadius": "16px",
+        "boxShadow": "0 2px 12px rgba(0,0,0,0.08)",
+        "maxWidth": "1200px",
+        "margin": "40px auto"
+    };
+
+    function component(namespace, type, children, props) {
+        return {"namespace": namespace, "type": type, "props": Object.assign({"children": children}, props)};
+    }
+    function h(type, children, props) {
+        return component("dash_html_components", type, children, props);
+    }
+    function dmc(type, children, props) {
+        return component("dash_mantine_components", type, children, props);
+    }
+
+    function today() {
+        var now = new Date();
+        var pad = function (n) { return (n < 10 ? "0" : "") + n; };
+        return now.getFullYear() + "-" + pad(now.getMonth() + 1) + "-" + pad(now.getDate());
+    }
+    function hasRange(dateRange) {
+        return Boolean(dateRange) && dateRange.length === 2;
+    }
+    function allDatesClicked(buttonId) {
+        var triggered = window.dash_clientside.callback_context.triggered;
+        return Boolean(triggered && triggered.length) && triggered[0].prop_id.indexOf(buttonId) === 0;
+    }
+
+    // Day codes are DayKey * 2, + 1 for calls after midnight. A start date
+    // keeps its whole day, an end date only the calls at its midnight, like
+    // the server's InsertionTime >= start and <= end.
+    function dayCode(value) {
+        return value ? parseInt(String(value).slice(0, 10).replace(/-/g, ""), 10) * 2 : null;
+    }
+    function wanted(labels, values) {
+        if (!values || !values.length) {
+            return null;
+        }
+        return labels.map(function (label) { return values.indexOf(label) >= 0; });
+    }
+
+    function selectCells(cube, start, end, exchanges, segments, userid) {
+        var days = cube.labels.day.map(function (code) {
+            return (start === null || code >= dayCode(start)) && (end === null || code <= dayCode(end));
+        });
+        var exchangeOk = wanted(cube.labels.exchange, exchanges);
+        var segmentOk = wanted(cube.labels.segment, segments);
+        var userOk = userid === null ? null : cube.labels.user.map(function (user) { return user === Number(userid); });
+        var cells = [];
+        for (var i = 0; i < cube.cell.length; i++) {
+            if (!days[cube.day[i]]) continue;
+            if (exchangeOk && !exchangeOk[cube.exchange[i]]) continue;
+            if (segmentOk && !segmentOk[cube.segment[i]]) continue;
+            if (userOk && !userOk[cube.user[i]]) continue;
+            cells.push(i);
+        }
+        return cells;
+    }
+
+    function addInto(totals, values) {
+        for (var j = 0; j < values.length; j++) {
+            totals[j] += values[j];
+        }
+    }
+    function zeros() {
+        return [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0];
+    }
+
+    // kpi_rows() of summarize_kpis(): KPI sums per group key, in key order.
+    function kpiGroups(cube, cells, keyOf) {
+        var groups = {};
+        cells.forEach(function (i) {
+            var key = keyOf(i);
+            if (key === null) return;
+            groups[key] = groups[key] || zeros();
+            addInto(groups[key], cube.kpi[cube.cell[i]]);
+        });
+        return Object.keys(groups).map(Number).sort(function (a, b) { return a - b; }).map(function (key) {
+            return {"key": key, "counts": groups[key], "percents": kpiPercentages(groups[key])};
+        });
+    }
+
+    // Python's "{:.1f}": the exact value rounded, ties (only x.x5 values that
+    // are exact binary fractions) to an even last digit.
+    function format1(value) {
+        if (Number.isInteger(value * 4) && (value * 4) % 2 === 1 && Math.floor(value * 10) % 2 === 0) {
+            return (Math.floor(value * 10) / 10).toFixed(1);
+        }
+        return value.toFixed(1);
+    }
+    // str() of numpy's round(value, 1).
+    function round1Text(value) {
+        var scaled = value * 10;
+        var floor = Math.floor(scaled);
+        var diff = scaled - floor;
+        var rounded = diff > 0.5 || (diff === 0.5 && floor % 2 !== 0) ? floor + 1 : floor;
+        var text = String(rounded / 10);
+        return text.indexOf(".") < 0 ? text + ".0" : text;
+    }
+
+    function kpiPercentages(counts) {
+        var total = counts[0];
+        return [total ? "100%" : "0%"].concat(counts.slice(1).map(function (value) {
+            return total ? format1(value / total * 100) + "%" : "0.0%";
+        }));
+    }
+
+    // backend_sender._count_table(): [count, percentage] per GET_DATA_ROWS row.
+    function countTable(cube, cells) {
+        var counts = zeros();
+        cells.forEach(function (i) { addInto(counts, cube.counts[cube.cell[i]]); });
+        var total = counts[0];
+        return counts.map(function (count) {
+            return [count, total === 0 ? 0 : round1Text(count / total * 100) + " %"];
+        });
+    }
+
+    function periodKey(time) {
+        var divisor = time === "yearly" ? 10000 : time === "daily" ? 1 : 100;
+        return function (day) { return Math.floor(Math.floor(day / 2) / divisor); };
+    }
+    function periodLabel(key, time) {
+        if (time === "yearly") {
+            return String(key);
+        }
+        if (time === "daily") {
+            var day = key % 100;
+            var month = MONTHS[Math.floor(key / 100) % 100 - 1].slice(0, 3);
+            return (day < 10 ? "0" : "") + day + "-" + month + "-" + Math.floor(key / 10000);
+        }
+        return MONTHS[key % 100 - 1] + "-" + Math.floor(key / 100);
+    }
+    function periodRows(cube, cells, time) {
+        var keyOf = periodKey(time);
+        var groups = kpiGroups(cube, cells, function (i) { return keyOf(cube.labels.day[cube.day[i]]); });
+        return groups.reverse().map(function (group) {
+            return Object.assign(group, {"label": periodLabel(group.key, time)});
+        });
+    }
+    function typeRows(cube, cells) {
+        return kpiGroups(cube, cells, function (i) { return cube.callType[i] < 0 ? null : cube.callType[i]; })
+            .map(function (group) {
+                return Object.assign(group, {"label": cube.labels.callType[group.key]});
+            });
+    }
+
+    // kpi_table_rows()
+    function kpiTableRows(groups, labelStyle, percentLabel) {
+        var rows = [];
+        groups.forEach(function (group) {
+            rows.push(h("Tr", [h("Td", group.label, {"style": labelStyle})].concat(
+                group.counts.map(function (value) { return h("Td", value, {"style": CELL_STYLE}); }))));
+            rows.push(h("Tr", [h("Td", percentLabel, {"style": labelStyle})].concat(
+                group.percents.map(function (value) { return h("Td", value, {"style": CELL_STYLE}); }))));
+        });
+        return rows;
+    }
+
+    // kpi_grid(): the AG Grid the period summaries are rendered with, styled
+    // by the kpi-grid classes in kpi_grid.css.
+    var GRID_HEADERS = [
+        ["Total Calls", ""], ["Target Hit", ""], ["StopLoss Hit", ""],
+        ["Neither target nor Stop loss hit", "Positive"],
+        ["Neither target nor Stop loss hit", "Negative"],
+        ["Neither target nor Stop loss hit", "Redundant"],
+        ["Total Closed Calls", ""],
+        ["Open Calls", "Positive"], ["Open Calls", "Negative"], ["Open Calls", "Redundant"],
+        ["Total Open Calls", ""]
+    ];
+    var GRID_ROW_HEIGHT = 32;
+    var GRID_HEADER_HEIGHT = 100;
+    var GRID_MAX_HEIGHT = 600;
+    var GRID_DEFAULT_COLUMN = {
+        "width": 95, "sortable": false, "suppressMovable": true, "wrapHeaderText": true, "autoHeaderHeight": true,
+        "cellClass": "kpi-grid-cell", "headerClass": "kpi-grid-header"
+    };
+    var GRID_OPTIONS = {"rowHeight": GRID_ROW_HEIGHT, "suppressCellFocus": true};
+    // kpi_grid_columns()
+    function gridColumns(firstLabel, linkScope) {
+        var labelColumn = {"field": "label", "headerName": firstLabel, "pinned": "left", "width": 130,
+                           "cellClass": "kpi-grid-label"};
+        if (linkScope) {
+            labelColumn.cellRenderer = "markdown";
+            labelColumn.linkTarget = "_blank";
+        }
+        var columns = [labelColumn];
+        GRID_HEADERS.forEach(function (header, i) {
+            var group = header[0], name = header[1], last = columns[columns.length - 1];
+            if (!name) {
+                columns.push({"field": "c" + i, "headerName": group});
+            } else if (last.headerName === group && last.children) {
+                last.children.push({"field": "c" + i, "headerName": name});
+            } else {
+                columns.push({"headerName": group, "headerClass": "kpi-grid-header",
+                              "children": [{"field": "c" + i, "headerName": name}]});
+            }
+        });
+        return columns;
+    }
+    function record(label, values) {
+        var row = {"label": label};
+        values.forEach(function (value, i) { row["c" + i] = value; });
+        return row;
+    }
+    function kpiGrid(groups, firstLabel, linkScope) {
+        var data = [];
+        groups.forEach(function (group) {
+            var label = group.label;
+            if (linkScope) {
+                label = "[" + label + "](/details?scope=" + linkScope + "&period=" + label + ")";
+            }
+            data.push(record(label, group.counts));
+            data.push(record("%", group.percents));
+        });
+        var height = Math.min(GRID_HEADER_HEIGHT + GRID_ROW_HEIGHT * data.length, GRID_MAX_HEIGHT);
+        var props = {
+            "columnDefs": gridColumns(firstLabel, linkScope),
+            "rowData": data,
+            "defaultColDef": GRID_DEFAULT_COLUMN,
+            "dashGridOptions": GRID_OPTIONS,
+            "className": "kpi-grid",
+            "style": {"height": height + "px", "marginTop": "20px"}
+        };
+        return {"namespace": "dash_ag_grid", "type": "AgGrid", "props": props};
+    }
+
+    function kpiHead(firstLabel, headStyle, groupStyle, subStyle) {
+        var head = function (label, span) { return h("Th", label, Object.assign(span, {"style": headStyle})); };
+        var group = function (label) { return h("Th", label, {"colSpan": 3, "style": groupStyle}); };
+        var sub = function (label) { return h("Th", label, {"style": subStyle}); };
+        var first = firstLabel ? [head(firstLabel, {"rowSpan": 2})] : [];
+        return h("Thead", [
+            h("Tr", first.concat([
+                head("Total Calls", {"rowSpan": 2}),
+                head("Target Hit", {"rowSpan": 2}),
+                head("StopLoss Hit", {"rowSpan": 2}),
+                group("Neither target nor Stop loss hit"),
+                head("Total Closed Calls", {"rowSpan": 2}),
+                group("Open Calls"),
+                head("Total Open Calls", {"rowSpan": 2})
+            ])),
+            h("Tr", [sub("Positive"), sub("Negative"), sub("Redundant"),
+                     sub("Positive"), sub("Negative"), sub("Redundant")])
+        ]);
+    }
+    var SUMMARY_HEAD = {"backgroundColor": "#fdd835", "border": BORDER};
+    var ANALYST_GROUP_HEAD = {"backgroundColor": "#fdd835", "textAlign": "center", "border": BORDER};
+    var TYPE_HEAD = {"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": BORDER};
+    var TYPE_SUB = {"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": BORDER};
+
+    function typeTable(rows) {
+        return dmc("Table", [
+            kpiHead("Call Type", TYPE_HEAD, TYPE_HEAD, TYPE_SUB),
+            h("Tbody", rows, {"style": {"textAlign": "center", "fontSize": "14px"}})
+        ], TABLE_PROPS);
+    }
+    function summaryTable(table, groupStyle) {
+        var row = function (column) {
+            return h("Tr", table.map(function (entry) { return h("Td", entry[column], {"style": CELL_STYLE}); }));
+        };
+        return dmc("Table", [kpiHead(null, SUMMARY_HEAD, groupStyle, SUMMARY_HEAD), h("Tbody", [row(0), row(1)])], {
+            "withTableBorder": true,
+            "withColumnBorders": true,
+            "striped": true,
+            "highlightOnHover": true,
+            "mt": 30,
+            "style": {"borderCollapse": "collapse"}
+        });
+    }
+    function messageTable(message) {
+        return dmc("Table", [h("Tbody", [h("Tr", [
+            h("Td", message, {"colSpan": 11, "style": {"textAlign": "center", "color": "red"}})
+        ])])], {
+            "withTableBorder": true,
+            "withColumnBorders": true,
+            "striped": true,
+            "highlightOnHover": true,
+            "mt": 30,
+            "style": {"borderCollapse": "collapse"}
+        });
+    }
+    function selectUser() {
+        return dmc("Text", "Please select a user.", {"c": "red", "mt": 30});
+    }
+
+    // The date bounds the server callbacks use: the full range for the
+    // all-dates button, else the picker's range.
+    function bounds(dateRange, allDates) {
+        if (allDates || !hasRange(dateRange)) {
+            return [ALL_DATES_START, today()];
+        }
+        return [dateRange[0] || null, dateRange[1] || null];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        mis: {
+            grossSummary: function (nClicks, dateRange, exchanges, segments, cube) {
+                var noUpdate = window.dash_clientside.no_update;
+                if (!cube) {
+                    return [noUpdate, noUpdate];
+                }
+                var allDates = allDatesClicked("gross-all-date-button");
+                var picker = allDates ? [ALL_DATES_START, today()] : noUpdate;
+                var selected = hasRange(dateRange) || (exchanges && exchanges.length > 0) || (segments && segments.length > 0);
+                if (!selected) {
+                    return [messageTable("Select date range or any filter"), picker];
+                }
+                var range = bounds(dateRange, allDates);
+                var cells = selectCells(cube, range[0], range[1], exchanges, segments, null);
+                return [summaryTable(countTable(cube, cells), SUMMARY_HEAD), picker];
+            },
+            grossTimeRange: function (timeRange, dateRange, exchanges, segments, cube) {
+                if (!cube) {
+                    return window.dash_clientside.no_update;
+                }
+                if (!timeRange) {
+                    return dmc("Text", "Select time period", {"c": "red", "mt": 30});
+                }
+                var range = bounds(dateRange, false);
+                var cells = selectCells(cube, range[0], range[1], exchanges, segments, null);
+                return kpiGrid(periodRows(cube, cells, timeRange.toLowerCase()), "Period", null);
+            },
+            grossTypeSummary: function (timeRange, nClicks, dateRange, exchanges, segments, cube) {
+                if (!cube) {
+                    return window.dash_clientside.no_update;
+                }
+                if (!hasRange(dateRange)) {
+                    return messageTable("Select date filter");
+                }
+                var range = bounds(dateRange, allDatesClicked("gross-all-date-button"));
+                var cells = selectCells(cube, range[0], range[1], exchanges, segments, null);
+                var labelStyle = {"fontWeight": "bold", "border": BORDER, "textAlign": "center"};
+                return typeTable(kpiTableRows(typeRows(cube, cells), labelStyle, ""));
+            },
+            analystSummary: function (userid, nClicks, dateRange, exchanges, segments, cube) {
+                var noUpdate = window.dash_clientside.no_update;
+                if (!cube) {
+                    return [noUpdate, noUpdate];
+                }
+                var allDates = allDatesClicked("analyst-all-date-button");
+                var picker = allDates ? [ALL_DATES_START, today()] : noUpdate;
+                if (!userid) {
+                    return [selectUser(), picker];
+                }
+                var range = bounds(dateRange, allDates);
+                var cells = selectCells(cube, range[0], range[1], exchanges, segments, userid);
+                var table = summaryTable(countTable(cube, cells), ANALYST_GROUP_HEAD);
+                return [
+                    dmc("Container", [
+                        dmc("Text", "Analyst Level Summary", {"style": {"fontSize": "24px", "fontWeight": 600, "marginBottom": "20px"}}),
+                        table
+                    ], {"style": PAPER_STYLE}),
+                    picker
+                ];
+            },
+            analystTimeRange: function (timeRange, userid, nClicks, dateRange, exchanges, segments, cube) {
+                if (!cube) {
+                    return window.dash_clientside.no_update;
+                }
+                if (!userid) {
+                    return selectUser();
+                }
+                if (["Yearly", "Monthly", "Daily"].indexOf(timeRange) < 0) {
+                    return dmc("Text", "Please select a valid time range.", {"c": "red", "mt": 30});
+                }
+                var range = bounds(dateRange, false);
+                var cells = selectCells(cube, range[0], range[1], exchanges, segments, userid);
+                var scope = timeRange !== "Yearly" ? "monthly" : "yearly";
+                return kpiGrid(periodRows(cube, cells, timeRange.toLowerCase()), "Period", scope);
+            },
+            analystTypeSummary: function (userid, nClicks, dateRange, exchanges, segments, cube) {
+                var noUpdate = window.dash_clientside.no_update;
+                if (!cube) {
+                    return [noUpdate, noUpdate];
+                }
+                var allDates = allDatesClicked("analyst-all-date-button");
+                var picker = allDates ? [ALL_DATES_START, today()] : noUpdate;
+                if (!userid) {
+                    return [selectUser(), picker];
+                }
+                var range = bounds(dateRange, allDates);
+                var cells = selectCells(cube, range[0], range[1], exchanges, segments, userid);
+                var labelStyle = {"fontWeight": "bold", "border": BORDER, "textAlign": "center"};
+                return [
+                    dmc("Container", [
+                        dmc("Text", "Calls Type Summary", {"style": {"fontSize": "24px", "fontWeight": 600, "marginBottom": "20px"}}),
+                        typeTable(kpiTableRows(typeRows(cube, cells), labelStyle, ""))
+                    ], {"style": PAPER_STYLE}),
+                    picker
+                ];
+            }
+        }
+    });
+})();
@@ -0,0 +1,371 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, APP_DIR)
+
+import pandas as pd
+
+import synthetic_data
+from ingest_report import serve_file
+
+# Times the ETL stages, every backend_sender query and the page callbacks on
+# synthetic data (synthetic_data.py) and writes the results as JSON. Pass an
+# earlier results file as --baseline to see what got slower.
+#
+#   python benchmark.py --rows 10000 100000 --out bench.json
+#   python benchmark.py --rows 100000 --out new.json --baseline bench.json
+
+# Representative filters: the page defaults (all dates), a month on one
+# exchange and a narrow week on two segments.
+QUERY_FILTERS = {
+    "all": ("2024-12-01", "2025-12-31", None, None),
+    "month_nse": ("2025-06-01", "2025-06-30", ["NSE"], None),
+    "week_segments": ("2025-03-03", "2025-03-09", None, ["EQUITY", "FUTCOMM"]),
+}
+REGRESSION_RATIO = 1.2
+
+def timed(func, repeat, before=None):
+    # Runs func `repeat` times and returns the last result with the seconds of
+    # each run; `before` runs untimed ahead of every run (e.g. clearing caches).
+    runs, result = [], None
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - start)
+    return result, runs
+
+def record(results, name, runs):
+    results[name] = {"median_s": statistics.median(runs), "min_s": min(runs), "runs": runs}
+    print(f"  {name:<75}{results[name]['median_s'] * 1000:>10.1f} ms")
+
+def synthetic_csv(rows, seed):
+    # Generated once per size, seed and generator version, then reused.
+    with open(synthetic_data.__file__, "rb") as source:
+        version = hashlib.sha256(source.read()).hexdigest()[:8]
+    path = os.path.join(tempfile.gettempdir(), f"synthetic_calls_{rows}_{seed}_{version}.csv")
+    if not os.path.exists(path):
+        print(f"📝 Generating {rows} synthetic calls...")
+        synthetic_data.write_structure_csv(path + ".part", rows, seed=seed)
+        os.replace(path + ".part", path)
+    return path
+
+def bench_etl(elt, path, repeat, results):
+    with open(path, "rb") as source:
+        raw, runs = timed(lambda: (source.seek(0), elt.read_structure_csv(source))[1], repeat)
+    record(results, "etl.read_structure_csv", runs)
+
+    # Each stage from the constructor's own stage report, then the whole
+    # constructor with the report off and on.
+    stage_runs = {}
+    for _ in range(repeat):
+        for stage in elt.FetchStructuredData(raw, instrument=True).stage_report:
+            stage_runs.setdefault(stage["stage"], []).append(stage["seconds"])
+    for stage, runs in stage_runs.items():
+        record(results, f"etl.{stage}", runs)
+    df, runs = timed(lambda: elt.FetchStructuredData(raw, instrument=False).get_structure(), repeat)
+    record(results, "etl.FetchStructuredData", runs)
+    _, runs = timed(lambda: elt.FetchStructuredData(raw, instrument=True).get_structure(), repeat)
+    record(results, "etl.FetchStructuredData.instrumented", runs)
+
+    _, runs = timed(lambda: elt.CallFilterIndex(df), repeat)
+    record(results, "etl.CallFilterIndex", runs)
+    _, runs = timed(lambda: elt.CallCube(df), repeat)
+    record(results, "etl.CallCube", runs)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = elt.StructureCache(directory)
+        _, runs = timed(lambda: cache.save("bench", df), repeat)
+        record(results, "etl.StructureCache.save", runs)
+        _, runs = timed(lambda: cache.load("bench"), repeat)
+        record(results, "etl.StructureCache.load", runs)
+
+def bench_load(elt, url, repeat, chunk_rows, results):
+    # Download through publish, as at startup, without the Arrow cache.
+    backend, runs = timed(lambda: elt.backend_sender(file_url=url, use_cache=False), repeat)
+    record(results, "load.backend_sender", runs)
+    if chunk_rows:
+        _, runs = timed(lambda: elt.backend_sender(file_url=url, use_cache=False, chunk_rows=chunk_rows), repeat)
+        record(results, f"load.backend_sender_chunked_{chunk_rows}", runs)
+    return backend
+
+def query_calls(elt, backend):
+    userid = str(backend.user_id_sender()[0])
+    df = backend.df
+    month = elt.period_label(df["MonthKey"].value_counts().idxmax(), "monthly")
+    year = elt.period_label(df["Year"].value_counts().idxmax(), "yearly")
+    calls = {
+        "user_id_sender": lambda: backend.user_id_sender(),
+        "render_time_summary_data.monthly": lambda: backend.render_time_summary_data(time="monthly"),
+        "period_leaderboards.monthly": lambda: backend.period_leaderboards(month, "monthly"),
+        "period_leaderboards.yearly": lambda: backend.period_leaderboards(year, "yearly"),
+        "clientside_payload": lambda: backend.clientside_payload(),
+    }
+    for label, (start, end, exchange, segment) in QUERY_FILTERS.items():
+        calls.update({
+            f"filter_calls.{label}": lambda f=(start, end, exchange, segment): backend.filter_calls(*f),
+            f"selection.{label}": lambda f=(start, end, exchange, segment): backend.selection(*f),
+            f"get_data.{label}": lambda f=(start, end, exchange, segment): backend.get_data(*f),
+            f"get_data_filter_id.{label}": lambda f=(start, end, exchange, segment): backend.get_data_filter_id(userid, *f),
+            f"render_type_data_gross.{label}": lambda f=(start, end, exchange, segment): backend.render_type_data_gross(*f),
+            f"render_type_data_gross_id.{label}": lambda f=(start, end, exchange, segment): backend.render_type_data_gross_id(userid, *f),
+            f"extract_detail_view_id.{label}": lambda f=(start, end, exchange, segment): backend.extract_detail_view_id(int(userid), *f, time="monthly"),
+        })
+        for period in ["yearly", "monthly", "daily"]:
+            calls[f"generate_timely_summary_rows.{period}.{label}"] = (
+                lambda f=(start, end, exchange, segment), t=period: backend.generate_timely_summary_rows(*f, time=t))
+            calls[f"generate_timely_summary_rows_id.{period}.{label}"] = (
+                lambda f=(start, end, exchange, segment), t=period: backend.generate_timely_summary_rows_id(userid, *f, time=t))
+    return calls
+
+def bench_queries(elt, backend, repeat, results):
+    calls = query_calls(elt, backend)
+    covered = {name.split(".")[0] for name in calls}
+    for name in dir(elt.backend_sender):
+        if hasattr(getattr(elt.backend_sender, name), "__wrapped__") and name not in covered:
+            print(f"⚠️ backend_sender.{name} is a cached query but not benchmarked.")
+    # Cold: the query cache is emptied before every run; warm: served from it.
+    for name, call in calls.items():
+        _, runs = timed(call, repeat, before=backend.query_cache.clear)
+        record(results, f"query.{name}", runs)
+        _, runs = timed(call, repeat)
+        record(results, f"query.{name}.cached", runs)
+
+class DashClient:
+    # Fires callbacks the way the browser does: a POST per callback with the
+    # input values, answered with the JSON-encoded outputs.
+    def __init__(self, app):
+        self.client = app.server.test_client()
+        self.dependencies = {dep["output"]: dep for dep in self.client.get("/_dash-dependencies").get_json()}
+
+    def find(self, output):
+        for key, dependency in self.dependencies.items():
+            if output in key.strip(".").split("..."):
+                return dependency
+        return None
+
+    def fire(self, output, values, changed):
+        dependency = self.find(output)
+        outputs = [
+            {"id": out.rsplit(".", 1)[0], "property": out.rsplit(".", 1)[1]}
+            for out in dependency["output"].strip(".").split("...")
+        ]
+        def with_values(specs):
+            return [dict(spec, value=values.get(f"{spec['id']}.{spec['property']}")) for spec in specs]
+        body = {
+            "output": dependency["output"],
+            "outputs": outputs if dependency["output"].startswith("..") else outputs[0],
+            "inputs": with_values(dependency["inputs"]),
+            "state": with_values(dependency["state"]),
+            "changedPropIds": [changed],
+        }
+        response = self.client.post("/_dash-update-component", json=body)
+        if response.status_code == 204:
+            return {}
+        if response.status_code != 200:
+            raise RuntimeError(f"{output}: HTTP {response.status_code}")
+        updates = {}
+        for component, props in response.get_json()["response"].items():
+            for prop, value in props.items():
+                updates[f"{component}.{prop}"] = value
+        return updates
+
+def callback_flows(backend):
+    # (name, inputs, changed input, outputs) per page interaction. The outputs
+    # are fired in order, each seeing the inputs and every earlier output, so
+    # the tables read what the filter stage put in its store.
+    userid = str(backend.user_id_sender()[0])
+    df = backend.df
+    from pages import structure_call_data_ELT as elt
+    month = elt.period_label(df["MonthKey"].value_counts().idxmax(), "monthly")
+    year = elt.period_label(df["Year"].value_counts().idxmax(), "yearly")
+    start, end = QUERY_FILTERS["all"][:2]
+    gross_inputs = {
+        "gross-date-input-range-picker.value": [start, end],
+        "gross-exchange-multiselect.value": ["NSE", "MCX"],
+        "gross-segment-multiselect.value": [],
+        "gross-time-range-select.value": "Monthly",
+    }
+    analyst_inputs = {
+        "analyst-user-select.value": userid,
+        "analyst-date-input-range-picker.value": [start, end],
+        "analyst-exchange-multiselect.value": [],
+        "analyst-segment-multiselect.value": [],
+        "analyst-time-range-select.value": "Daily",
+    }
+    return [
+        ("gross.filter_change", gross_inputs, "gross-exchange-multiselect.value", [
+            "gross-filters.data",
+            "gross-summary-table-container.children",
+            "gross-time-range-summary-table.children",
+            "gross-type-summary-table.children",
+        ]),
+        ("analyst.filter_change", analyst_inputs, "analyst-user-select.value", [
+            "analyst-filters.data",
+            "analyst-summary-table-container.children",
+            "analyst-time-range-summary-table.children",
+            "analyst-type-range-summary-table.children",
+        ]),
+        ("details.monthly", {"details-url.href": f"http://localhost/details?scope=monthly&period={month}"},
+         "details-url.href", ["summary-table.children"]),
+        ("details.yearly", {"details-url.href": f"http://localhost/details?scope=yearly&period={year}"},
+         "details-url.href", ["summary-table.children"]),
+        ("page.gross", {"_pages_location.pathname": "/gross-structure-calls", "_pages_location.search": ""},
+         "_pages_location.pathname", ["_pages_content.children"]),
+        ("page.analyst", {"_pages_location.pathname": "/analyst-structure-calls", "_pages_location.search": ""},
+         "_pages_location.pathname", ["_pages_content.children"]),
+    ]
+
+def bench_callbacks(backend, repeat, results):
+    # Every page reads the process backend, so installing the benchmark's
+    # backend before the app is imported points all callbacks at it.
+    from pages import structure_call_data_ELT as elt
+    elt._shared_backend = backend
+    os.chdir(APP_DIR)
+    import app
+    client = DashClient(app.app)
+    for name, inputs, changed, outputs in callback_flows(backend):
+        missing = [output for output in outputs if client.find(output) is None]
+        if missing:
+            print(f"⚠️ {name}: {', '.join(missing)} not registered (CLIENTSIDE_FILTERS?), skipped.")
+            continue
+        step_runs = {output: [] for output in outputs}
+        for _ in range(repeat):
+            backend.query_cache.clear()
+            values = dict(inputs)
+            for i, output in enumerate(outputs):
+                start = time.perf_counter()
+                values.update(client.fire(output, values, changed if i == 0 else outputs[0]))
+                step_runs[output].append(time.perf_counter() - start)
+        if len(outputs) > 1:
+            for output, runs in step_runs.items():
+                record(results, f"callback.{name}.{output}", runs)
+        record(results, f"callback.{name}", [sum(runs) for runs in zip(*step_runs.values())])
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path) as source:
+        baseline = json.load(source)["sizes"]
+    print(f"\n{'benchmark':<85}{'baseline ms':>13}{'now ms':>10}{'ratio':>8}")
+    regressions = 0
+    for rows, timings in results.items():
+        for name, result in timings.items():
+            old = baseline.get(rows, {}).get(name)
+            if old is None or old["median_s"] == 0:
+                continue
+            ratio = result["median_s"] / old["median_s"]
+            flag = " ⚠️" if ratio > REGRESSION_RATIO else ""
+            regressions += bool(flag)
+            print(f"{rows + ' ' + name:<85}{old['median_s'] * 1000:>13.1f}{result['median_s'] * 1000:>10.1f}{ratio:>8.2f}{flag}")
+    print(f"\n{regressions} benchmarks more than {REGRESSION_RATIO:.1f}x slower than the baseline.")
+
+def measure(path, args):
+    # One data size, in its own process: the pages bind the backend when they
+    # are imported, and the memory of one size stays out of the next.
+    from pages import structure_call_data_ELT as elt
+    timings = {}
+    if "etl" not in args.skip:
+        bench_etl(elt, path, args.repeat, timings)
+    needs_backend = "query" not in args.skip or "callback" not in args.skip
+    if "load" in args.skip and not needs_backend:
+        return write_timings(timings, args.measure_out)
+    server, url = serve_file(path)
+    try:
+        # The query and callback benchmarks need a loaded backend.
+        if "load" in args.skip:
+            backend = elt.backend_sender(file_url=url, use_cache=False)
+        else:
+            backend = bench_load(elt, url, args.repeat, args.chunk_rows, timings)
+    finally:
+        server.shutdown()
+    if "query" not in args.skip:
+        bench_queries(elt, backend, args.repeat, timings)
+    if "callback" not in args.skip:
+        bench_callbacks(backend, args.repeat, timings)
+    write_timings(timings, args.measure_out)
+
+def write_timings(timings, path):
+    with open(path, "w") as out:
+        json.dump(timings, out)
+
+def run_size(path, args):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as out:
+        out_path = out.name
+    try:
+        command = [sys.executable, os.path.abspath(__file__), "--measure", path, "--measure-out", out_path,
+                   "--repeat", str(args.repeat), "--chunk-rows", str(args.chunk_rows)]
+        if args.skip:
+            command += ["--skip"] + args.skip
+        subprocess.run(command, check=True)
+        with open(out_path) as result:
+            return json.load(result)
+    finally:
+        os.remove(out_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ETL, backend queries and page callbacks.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000], help="synthetic data sizes to run")
+    parser.add_argument("--csv", help="benchmark this CSV instead of synthetic data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-rows", type=int, default=0, help="also time a chunked load")
+    parser.add_argument("--skip", nargs="*", default=[], choices=["etl", "load", "query", "callback"])
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier --out file to compare against")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    parser.add_argument("--measure-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # The backend under test is created by the benchmark; keep the app from
+    # starting a background refresh of its own.
+    os.environ.setdefault("REFRESH_INTERVAL_SECONDS", "0")
+    if args.measure:
+        measure(args.measure, args)
+        return
+
+    results = {}
+    for rows in [None] if args.csv else args.rows:
+        path = args.csv or synthetic_csv(rows, args.seed)
+        label = str(rows) if rows else os.path.basename(path)
+        print(f"⏱️ {label} rows" if rows else f"⏱️ {label}")
+        results[label] = run_size(path, args)
+
+    from pages import structure_call_data_ELT as elt
+    report = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "clientside_filters": elt.CLIENTSIDE_FILTERS,
+        },
+        "sizes": results,
+    }
+    with open(args.out, "w") as out:
+        json.dump(report, out, indent=2)
+    print(f"✅ Results written to {args.out}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import gc
+import os
+import signal
+
+# Production serving, from this folder:
+#
+#   gunicorn app:server
+#
+# With preload_app the master imports app.py once, so the CSV is downloaded
+# and cleaned once. Every worker is then forked with the snapshot (frame,
+# filter index and call cube) already in memory and shares it with the
+# master copy-on-write; nothing is copied or loaded per worker.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 10000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+preload_app = True
+
+def when_ready(server):
+    # The background refresher only runs in the master. When it publishes new
+    # data, HUP makes gunicorn replace the workers gracefully; the new ones
+    # are forked from the master and so start with the new snapshot.
+    from pages import structure_call_data_ELT
+    backend = structure_call_data_ELT.get_backend()
+    backend.on_publish.append(lambda version: os.kill(server.pid, signal.SIGHUP))
+
+# Data version the master's objects were last frozen for, see pre_fork().
+frozen_version = None
+
+def pre_fork(server, worker):
+    # Objects that exist now are never collected in the workers, so the GC
+    # doesn't write to (and un-share) the pages they live on. Frozen objects
+    # are never collected in the master either, so once per published
+    # snapshot its garbage (the previous snapshot's cycles) is collected
+    # first and the older freeze is lifted.
+    global frozen_version
+    from pages import structure_call_data_ELT
+    version = structure_call_data_ELT.get_backend().version
+    if version != frozen_version:
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+        frozen_version = version
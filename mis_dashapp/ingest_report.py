@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Loads the structure data once per ingest mode, each in a fresh process so
+# the peak RSS of one mode does not leak into the other, and prints them side
+# by side. A local CSV path is served over HTTP so it goes through the same
+# download path as the Drive file.
+#
+#   python ingest_report.py data/StructureCallEntries.csv --chunk-rows 50000
+
+def peak_rss_mb():
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def measure(url, chunk_rows):
+    sys.path.insert(0, APP_DIR)
+    from pages import structure_call_data_ELT
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    backend = structure_call_data_ELT.backend_sender(file_url=url, use_cache=False, chunk_rows=chunk_rows)
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    print(json.dumps({
+        "rows": len(backend.df),
+        "seconds": seconds,
+        "peak_rss_mb": peak,
+        "load_rss_mb": peak - baseline,
+    }))
+
+def run_mode(url, chunk_rows):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), url, "--measure", "--chunk-rows", str(chunk_rows)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def serve_file(path):
+    handler = partial(QuietHandler, directory=os.path.dirname(os.path.abspath(path)))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/{os.path.basename(path)}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare whole-file and chunked CSV ingest.")
+    parser.add_argument("source", nargs="?", help="CSV path or URL (default: the Drive file)")
+    parser.add_argument("--chunk-rows", type=int, default=50000)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    url, size_mb, server = args.source, None, None
+    if url and os.path.exists(url):
+        size_mb = os.path.getsize(url) / (1024 * 1024)
+        server, url = serve_file(url)
+    if url is None:
+        sys.path.insert(0, APP_DIR)
+        from pages.structure_call_data_ELT import DRIVE_FILE_URL
+        url = DRIVE_FILE_URL
+    if args.measure:
+        measure(url, args.chunk_rows)
+        return
+
+    print(f"{'mode':<22}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'MB/s':>8}{'peak RSS MB':>13}{'load RSS MB':>13}")
+    for label, chunk_rows in [("whole file", 0), (f"chunked ({args.chunk_rows})", args.chunk_rows)]:
+        r = run_mode(url, chunk_rows)
+        mb_per_s = f"{size_mb / r['seconds']:.1f}" if size_mb else "-"
+        print(f"{label:<22}{r['rows']:>10}{r['seconds']:>10.2f}{r['rows'] / r['seconds']:>12.0f}"
+              f"{mb_per_s:>8}{r['peak_rss_mb']:>13.0f}{r['load_rss_mb']:>13.0f}")
+    if server is not None:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import bisect
+import collections
+import os
+import time
+
+from flask import Response, g, request
+
+from pages import structure_call_data_ELT
+
+# GET /metrics in the Prometheus text format: latency and response size per
+# callback, the loaded data (version, rows, when and how long it took, ETL
+# stage times), the query cache and process memory.
+#
+# Each callback request is observed as it finishes, into a Shard of
+# histograms it borrows from a free list for those few additions, so requests
+# take no lock and never wait for a scrape. There are only as many shards as
+# requests ever finished at once; a scrape adds them up into fresh histograms
+# and formats those. A scrape can read a shard in the middle of an update;
+# that request then shows in full from the next scrape on. Numbers are per
+# process, so under gunicorn each scrape answers for the worker that served
+# it and every series carries that worker's pid.
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+SIZE_BUCKETS = [1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 10_000_000]
+CALLBACK_PATH = "_dash-update-component"
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + "}"
+
+def resident_memory_bytes():
+    # Current RSS on Linux; None elsewhere.
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def add(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ["+Inf"], self.counts):
+            cumulative += count
+            yield f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}"
+        yield f"{name}_sum{_labels(**labels)} {self.sum}"
+        yield f"{name}_count{_labels(**labels)} {cumulative}"
+
+class Shard:
+    # The latency and size histograms and error counts of the requests one
+    # borrower at a time observed, per callback name.
+    def __init__(self):
+        self.latency = {}
+        self.sizes = {}
+        self.errors = collections.Counter()
+
+    def observe(self, name, seconds, size, status):
+        self.latency.setdefault(name, Histogram(LATENCY_BUCKETS)).observe(seconds)
+        self.sizes.setdefault(name, Histogram(SIZE_BUCKETS)).observe(size)
+        if status >= 400:
+            self.errors[name] += 1
+
+class DashMetrics:
+    def __init__(self, app):
+        self.app = app
+        self.names = {}
+        # Every shard ever made, and the ones no request holds right now.
+        # list.append and deque.append/pop are atomic, so neither needs a lock.
+        self.shards = []
+        self.free_shards = collections.deque()
+
+    def register(self, server):
+        server.before_request(self.before_request)
+        server.after_request(self.after_request)
+        server.add_url_rule("/metrics", "metrics", self.respond)
+
+    def before_request(self):
+        if request.path.endswith(CALLBACK_PATH):
+            g.callback_started = time.perf_counter()
+
+    def after_request(self, response):
+        started = g.pop("callback_started", None)
+        if started is not None:
+            seconds = time.perf_counter() - started
+            body = request.get_json(silent=True) or {}
+            self.observe(body.get("output"), seconds, response.calculate_content_length() or 0, response.status_code)
+        return response
+
+    def callback_name(self, output):
+        # The callback function's name. Outputs no callback writes (a client
+        # can post anything) all count as "unknown" and are not remembered.
+        name = self.names.get(output)
+        if name is None:
+            entry = self.app.callback_map.get(output) if isinstance(output, str) else None
+            name = getattr(entry and entry.get("callback"), "__name__", None)
+            if name is None:
+                return "unknown"
+            self.names[output] = name
+        return name
+
+    def observe(self, output, seconds, size, status):
+        name = self.callback_name(output)
+        try:
+            shard = self.free_shards.pop()
+        except IndexError:
+            shard = Shard()
+            self.shards.append(shard)
+        shard.observe(name, seconds, size, status)
+        self.free_shards.append(shard)
+
+    def totals(self):
+        # The shards added up into new histograms, so formatting them below
+        # holds up no request.
+        total = Shard()
+        for shard in list(self.shards):
+            for name, histogram in list(shard.latency.items()):
+                total.latency.setdefault(name, Histogram(LATENCY_BUCKETS)).add(histogram)
+            for name, histogram in list(shard.sizes.items()):
+                total.sizes.setdefault(name, Histogram(SIZE_BUCKETS)).add(histogram)
+            total.errors.update(dict(shard.errors))
+        return total
+
+    def callback_lines(self, pid):
+        total = self.totals()
+        yield "# HELP mis_callback_duration_seconds Time to answer a Dash callback request."
+        yield "# TYPE mis_callback_duration_seconds histogram"
+        for name, histogram in sorted(total.latency.items()):
+            yield from histogram.lines("mis_callback_duration_seconds", {"callback": name, "pid": pid})
+        yield "# HELP mis_callback_response_bytes Size of a Dash callback response body."
+        yield "# TYPE mis_callback_response_bytes histogram"
+        for name, histogram in sorted(total.sizes.items()):
+            yield from histogram.lines("mis_callback_response_bytes", {"callback": name, "pid": pid})
+        yield "# HELP mis_callback_errors_total Dash callback requests answered with an error status."
+        yield "# TYPE mis_callback_errors_total counter"
+        for name in sorted(total.latency):
+            yield f"mis_callback_errors_total{_labels(callback=name, pid=pid)} {total.errors[name]}"
+
+    def data_lines(self, pid):
+        backend = structure_call_data_ELT.get_backend()
+        snapshot = backend.snapshot
+        pid_label = _labels(pid=pid)
+        gauges = [
+            ("mis_data_version", "Version of the published data, bumped on every reload with new data.", snapshot.version),
+            ("mis_data_rows", "Calls in the published data.", len(snapshot._df)),
+        ]
+        if snapshot.version:
+            gauges.append(("mis_data_loaded_timestamp_seconds", "Unix time the published data was loaded.", snapshot.loaded_at))
+        if snapshot.load_seconds is not None:
+            gauges.append(("mis_data_load_seconds", "Download through publish time of the published data.", snapshot.load_seconds))
+        cache = backend.query_cache
+        gauges.append(("mis_query_cache_entries", "Query results cached for the current data version.", len(cache.entries)))
+        gauges.append(("mis_query_cache_bytes", "Approximate memory of the cached query results.", cache.bytes))
+        rss = resident_memory_bytes()
+        if rss is not None:
+            gauges.append(("process_resident_memory_bytes", "Resident memory of this process.", rss))
+        peak = structure_call_data_ELT.peak_rss_mb()
+        if peak is not None:
+            gauges.append(("process_max_resident_memory_bytes", "Peak resident memory of this process.", int(peak * 1024 * 1024)))
+        for name, help_text, value in gauges:
+            yield f"# HELP {name} {help_text}"
+            yield f"# TYPE {name} gauge"
+            yield f"{name}{pid_label} {value}"
+        for name, help_text, value in [
+            ("mis_query_cache_hits_total", "Backend queries answered from the query cache.", cache.hits),
+            ("mis_query_cache_misses_total", "Backend queries computed.", cache.misses),
+        ]:
+            yield f"# HELP {name} {help_text}"
+            yield f"# TYPE {name} counter"
+            yield f"{name}{pid_label} {value}"
+        if backend.etl_report:
+            yield "# HELP mis_etl_stage_seconds Time of each ETL stage in the last load that ran the ETL."
+            yield "# TYPE mis_etl_stage_seconds gauge"
+            for record in backend.etl_report:
+                yield f"mis_etl_stage_seconds{_labels(stage=record['stage'], pid=pid)} {record['seconds']}"
+
+    def render(self):
+        # Read per scrape: with gunicorn's preload this object is created in
+        # the master, before the workers are forked.
+        pid = os.getpid()
+        lines = list(self.callback_lines(pid))
+        lines.extend(self.data_lines(pid))
+        return "\n".join(lines) + "\n"
+
+    def respond(self):
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+def register_metrics(app):
+    metrics = DashMetrics(app)
+    metrics.register(app.server)
+    return metrics
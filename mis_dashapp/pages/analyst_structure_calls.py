@@ -1,14 +1,13 @@
 from pages import structure_call_data_ELT
 import dash
 import dash_mantine_components as dmc
-from dash import html
+from dash import html, dcc
 from datetime import datetime, date
-from dash import callback, Output, Input
+from dash import clientside_callback, ClientsideFunction, Output, Input, State
 from dash import no_update
-from dash import dcc
 from pages import structure_call_data_ELT
 
-backend = structure_call_data_ELT.backend_sender()
+backend = structure_call_data_ELT.get_backend()
 UserId = backend.user_id_sender()
 
 dash.register_page(__name__, path="/analyst-structure-calls")
@@ -18,6 +17,7 @@ layout = dmc.MantineProvider(
     children=[
         dmc.Container(
             [
+                dcc.Store(id="analyst-filters"),
                 dmc.Title("Analyst Level Summary", order=2, mt=20),
                 dmc.Select(
                     id="analyst-user-select",
@@ -127,7 +127,7 @@ layout = dmc.MantineProvider(
                 dmc.Container(
                 [
                     dmc.Text("Please click on the period to get additional details for that period", style={"fontSize": 15, "fontWeight": 500, "marginBottom": 10}),
-                    dmc.Table(id="analyst-time-range-summary-table",)],
+                    html.Div(id="analyst-time-range-summary-table")],
                 style={
                     "backgroundColor": "#ffffff",
                     "padding": "32px",
@@ -150,22 +150,23 @@ layout = dmc.MantineProvider(
     ]
 )
 
-@callback(
-    Output("analyst-summary-table-container", "children"),
+@structure_call_data_ELT.filter_callback(
+    Output("analyst-filters", "data"),
     Output("analyst-date-input-range-picker", "value"),
     Input("analyst-user-select", "value"),
     Input("analyst-all-date-button", "n_clicks"),
     Input("analyst-date-input-range-picker", "value"),
     Input("analyst-exchange-multiselect", "value"),
     Input("analyst-segment-multiselect", "value"),
+    State("analyst-filters", "data"),
     prevent_initial_call=True
 )
-def update_analyst_summary_table(userid, n_clicks, date_range, exchanges, segments):
+def update_analyst_filters(userid, n_clicks, date_range, exchanges, segments, current):
+    # Filter stage: resolves the inputs into the filter set all three tables
+    # read and builds its row selection once, before they ask for it.
     ctx = dash.callback_context
     all_dates = [date(2024, 11, 1), datetime.now().date()]
     update_picker = no_update
-    if not userid:
-        return dmc.Text("Please select a user.", c="red", mt=30), update_picker if update_picker is not no_update else date_range
     if ctx.triggered and ctx.triggered[0]["prop_id"] == "analyst-all-date-button.n_clicks":
         start_date, end_date = all_dates
         update_picker = all_dates
@@ -175,12 +176,34 @@ def update_analyst_summary_table(userid, n_clicks, date_range, exchanges, segmen
     else:
         start_date, end_date = all_dates
 
+    filters = {
+        "userid": userid,
+        "start_date": None if start_date is None else str(start_date),
+        "end_date": None if end_date is None else str(end_date),
+        "exchange": exchanges,
+        "exch_segment": segments,
+    }
+    if filters == current:
+        return no_update, update_picker
+    if userid:
+        backend.selection(filters["start_date"], filters["end_date"], exchanges, segments, userid=int(userid))
+    return filters, update_picker
+
+@structure_call_data_ELT.filter_callback(
+    Output("analyst-summary-table-container", "children"),
+    Input("analyst-filters", "data"),
+    prevent_initial_call=True
+)
+def update_analyst_summary_table(filters):
+    if not filters["userid"]:
+        return dmc.Text("Please select a user.", c="red", mt=30)
+
     alldata = backend.get_data_filter_id(
-        userid=userid,
-        start_date=start_date,
-        end_date=end_date,
-        exchange=exchanges,
-        exch_segment=segments
+        userid=filters["userid"],
+        start_date=filters["start_date"],
+        end_date=filters["end_date"],
+        exchange=filters["exchange"],
+        exch_segment=filters["exch_segment"]
     )
 
     def get_cell(i, j):
@@ -268,27 +291,17 @@ def update_analyst_summary_table(userid, n_clicks, date_range, exchanges, segmen
         "margin": "40px auto"
     })
     
-    return table, update_picker if update_picker is not no_update else date_range
+    return table
 
-@callback(
+@structure_call_data_ELT.filter_callback(
     Output("analyst-time-range-summary-table", "children"),
     Input("analyst-time-range-select", "value"),
-    Input("analyst-user-select", "value"),
-    Input("analyst-all-date-button", "n_clicks"),
-    Input("analyst-date-input-range-picker", "value"),
-    Input("analyst-exchange-multiselect", "value"),
-    Input("analyst-segment-multiselect", "value"),
+    Input("analyst-filters", "data"),
     prevent_initial_call=True
 )
-def update_analyst_time_range_summary_table(time_range, user_id, n_clicks, date_range, exchanges, segments):
-    if not user_id:
+def update_analyst_time_range_summary_table(time_range, filters):
+    if not filters or not filters["userid"]:
         return dmc.Text("Please select a user.", c="red", mt=30)
-    all_dates = [date(2024, 11, 1), datetime.now().date()]
-    if date_range and len(date_range) == 2:
-        start_date = date_range[0]
-        end_date = date_range[1]
-    else:
-        start_date, end_date = all_dates
 
     if time_range == "Yearly":
         t = "yearly"
@@ -299,102 +312,30 @@ def update_analyst_time_range_summary_table(time_range, user_id, n_clicks, date_
     else:
         return dmc.Text("Please select a valid time range.", c="red", mt=30)
     summary_rows = backend.generate_timely_summary_rows_id(
-        userid=user_id,
-        start_date=start_date,
-        end_date=end_date,
-        exchange=exchanges,
-        exch_segment=segments,
+        userid=filters["userid"],
+        start_date=filters["start_date"],
+        end_date=filters["end_date"],
+        exchange=filters["exchange"],
+        exch_segment=filters["exch_segment"],
         time=t,
     )
-    filtered_table = dmc.Table(
-        [
-            html.Thead([
-                html.Tr([
-                    html.Th("Period", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("Total Calls", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("Target Hit", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("StopLoss Hit", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-
-                    html.Th("Neither target nor Stop loss hit", colSpan=3, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("Total Closed Calls", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
+    scope = "monthly" if time_range != "Yearly" else "yearly"
+    return structure_call_data_ELT.kpi_grid(summary_rows, link_scope=scope)
 
-                    html.Th("Open Calls", colSpan=3, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("Total Open Calls", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"})
-                ]),
-                html.Tr([
-                    html.Th("Positive", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                    html.Th("Negative", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                    html.Th("Redundant", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-
-                    html.Th("Positive", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                    html.Th("Negative", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                    html.Th("Redundant", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                ])
-            ]),
-            html.Tbody([
-                row
-                for period, values, percents in summary_rows
-                for row in [
-                    html.Tr([
-                        html.Td(
-                            dcc.Link(
-                                period,
-                                href=f"/details?scope={'monthly' if time_range != 'Yearly' else 'yearly'}&period={period}",
-                                target="_blank",
-                                style={"textDecoration": "none", "color": "black", "fontWeight": "bold"}
-                            ),
-                            style={"border": "1px solid #000000","textAlign": "center", "fontWeight": "bold"}
-                        ),
-                        *[html.Td(cell,style={"border": "1px solid #000000","textAlign": "right"}) for cell in values]
-                    ]),
-                    html.Tr([
-                        html.Td("%",style={"border": "1px solid #000000","textAlign": "center", "fontWeight": "bold"}),
-                        *[html.Td(p,style={"border": "1px solid #000000","textAlign": "right"}) for p in percents]
-                    ])
-                ]
-            ])
-        ],
-        withTableBorder=True,
-        withColumnBorders=True,
-        striped=True,
-        highlightOnHover=True,
-        horizontalSpacing="sm",
-        verticalSpacing="xs",
-        style={"borderCollapse": "collapse", "width": "100%", "marginTop": "20px"}
-    )
-
-    return filtered_table
-
-@callback(
-    Output("analyst-type-range-summary-table", "children", allow_duplicate=True),
-    Output("analyst-date-input-range-picker", "value", allow_duplicate=True),
-    Input("analyst-user-select", "value"),
-    Input("analyst-all-date-button", "n_clicks"),
-    Input("analyst-date-input-range-picker", "value"),
-    Input("analyst-exchange-multiselect", "value"),
-    Input("analyst-segment-multiselect", "value"),
+@structure_call_data_ELT.filter_callback(
+    Output("analyst-type-range-summary-table", "children"),
+    Input("analyst-filters", "data"),
     prevent_initial_call=True
 )
-def update_analyst_type_range_summary_table(userid, _, date_range, exchanges, segments):
-    ctx = dash.callback_context
-    all_dates = [date(2024, 11, 1), datetime.now().date()]
-    update_picker = no_update
-    if not userid:
-        return dmc.Text("Please select a user.", c="red", mt=30), update_picker if update_picker is not no_update else date_range
-    if ctx.triggered and ctx.triggered[0]["prop_id"] == "analyst-all-date-button.n_clicks":
-        start_date, end_date = all_dates
-        update_picker = all_dates
-    elif date_range and len(date_range) == 2:
-        start_date = date_range[0]
-        end_date = date_range[1]
-    else:
-        start_date, end_date = all_dates
+def update_analyst_type_range_summary_table(filters):
+    if not filters["userid"]:
+        return dmc.Text("Please select a user.", c="red", mt=30)
     rows = backend.render_type_data_gross_id(
-        userid=userid,
-        start_date=start_date,
-        end_date=end_date,
-        exchange=exchanges,
-        exch_segment=segments
+        userid=filters["userid"],
+        start_date=filters["start_date"],
+        end_date=filters["end_date"],
+        exchange=filters["exchange"],
+        exch_segment=filters["exch_segment"]
     )
 
     table = dmc.Container(
@@ -448,4 +389,44 @@ def update_analyst_type_range_summary_table(userid, _, date_range, exchanges, se
             "margin": "40px auto"
         }
     )
-    return table, update_picker if update_picker is not no_update else date_range
+    return table
+
+# CLIENTSIDE_FILTERS: the same three tables, built in the browser from the
+# call cube in clientside-cube-store (assets/clientside_filters.js).
+if structure_call_data_ELT.CLIENTSIDE_FILTERS:
+    clientside_callback(
+        ClientsideFunction("mis", "analystSummary"),
+        Output("analyst-summary-table-container", "children"),
+        Output("analyst-date-input-range-picker", "value"),
+        Input("analyst-user-select", "value"),
+        Input("analyst-all-date-button", "n_clicks"),
+        Input("analyst-date-input-range-picker", "value"),
+        Input("analyst-exchange-multiselect", "value"),
+        Input("analyst-segment-multiselect", "value"),
+        Input("clientside-cube-store", "data"),
+        prevent_initial_call=True
+    )
+    clientside_callback(
+        ClientsideFunction("mis", "analystTimeRange"),
+        Output("analyst-time-range-summary-table", "children"),
+        Input("analyst-time-range-select", "value"),
+        Input("analyst-user-select", "value"),
+        Input("analyst-all-date-button", "n_clicks"),
+        Input("analyst-date-input-range-picker", "value"),
+        Input("analyst-exchange-multiselect", "value"),
+        Input("analyst-segment-multiselect", "value"),
+        Input("clientside-cube-store", "data"),
+        prevent_initial_call=True
+    )
+    clientside_callback(
+        ClientsideFunction("mis", "analystTypeSummary"),
+        Output("analyst-type-range-summary-table", "children", allow_duplicate=True),
+        Output("analyst-date-input-range-picker", "value", allow_duplicate=True),
+        Input("analyst-user-select", "value"),
+        Input("analyst-all-date-button", "n_clicks"),
+        Input("analyst-date-input-range-picker", "value"),
+        Input("analyst-exchange-multiselect", "value"),
+        Input("analyst-segment-multiselect", "value"),
+        Input("clientside-cube-store", "data"),
+        prevent_initial_call=True
+    )
@@ -2,12 +2,12 @@ from pages import structure_call_data_ELT
 import pandas as pd
 import dash
 import dash_mantine_components as dmc
-from dash import html
+from dash import html, dcc
 from datetime import datetime, timedelta, date
-from dash import callback, Output, Input, State
+from dash import clientside_callback, ClientsideFunction, Output, Input, State
 from dash import no_update
 
-backend = structure_call_data_ELT.backend_sender()
+backend = structure_call_data_ELT.get_backend()
 dash.register_page(__name__, path="/gross-structure-calls")
 
 layout = dmc.MantineProvider(
@@ -15,6 +15,7 @@ layout = dmc.MantineProvider(
     children=[
         dmc.Container(
             [
+                dcc.Store(id="gross-filters"),
                 dmc.Text("Select Filters", style={"fontSize": 25, "fontWeight": 700, "marginBottom": 20}),
                 dmc.Group(
                     [
@@ -134,7 +135,7 @@ layout = dmc.MantineProvider(
                 dmc.Space(h=20),
                 dmc.Select(data=["Yearly","Monthly","Daily"],id="gross-time-range-select", placeholder="Select Time Range", label="Time Range", size="sm", radius="sm", withAsterisk=False, comboboxProps={"transitionProps": {"transition": "pop", "duration": 200}}),
                 dmc.Paper(
-                    [dmc.Table(id="gross-time-range-summary-table",)],
+                    [html.Div(id="gross-time-range-summary-table")],
                     style={
                         "backgroundColor": "#ffffff",
                         "padding": "32px",
@@ -156,37 +157,52 @@ layout = dmc.MantineProvider(
     ]
 )
 
-@callback(
-    Output("gross-summary-table-container", "children"),
+@structure_call_data_ELT.filter_callback(
+    Output("gross-filters", "data"),
     Output("gross-date-input-range-picker", "value"),
     Input("gross-all-date-button", "n_clicks"),
     Input("gross-date-input-range-picker", "value"),
     Input("gross-exchange-multiselect", "value"),
     Input("gross-segment-multiselect", "value"),
-    prevent_initial_call=True
+    State("gross-filters", "data"),
 )
-def update_gross_summary_table(n_clicks, date_range, exchanges, segments):
+def update_gross_filters(n_clicks, date_range, exchanges, segments, current):
+    # Filter stage: resolves the inputs into the filter set all three tables
+    # read and builds its row selection once, before they ask for it.
     ctx = dash.callback_context
     all_dates = [date(2024, 11, 1), datetime.now().date()]
     update_picker = no_update
-
-    # Check if any filter is selected
-    filters_selected = (
-        (date_range and len(date_range) == 2) or
-        (exchanges and len(exchanges) > 0) or
-        (segments and len(segments) > 0)
-    )
+    dates_selected = bool(date_range and len(date_range) == 2)
 
     if ctx.triggered and ctx.triggered[0]["prop_id"].startswith("gross-all-date-button"):
         start_date, end_date = all_dates
         update_picker = all_dates
-    elif date_range and len(date_range) == 2:
+    elif dates_selected:
         start_date = date_range[0]
         end_date = date_range[1]
     else:
         start_date, end_date = all_dates
 
-    if not filters_selected:
+    filters = {
+        "start_date": None if start_date is None else str(start_date),
+        "end_date": None if end_date is None else str(end_date),
+        "exchange": exchanges,
+        "exch_segment": segments,
+        "dates_selected": dates_selected,
+        "any_selected": dates_selected or bool(exchanges) or bool(segments),
+    }
+    if filters == current:
+        return no_update, update_picker
+    backend.selection(filters["start_date"], filters["end_date"], exchanges, segments)
+    return filters, update_picker
+
+@structure_call_data_ELT.filter_callback(
+    Output("gross-summary-table-container", "children"),
+    Input("gross-filters", "data"),
+    prevent_initial_call=True
+)
+def update_gross_summary_table(filters):
+    if not filters["any_selected"]:
         table = dmc.Table(
             [
                 html.Tbody([
@@ -202,13 +218,13 @@ def update_gross_summary_table(n_clicks, date_range, exchanges, segments):
             mt=30,
             style={"borderCollapse": "collapse"}
         )
-        return table, update_picker
+        return table
 
     alldata = backend.get_data(
-        start_date=start_date,
-        end_date=end_date,
-        exchange=exchanges,
-        exch_segment=segments
+        start_date=filters["start_date"],
+        end_date=filters["end_date"],
+        exchange=filters["exchange"],
+        exch_segment=filters["exch_segment"]
     )
 
     def get_cell(i, j):
@@ -285,107 +301,35 @@ def update_gross_summary_table(n_clicks, date_range, exchanges, segments):
         mt=30,
         style={"borderCollapse": "collapse"}
     )
-    return table, update_picker
+    return table
 
-@callback(
+@structure_call_data_ELT.filter_callback(
     Output("gross-time-range-summary-table", "children"),
     Input("gross-time-range-select", "value"),
-    Input("gross-date-input-range-picker", "value"),
-    Input("gross-exchange-multiselect", "value"),
-    Input("gross-segment-multiselect", "value"),
+    Input("gross-filters", "data"),
     prevent_initial_call=True
 )
-def update_gross_time_range_summary_table(time_range, date_range, exchanges, segments):
-    all_dates = [date(2024, 11, 1), datetime.now().date()]
-    if date_range and len(date_range) == 2:
-        start_date = date_range[0]
-        end_date = date_range[1]
-    else:
-        start_date, end_date = all_dates
+def update_gross_time_range_summary_table(time_range, filters):
+    if filters is None:
+        return no_update
     if not time_range:
-        summary_rows = [html.Tr([html.Td("Select time period", colSpan=11, style={"textAlign": "center", "color": "red"})])]
-    elif time_range == "Yearly":
-        summary_rows = backend.generate_timely_summary_rows(
-            start_date=start_date,
-            end_date=end_date,
-            exchange=exchanges,
-            exch_segment=segments,
-            time="yearly",
-        )
-    elif time_range == "Monthly":
-        summary_rows = backend.generate_timely_summary_rows(
-            start_date=start_date,
-            end_date=end_date,
-            exchange=exchanges,
-            exch_segment=segments,
-            time="monthly",
-        )
-    elif time_range == "Daily":
-        summary_rows = backend.generate_timely_summary_rows(
-            start_date=start_date,
-            end_date=end_date,
-            exchange=exchanges,
-            exch_segment=segments,
-            time="daily",
-        )
-
-    filter_table = dmc.Table(
-        [
-            html.Thead([
-                html.Tr([
-                    html.Th("Period", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("Total Calls", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("Target Hit", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("StopLoss Hit", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-
-                    html.Th("Neither target nor Stop loss hit", colSpan=3, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("Total Closed Calls", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-
-                    html.Th("Open Calls", colSpan=3, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"}),
-                    html.Th("Total Open Calls", rowSpan=2, style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "8px", "border": "1px solid #000000"})
-                ]),
-                html.Tr([
-                    html.Th("Positive", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                    html.Th("Negative", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                    html.Th("Redundant", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-
-                    html.Th("Positive", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                    html.Th("Negative", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                    html.Th("Redundant", style={"backgroundColor": "#fdd835", "textAlign": "center", "padding": "6px", "border": "1px solid #000000"}),
-                ])
-            ]),
-            html.Tbody(
-                summary_rows,
-                style={"textAlign": "center", "fontSize": "14px"}
-            )
-        ],
-        withTableBorder=True,
-        withColumnBorders=True,
-        striped=True,
-        highlightOnHover=True,
-        horizontalSpacing="sm",
-        verticalSpacing="xs",
-        style={"borderCollapse": "collapse", "width": "100%", "marginTop": "20px"}
+        return dmc.Text("Select time period", c="red", mt=30)
+    summary_rows = backend.generate_timely_summary_rows(
+        start_date=filters["start_date"],
+        end_date=filters["end_date"],
+        exchange=filters["exchange"],
+        exch_segment=filters["exch_segment"],
+        time=time_range.lower(),
     )
-    return filter_table
+    return structure_call_data_ELT.kpi_grid(summary_rows)
 
-@callback(
+@structure_call_data_ELT.filter_callback(
     Output("gross-type-summary-table", "children"),
-    Input("gross-time-range-select", "value"),
-    Input("gross-all-date-button", "n_clicks"),
-    Input("gross-date-input-range-picker", "value"),
-    Input("gross-exchange-multiselect", "value"),
-    Input("gross-segment-multiselect", "value"),
+    Input("gross-filters", "data"),
+    prevent_initial_call=True
 )
-def update_gross_type_summary_table(time_range, n_clicks, date_range, exchanges, segments):
-    ctx = dash.callback_context
-    all_dates = [date(2024, 11, 1), datetime.now().date()]
-    # Check if any filter is selected
-    filters_selected = (
-        (date_range and len(date_range) == 2)
-    )
-
-    if not filters_selected:
+def update_gross_type_summary_table(filters):
+    if not filters["dates_selected"]:
         return dmc.Table(
             [
                 html.Tbody([
@@ -402,19 +346,11 @@ def update_gross_type_summary_table(time_range, n_clicks, date_range, exchanges,
             style={"borderCollapse": "collapse"}
         )
 
-    if ctx.triggered and ctx.triggered[0]["prop_id"].startswith("gross-all-date-button"):
-        start_date, end_date = all_dates
-    elif date_range and len(date_range) == 2:
-        start_date = date_range[0]
-        end_date = date_range[1]
-    else:
-        start_date, end_date = all_dates
-
     rows = backend.render_type_data_gross(
-        start_date=start_date,
-        end_date=end_date,
-        exchange=exchanges,
-        exch_segment=segments
+        start_date=filters["start_date"],
+        end_date=filters["end_date"],
+        exchange=filters["exchange"],
+        exch_segment=filters["exch_segment"]
     )
 
     table = dmc.Table(
@@ -471,4 +407,39 @@ def update_gross_type_summary_table(time_range, n_clicks, date_range, exchanges,
         verticalSpacing="xs",
         style={"borderCollapse": "collapse", "width": "100%", "marginTop": "20px"}
     )
-    return table
\ No newline at end of file
+    return table
+
+# CLIENTSIDE_FILTERS: the same three tables, built in the browser from the
+# call cube in clientside-cube-store (assets/clientside_filters.js).
+if structure_call_data_ELT.CLIENTSIDE_FILTERS:
+    clientside_callback(
+        ClientsideFunction("mis", "grossSummary"),
+        Output("gross-summary-table-container", "children"),
+        Output("gross-date-input-range-picker", "value"),
+        Input("gross-all-date-button", "n_clicks"),
+        Input("gross-date-input-range-picker", "value"),
+        Input("gross-exchange-multiselect", "value"),
+        Input("gross-segment-multiselect", "value"),
+        Input("clientside-cube-store", "data"),
+        prevent_initial_call=True
+    )
+    clientside_callback(
+        ClientsideFunction("mis", "grossTimeRange"),
+        Output("gross-time-range-summary-table", "children"),
+        Input("gross-time-range-select", "value"),
+        Input("gross-date-input-range-picker", "value"),
+        Input("gross-exchange-multiselect", "value"),
+        Input("gross-segment-multiselect", "value"),
+        Input("clientside-cube-store", "data"),
+        prevent_initial_call=True
+    )
+    clientside_callback(
+        ClientsideFunction("mis", "grossTypeSummary"),
+        Output("gross-type-summary-table", "children"),
+        Input("gross-time-range-select", "value"),
+        Input("gross-all-date-button", "n_clicks"),
+        Input("gross-date-input-range-picker", "value"),
+        Input("gross-exchange-multiselect", "value"),
+        Input("gross-segment-multiselect", "value"),
+        Input("clientside-cube-store", "data"),
+    )
@@ -2,135 +2,706 @@ import pandas as pd
 import numpy as np
 import re
 import dash_mantine_components as dmc
-from dash import html
+from dash import html, callback
+import dash_ag_grid as dag
 import requests
 import io
+import os
+import sys
+import time
+import glob
+import hashlib
+import tempfile
+import threading
+import functools
+import inspect
+from collections import OrderedDict
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# STRUCTURE_CSV_URL points the app at a mirror of the Drive file instead.
+DRIVE_FILE_URL = os.environ.get("STRUCTURE_CSV_URL", "https://drive.google.com/uc?export=download&id=1AQu8o0w1I4qr1IO6AHi8BsBjA8a6k28e")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache")
+# How often the background refresher re-checks the CSV; 0 turns it off.
+REFRESH_INTERVAL_SECONDS = int(os.environ.get("REFRESH_INTERVAL_SECONDS", 900))
+REQUEST_TIMEOUT_SECONDS = 120
+# Rows per read_csv chunk in streaming ingest; 0 parses the whole CSV at once.
+INGEST_CHUNK_ROWS = int(os.environ.get("INGEST_CHUNK_ROWS", 0))
+# With CLIENTSIDE_FILTERS=1 the gross and analyst pages get the call cube once
+# per browser session and filter it in assets/clientside_filters.js.
+CLIENTSIDE_FILTERS = bool(int(os.environ.get("CLIENTSIDE_FILTERS", 0)))
+# Time, rows and memory of every FetchStructuredData stage, printed after each
+# ETL run and kept in backend_sender.etl_report. ETL_STAGE_REPORT=0 turns it
+# off; the stages then run back to back with nothing measured.
+ETL_STAGE_REPORT = bool(int(os.environ.get("ETL_STAGE_REPORT", 1)))
+
+# Any edit to this module changes the ETL output potentially, so its source
+# is part of the cache fingerprint and stale caches are never reused.
+with open(__file__, "rb") as _source:
+    ETL_CODE_VERSION = hashlib.sha256(_source.read()).hexdigest()[:16]
+
+# Columns of StructureCallEntries.csv the dashboard uses and how to read them.
+# Anything else in the file (RRRValue, CallType, Attachment, ...) is never
+# parsed. Timestamps are read as text and parsed with TIMESTAMP_FORMAT.
+STRUCTURE_SCHEMA = {
+    "StructuredCallEntryID": "Int64",
+    "UserID": "Int64",
+    "Header": "str",
+    "Exchange": "str",
+    "ExchSegment": "str",
+    "Symbol": "str",
+    "BuySell": "str",
+    "Price": "float64",
+    "StopLoss": "float64",
+    "TargetPrice": "float64",
+    "LastTradedPrice": "float64",
+    "CallClosedLTP": "float64",
+    "Status": "str",
+    "StatusDescreption": "str",
+    "InternalRemark": "str",
+    "InsertionTime": "str",
+    "Validity": "str",
+    "ModifiedDT": "str",
+}
+TIMESTAMP_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+# Exit price patterns, compiled once. Text is upper-cased before matching.
+PRICE_NUMBER = r'(\d{1,6}(?:\.\d{1,2})?)'
+PRICE_AT_PATTERN = re.compile(r'@\s*' + PRICE_NUMBER)
+EXIT_KEYWORDS = ['EXIT AT', 'BOOK PROFIT AT', 'SL HIT AT', 'EXIT', 'BOOK PROFIT']
+EXIT_KEYWORD_PATTERNS = [re.compile(keyword + r'\s*' + PRICE_NUMBER) for keyword in EXIT_KEYWORDS]
+YEAR_PATTERN = re.compile(r'20\d{2}')
+LOOSE_NUMBER_PATTERN = re.compile(r'(\d{2,6}(?:\.\d{1,2})?)')
+OPTION_SUFFIX_PATTERN = re.compile(r'(CE|PE)', re.IGNORECASE)
+YEAR_AHEAD_PATTERN = re.compile(r'\s*20\d{2}')
+PRICE_RANGE_PATTERN = re.compile(r'at\s*\d{1,6}\s*-\s*\d{1,6}', re.IGNORECASE)
+MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+
+STOP_LOSS_KEYWORDS = ['sl', 'stop loss', 'stoploss']
+
+# Keyword -> callType, in priority order: a call whose Header + StatusDescreption
+# mentions several keywords gets the first one's type. Add a line here to add
+# a call type; calls mentioning none are DEFAULT_CALL_TYPE.
+CALL_TYPE_KEYWORDS = {
+    "momentum": "Momentum",
+    "intraday": "Intraday",
+    "positional": "Positional",
+    "stock of the day": "Stock of the day",
+    "btst": "BTST",
+    "wealth pick": "Wealth pick",
+}
+DEFAULT_CALL_TYPE = "Anonymous"
+
+# Per-call 0/1 indicators behind every summary table, in the order the
+# tables show them: total, target hit, SL hit, closed positive/negative/
+# redundant, total closed, open positive/negative/redundant, total open.
+KPI_COLUMNS = [
+    "KpiTotal", "KpiTargetHit", "KpiStopLossHit",
+    "KpiClosedPositive", "KpiClosedNegative", "KpiClosedRedundant", "KpiClosed",
+    "KpiOpenPositive", "KpiOpenNegative", "KpiOpenRedundant", "KpiOpen",
+]
+
+# Rows of the get_data() table. These keep their own definitions (Status
+# column, ProfitPriceChange sign, open calls against LastTradedPrice), which
+# differ slightly from the KPI_COLUMNS ones used by the period tables.
+GET_DATA_ROWS = [
+    "Total Calls", "Target Hit", "StopLoss Hit",
+    "Neither target nor Stop loss hit - Positive",
+    "Neither target nor Stop loss hit - Negative",
+    "Neither target nor Stop loss hit - Redundant",
+    "Total Closed Calls",
+    "Open Calls - Positive", "Open Calls - Negative", "Open Calls - Redundant",
+    "Total Open Calls"
+]
+
+GET_DATA_INPUTS = ["StructuredCallEntryID", "BuySell", "TargetHit", "StopLossHit", "Status",
+                   "Price", "LastTradedPrice", "ProfitPriceChange"]
+
+# How compact_structure() stores the cleaned frame. Text columns with a few
+# distinct values become categoricals, hit flags and counters small integers.
+CATEGORY_COLUMNS = ["Exchange", "ExchSegment", "Symbol", "BuySell", "Status", "Month", "WeekStr", "callType"]
+SMALL_INT_COLUMNS = ["StructuredCallEntryID", "UserID", "Year", "MonthKey", "DayKey", "WeekKey", "WeekNo",
+                     "TargetHit", "StopLossHit"]
+# Prices are only compared with each other, so they go to float32 together and
+# only while every value has at most 2 decimals and is below 2**16, where
+# float32 still tells any two such values apart.
+PRICE_COLUMNS = ["Price", "StopLoss", "TargetPrice", "LastTradedPrice", "CallClosedLTP", "ExitPrice"]
+FLOAT32_PRICE_LIMIT = 2 ** 16
+# Only the sign of these is ever read; float32 keeps it exactly.
+DERIVED_FLOAT_COLUMNS = ["ProfitPriceChange", "Target_Exit_Diff", "StopLoss_Exit_Diff"]
+# Free text only the ETL stages read; nothing downstream needs it.
+ETL_ONLY_COLUMNS = ["Header", "StatusDescreption", "InternalRemark"]
+
+# Results kept per data version by the query cache in front of backend_sender,
+# bounded by count and by approximate size (selections hold whole row subsets).
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_MB = int(os.environ.get("QUERY_CACHE_MB", 128))
+
+PERIOD_FORMATS = {"yearly": "%Y", "monthly": "%B-%Y", "daily": "%d-%b-%Y"}
+# Integer period key column per time bucket, see period_keys().
+PERIOD_KEYS = {"yearly": "Year", "monthly": "MonthKey", "daily": "DayKey", "weekly": "WeekKey"}
+# The user leaderboards of the /details page, in display order: name, the
+# column a slice filters on and a test on its upper-cased value.
+LEADERBOARD_SLICES = [
+    ("overall", None, None),
+    ("nse", "Exchange", lambda value: value == "NSE"),
+    ("mcx", "Exchange", lambda value: value == "MCX"),
+    ("cash", "ExchSegment", lambda value: value == "EQUITY"),
+    ("derivatives", "ExchSegment", lambda value: "FUT" in value),
+    ("options", "ExchSegment", lambda value: value in ("OPT", "OPTCOMM")),
+]
+# rank_users() order: highest first on each column in turn, then UserID.
+LEADERBOARD_ORDER = ["TargetHitPct"]
+CELL_STYLE = {"border": "1px solid #000000", "textAlign": "right"}
+
+# Period summaries are AG Grids built by kpi_grid(). Their records carry only
+# the values; headers and widths are set once per table here and the styles
+# are the shared kpi-grid classes in assets/kpi_grid.css, not set per cell.
+KPI_GRID_HEADERS = [
+    ["Total Calls", ""], ["Target Hit", ""], ["StopLoss Hit", ""],
+    ["Neither target nor Stop loss hit", "Positive"],
+    ["Neither target nor Stop loss hit", "Negative"],
+    ["Neither target nor Stop loss hit", "Redundant"],
+    ["Total Closed Calls", ""],
+    ["Open Calls", "Positive"], ["Open Calls", "Negative"], ["Open Calls", "Redundant"],
+    ["Total Open Calls", ""],
+]
+KPI_GRID_DEFAULT_COLUMN = {
+    "width": 95, "sortable": False, "suppressMovable": True, "wrapHeaderText": True, "autoHeaderHeight": True,
+    "cellClass": "kpi-grid-cell", "headerClass": "kpi-grid-header",
+}
+# The grid only renders the rows in view; it grows with its rows up to
+# KPI_GRID_MAX_HEIGHT and scrolls beyond that.
+KPI_GRID_ROW_HEIGHT = 32
+KPI_GRID_OPTIONS = {"rowHeight": KPI_GRID_ROW_HEIGHT, "suppressCellFocus": True}
+KPI_GRID_HEADER_HEIGHT = 100
+KPI_GRID_MAX_HEIGHT = 600
+
+def kpi_grid_columns(first_label, link_scope=None):
+    # KPI_GRID_HEADERS as AG Grid column definitions, the columns sharing a
+    # group header under one group.
+    label_column = {"field": "label", "headerName": first_label, "pinned": "left", "width": 130,
+                    "cellClass": "kpi-grid-label"}
+    if link_scope:
+        label_column.update({"cellRenderer": "markdown", "linkTarget": "_blank"})
+    columns = [label_column]
+    for i, (group, name) in enumerate(KPI_GRID_HEADERS):
+        if not name:
+            columns.append({"field": f"c{i}", "headerName": group})
+        elif columns[-1].get("headerName") == group and "children" in columns[-1]:
+            columns[-1]["children"].append({"field": f"c{i}", "headerName": name})
+        else:
+            columns.append({"headerName": group, "headerClass": "kpi-grid-header",
+                            "children": [{"field": f"c{i}", "headerName": name}]})
+    return columns
+
+def _schema_column(name):
+    return name in STRUCTURE_SCHEMA
+
+# Numeric columns read as text, for files where the typed read failed.
+NUMERIC_AS_TEXT_SCHEMA = {col: "str" if dtype in ("float64", "Int64") else dtype for col, dtype in STRUCTURE_SCHEMA.items()}
+
+def _coerce_numeric_columns(df):
+    for col, dtype in STRUCTURE_SCHEMA.items():
+        if col not in df.columns or dtype not in ("float64", "Int64"):
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        if dtype == "Int64":
+            values = values.where(values % 1 == 0)
+        bad = values.isna() & df[col].notna()
+        if bad.any():
+            print(f"⚠️ {col}: {bad.sum()} values do not fit {dtype} and were left empty, e.g. {df.loc[bad, col].iloc[0]!r}.")
+        df[col] = values.astype(dtype)
+    return df
+
+def read_structure_csv(source, chunksize=None):
+    # One typed pass over the schema columns. If a value doesn't fit its
+    # dtype (text in a price column, ...) the affected part of the file is
+    # re-read with numbers as text, and the values that are not numbers are
+    # reported and left empty.
+    if chunksize:
+        return _read_structure_chunks(source, chunksize)
+    start = source.tell()
+    try:
+        return pd.read_csv(source, usecols=_schema_column, dtype=STRUCTURE_SCHEMA)
+    except (ValueError, TypeError) as e:
+        print("⚠️ CSV does not match the declared schema:", e)
+        source.seek(start)
+        return _coerce_numeric_columns(pd.read_csv(source, usecols=_schema_column, dtype=NUMERIC_AS_TEXT_SCHEMA))
+
+def _read_structure_chunks(source, chunksize):
+    start = source.tell()
+    rows = 0
+    try:
+        for chunk in pd.read_csv(source, usecols=_schema_column, dtype=STRUCTURE_SCHEMA, chunksize=chunksize):
+            rows += len(chunk)
+            yield chunk
+    except (ValueError, TypeError) as e:
+        print("⚠️ CSV does not match the declared schema:", e)
+        source.seek(start)
+        # Resume after the chunks already handed out, keeping CSV positions as the index.
+        lenient = pd.read_csv(source, usecols=_schema_column, dtype=NUMERIC_AS_TEXT_SCHEMA,
+                              chunksize=chunksize, skiprows=range(1, rows + 1))
+        for chunk in lenient:
+            chunk.index += rows
+            yield _coerce_numeric_columns(chunk)
+
+def parse_timestamps(values, name=None):
+    # Fixed-format parse. If no value matches TIMESTAMP_FORMAT the column is in
+    # some other layout and is inferred day-first as before; otherwise the
+    # values that don't match are left empty and reported.
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if pa is not None:
+        # pandas parses a non-ISO format element by element; Arrow's strptime
+        # is much faster. It rolls impossible dates (31-02) over into the next
+        # month though, so a parse only counts if its day matches the text.
+        text = pa.array(values.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+        stamps = pc.strptime(text, format=TIMESTAMP_FORMAT, unit="s", error_is_null=True)
+        day = pc.cast(pc.struct_field(pc.extract_regex(text, r"^(?P<day>\d{1,2})-"), "day"), pa.int64())
+        exact = pc.fill_null(pc.equal(day, pc.day(stamps)), False)
+        parsed = pd.Series(pc.if_else(exact, stamps, None), index=values.index).astype("datetime64[us]")
+        pending = parsed.isna() & values.notna()
+        if pending.any():
+            parsed = parsed.where(~pending, pd.to_datetime(values[pending], format=TIMESTAMP_FORMAT, errors='coerce'))
+    else:
+        parsed = pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors='coerce')
+    failed = parsed.isna() & values.notna()
+    if failed.any():
+        name = name or values.name
+        if failed.sum() == values.notna().sum():
+            print(f"⚠️ {name}: no values in {TIMESTAMP_FORMAT} format, inferring the format instead.")
+            return pd.to_datetime(values, errors='coerce', dayfirst=True)
+        print(f"⚠️ {name}: {failed.sum()} of {len(values)} values not in {TIMESTAMP_FORMAT} format were left empty, "
+              f"e.g. {values[failed].iloc[0]!r}.")
+    return parsed
+
+def summarize_kpis(df, by):
+    # All 11 metrics for every group in one grouped sum. `by` is anything
+    # groupby accepts: a column (callType, UserID, ...), a list of them or a
+    # Series of period labels.
+    return df.groupby(by, observed=True)[KPI_COLUMNS].sum()
+
+def get_data_indicators(df):
+    # One boolean column per GET_DATA_ROWS entry; only calls with an ID count.
+    counted = df["StructuredCallEntryID"].notna()
+    buy = df["BuySell"].str.upper() == "BUY"
+    sell = df["BuySell"].str.upper() == "SELL"
+    neither = (df["TargetHit"] == 0) & (df["StopLossHit"] == 0)
+    is_open = df["Status"] == "Open"
+    price, ltp, change = df["Price"], df["LastTradedPrice"], df["ProfitPriceChange"]
+    indicators = [
+        counted,
+        df["TargetHit"] == 1,
+        df["StopLossHit"] == 1,
+        neither & (change > 0),
+        neither & (change < 0),
+        neither & (change == 0),
+        df["Status"] == "Closed",
+        is_open & ((buy & (price > ltp)) | (sell & (price < ltp))),
+        is_open & ((buy & (price < ltp)) | (sell & (price > ltp))),
+        is_open & (price == ltp),
+        is_open,
+    ]
+    # Missing hit flags (nullable Int8 after compaction) count as not hit.
+    return pd.DataFrame(
+        {label: (flag & counted).to_numpy(dtype=bool, na_value=False) for label, flag in zip(GET_DATA_ROWS, indicators)},
+        index=df.index,
+    )
+
+def _prices_fit_float32(prices):
+    values = prices.to_numpy(dtype=np.float64, na_value=np.nan).ravel()
+    values = values[~np.isnan(values)]
+    cents = values * 100
+    return bool(np.all(np.abs(values) < FLOAT32_PRICE_LIMIT) and np.all(np.abs(cents - np.round(cents)) < 1e-6))
+
+def _widen_prices(df):
+    # float32 prices back to their exact 2-decimal float64 values.
+    widened = {col: df[col].astype(np.float64).round(2) for col in PRICE_COLUMNS
+               if col in df.columns and df[col].dtype == np.float32}
+    return df.assign(**widened) if widened else df
+
+def compact_structure(df):
+    # Categoricals, small integers, float32 prices where safe and no ETL-only
+    # text. Safe to run again on a compacted frame, or on concatenated ones.
+    df = _widen_prices(df.drop(columns=ETL_ONLY_COLUMNS, errors='ignore'))
+    compact = {}
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            compact[col] = df[col].astype("category")
+    for col in SMALL_INT_COLUMNS:
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]) and (df[col].dropna() % 1 == 0).all():
+            # Always nullable, so a frame with missing values and one without agree.
+            compact[col] = pd.to_numeric(df[col].astype("Int64"), downcast="integer")
+    # Frames that were not read with STRUCTURE_SCHEMA may still hold prices as text.
+    prices = [col for col in PRICE_COLUMNS if col in df.columns]
+    if all(pd.api.types.is_float_dtype(df[col]) for col in prices) and _prices_fit_float32(df[prices]):
+        compact.update({col: df[col].astype(np.float32) for col in prices})
+    for col in DERIVED_FLOAT_COLUMNS:
+        if col in df.columns and pd.api.types.is_float_dtype(df[col]):
+            compact[col] = df[col].astype(np.float32)
+    return df.assign(**compact)
+
+def concat_structures(parts):
+    # Each part was compacted on its own (own categories, own price check),
+    # so the combined frame is settled again as if it had been one frame. A
+    # column that is empty in one part parses as float there; infer_objects()
+    # lets it settle on the dtype a whole-frame run would give.
+    return compact_structure(pd.concat([_widen_prices(part) for part in parts]).infer_objects())
+
+def memory_report(before, after):
+    # Bytes per column of two versions of a frame (or of memory_usage()
+    # results), largest saving first, with a Total row.
+    before, after = (m.memory_usage(deep=True) if isinstance(m, pd.DataFrame) else m for m in (before, after))
+    report = pd.DataFrame({"before": before, "after": after}).fillna(0).astype(np.int64)
+    report["saved"] = report["before"] - report["after"]
+    report = report.sort_values("saved", ascending=False)
+    report.loc["Total"] = report.sum()
+    return report
+
+def user_kpis(df):
+    # Per-user KPI_COLUMNS sums (int64) plus TargetHitPct, the target hit %
+    # rounded exactly like kpi_percentages() shows it (0 without calls).
+    kpis = summarize_kpis(df, "UserID").astype(np.int64)
+    total = kpis["KpiTotal"].where(kpis["KpiTotal"] > 0)
+    pct = (kpis["KpiTargetHit"] / total * 100).fillna(0)
+    return kpis.assign(TargetHitPct=pct.map(lambda value: round(value, 1)))
+
+def rank_users(kpis, top_n=None, by=None, min_calls=0):
+    # A user_kpis() frame ordered highest first on the `by` columns
+    # (LEADERBOARD_ORDER by default), later ones breaking ties of earlier
+    # ones and UserID order the rest. Users with fewer than min_calls calls
+    # are left out; with top_n only the first top_n are kept, found with a
+    # partial sort.
+    by = list(LEADERBOARD_ORDER if by is None else by)
+    if min_calls:
+        kpis = kpis[kpis["KpiTotal"] >= min_calls]
+    if top_n is not None:
+        return kpis.nlargest(top_n, by, keep="first")
+    return kpis.sort_values(by, ascending=False, kind="stable")
+
+def frame_mb(df):
+    # Shallow size: cheap enough to take around every stage.
+    return float(df.memory_usage(deep=False).sum()) / (1024 * 1024)
+
+def peak_rss_mb():
+    # Peak resident memory of the process so far; None without `resource`
+    # (Windows).
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def merge_stage_reports(reports):
+    # One record per stage for several FetchStructuredData runs (chunks, or
+    # the changed rows of an incremental load), with everything summed.
+    merged = {}
+    for report in reports:
+        for record in report:
+            total = merged.setdefault(record["stage"], dict.fromkeys(record, 0))
+            for key, value in record.items():
+                if key == "stage":
+                    total[key] = value
+                elif value is None or total[key] is None:
+                    total[key] = None
+                else:
+                    total[key] += value
+            total["runs"] = total.get("runs", 0) + 1
+    return list(merged.values())
+
+def log_stage_report(report):
+    for record in report:
+        rss = record["peak_rss_mb_delta"]
+        print(f"⏱️ ETL {record['stage']}: {record['seconds']:.2f}s, {record['rows_in']} → {record['rows_out']} rows, "
+              f"{record['frame_mb_delta']:+.1f} MB frame" + (f", {rss:+.0f} MB peak RSS" if rss is not None else ""))
+    print(f"⏱️ ETL total: {sum(record['seconds'] for record in report):.2f}s over {len(report)} stages.")
+
+def kpi_percentages(counts):
+    total_calls = counts[0]
+    def pct(val):
+        return f"{(val / total_calls * 100):.1f}%" if total_calls else "0.0%"
+    return ["100%" if total_calls else "0%"] + [pct(val) for val in counts[1:]]
+
+def kpi_rows(kpis):
+    # (label, counts, percentages) for each group of a summarize_kpis() frame.
+    return [
+        (label, counts, kpi_percentages(counts))
+        for label, counts in zip(kpis.index, kpis.to_numpy().tolist())
+    ]
+
+def kpi_table_rows(label, counts, percents, label_style, percent_label="%", cell_style=CELL_STYLE):
+    return [
+        html.Tr([html.Td(label, style=label_style)] + [html.Td(val, style=cell_style) for val in counts]),
+        html.Tr([html.Td(percent_label, style=label_style)] + [html.Td(p, style=cell_style) for p in percents]),
+    ]
+
+def kpi_grid(rows, first_label="Period", link_scope=None):
+    # An AG Grid (which virtualizes its rows) for (label, counts, percents)
+    # rows: a counts record and a "%" record per group. With link_scope the
+    # labels link to the details page for that period.
+    data = []
+    for label, counts, percents in rows:
+        if link_scope:
+            label = f"[{label}](/details?scope={link_scope}&period={label})"
+        data.append(dict(label=label, **{f"c{i}": val for i, val in enumerate(counts)}))
+        data.append(dict(label="%", **{f"c{i}": p for i, p in enumerate(percents)}))
+    height = min(KPI_GRID_HEADER_HEIGHT + KPI_GRID_ROW_HEIGHT * len(data), KPI_GRID_MAX_HEIGHT)
+    return dag.AgGrid(
+        columnDefs=kpi_grid_columns(first_label, link_scope),
+        rowData=data,
+        defaultColDef=KPI_GRID_DEFAULT_COLUMN,
+        dashGridOptions=KPI_GRID_OPTIONS,
+        className="kpi-grid",
+        style={"height": f"{height}px", "marginTop": "20px"},
+    )
+
+def period_keys(times):
+    # Integer keys that sort chronologically: Year 2025, MonthKey 202503,
+    # DayKey 20250304 and WeekKey 2025031 (week 1 of March 2025, days 1-7).
+    year = times.dt.year
+    month_key = year * 100 + times.dt.month
+    day = times.dt.day
+    return {"Year": year, "MonthKey": month_key, "DayKey": month_key * 100 + day,
+            "WeekKey": month_key * 10 + (day + 6) // 7}
+
+def period_label(key, time, fmt=None):
+    key = int(key)
+    if time == "yearly":
+        start = pd.Timestamp(key, 1, 1)
+    elif time == "weekly":
+        start = pd.Timestamp(key // 1000, key // 10 % 100, 1)
+        return f"Week {key % 10} {start:%B} {start.year}"
+    elif time == "daily":
+        start = pd.Timestamp(key // 10000, key // 100 % 100, key % 100)
+    else:
+        start = pd.Timestamp(key // 100, key % 100, 1)
+    return start.strftime(fmt or PERIOD_FORMATS.get(time, PERIOD_FORMATS["monthly"]))
+
+def period_key(label, time):
+    # The key of a period_label(), or None if the label is not one.
+    try:
+        start = pd.to_datetime(label, format=PERIOD_FORMATS[time])
+    except (KeyError, ValueError, TypeError):
+        return None
+    return int(period_keys(pd.Series([start]))[PERIOD_KEYS[time]].iloc[0])
+
+def period_labels(keys, time, fmt=None):
+    # Label per row, formatting each distinct key only once.
+    return keys.map({key: period_label(key, time, fmt) for key in keys.dropna().unique()})
+
+def _mentions_any(text, words):
+    mask = pd.Series(False, index=text.index)
+    for word in words:
+        mask |= text.str.contains(word, regex=False)
+    return mask
+
+def call_type_text(df):
+    # Lower-cased "Header StatusDescreption" per call, the text call types are read from.
+    parts = [df[col].astype("str").fillna('') if col in df.columns else pd.Series('', index=df.index, dtype="str")
+             for col in ('Header', 'StatusDescreption')]
+    return (parts[0] + ' ' + parts[1]).str.lower()
+
+def classify_call_types(text, keywords=CALL_TYPE_KEYWORDS, default=DEFAULT_CALL_TYPE):
+    # One pass of a combined pattern finds the texts mentioning any keyword;
+    # only those are then checked keyword by keyword in priority order, each
+    # pass on the texts still unresolved.
+    call_types = pd.Series(default, index=text.index, dtype=object)
+    if not keywords:
+        return call_types
+    pattern = "|".join(re.escape(keyword.lower()) for keyword in keywords)
+    pending = text[text.str.contains(pattern, regex=True, na=False)]
+    for keyword, call_type in keywords.items():
+        if pending.empty:
+            break
+        hit = pending.str.contains(keyword.lower(), regex=False).to_numpy(dtype=bool)
+        call_types.loc[pending.index[hit]] = call_type
+        pending = pending[~hit]
+    return call_types
+
+def _float_or_nan(value):
+    try:
+        return float(value)
+    except Exception:
+        return np.nan
+
+def _scan_loose_price(text):
+    # Last resort for texts without '@' or an exit keyword: the first number
+    # that is not a date, a year, a CE/PE strike or part of a range like "at 826-828".
+    for m in LOOSE_NUMBER_PATTERN.finditer(text):
+        start, end = m.span()
+        next_part = text[end:end+6]
+        if OPTION_SUFFIX_PATTERN.match(text[end:end+2]):
+            continue
+        if next_part.strip().startswith(MONTHS):
+            continue
+        if YEAR_AHEAD_PATTERN.match(next_part):
+            continue
+        if YEAR_PATTERN.fullmatch(m.group(1)):
+            continue
+        if PRICE_RANGE_PATTERN.search(text[max(0, start-10):end+6]):
+            continue
+        return float(m.group(1))
+    return np.nan
 
 class FetchStructuredData:
-    def __init__(self, df):
+    # The steps building self.structure from the raw frame, in order.
+    STAGES = [
+        "clean_structure_data",
+        "add_exit_price_column",
+        "fill_exit_price_from_status",
+        "add_filter_parameter_columns",
+        "add_stop_loss_hit_column",
+        "add_target_hit_column",
+        "add_target_exit_diff_column",
+        "add_stoploss_exit_diff_column",
+        "add_week_str_column",
+        "add_type_column",
+        "add_kpi_indicator_columns",
+        "compact_columns",
+    ]
+
+    def __init__(self, df, instrument=ETL_STAGE_REPORT):
         self.df = df
+        self.structure = df
+        # With instrument on, a record per stage: see _run_stage().
+        self.stage_report = []
+        for stage in self.STAGES:
+            if instrument:
+                self._run_stage(stage)
+            else:
+                getattr(self, stage)()
+
+    def _run_stage(self, stage):
+        rows_in, mb_in, rss_in = len(self.structure), frame_mb(self.structure), peak_rss_mb()
+        start = time.perf_counter()
+        getattr(self, stage)()
+        seconds = time.perf_counter() - start
+        self.stage_report.append({
+            "stage": stage,
+            "seconds": seconds,
+            "rows_in": rows_in,
+            "rows_out": len(self.structure),
+            "frame_mb_delta": frame_mb(self.structure) - mb_in,
+            "peak_rss_mb_delta": None if rss_in is None else peak_rss_mb() - rss_in,
+        })
+
+    def clean_structure_data(self):
         self.structure = self._clean_structure_data(self.df)
-        self.add_exit_price_column()
-        self.fill_exit_price_from_status()
-        self.add_filter_parameter_columns()
-        self.add_stop_loss_hit_column() 
-        self.add_target_hit_column()
-        self.add_target_exit_diff_column()
-        self.add_stoploss_exit_diff_column()
-        self.add_week_str_column()
-        self.add_type_column()
 
     def _clean_structure_data(self, df):
         if df is not None:
             df = df.drop(columns=['RRRValue','CallType', 'Attachment', 'ImageURL','SendTo','CallClosedBy','CallClosedDT'], errors='ignore')
         for col in ['InsertionTime', 'Validity','ModifiedDT']:
             if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=True)
+                df[col] = parse_timestamps(df[col])
                 df = df[(df[col].dt.year > 2024) | ((df[col].dt.year == 2024) & (df[col].dt.month > 11))]
         for col in ['StatusDescreption', 'Header']:
             if col in df.columns:
                 df = df[~df[col].astype(str).str.lower().str.contains('test', na=False)]
         if 'InsertionTime' in df.columns:
-            df['Year'] = df['InsertionTime'].dt.year
-            df['Month'] = df['InsertionTime'].dt.strftime('%B %Y')
+            df = df.assign(**period_keys(df['InsertionTime']))
+            df['Month'] = period_labels(df['MonthKey'], "monthly", "%B %Y")
         df['StatusDescreption'] = df['StatusDescreption'].str.replace(r'@\s+', '@', regex=True)
         return df
 
-    def _extract_price(self, text):
-        if pd.isna(text) or text in ["", "0"]:
-            return None
-        text = str(text).upper()
-        # Try to extract price after '@', including ranges like '@2050-2049' (take the first number)
-        match = re.search(r'@\s*(\d{1,6}(?:\.\d{1,2})?)', text)
-        if match:
-            price_candidate = match.group(1)
-            # Avoid if price_candidate is a year (e.g., 2025, 2024, etc.)
-            if not re.fullmatch(r'20\d{2}', price_candidate):
-                return float(price_candidate)
-        keywords = ['EXIT AT', 'BOOK PROFIT AT', 'SL HIT AT', 'EXIT', 'BOOK PROFIT']
-        for keyword in keywords:
-            pattern = rf'{keyword}\s*(\d{{1,6}}(?:\.\d{{1,2}})?)'
-            match = re.search(pattern, text)
-            if match:
-                price_candidate = match.group(1)
-                if not re.fullmatch(r'20\d{2}', price_candidate):
-                    return float(price_candidate)
-        # Avoid extracting numbers that are followed by a month name or year (to skip dates)
-        months = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
-        # Find all numbers
-        for m in re.finditer(r'(\d{2,6}(?:\.\d{1,2})?)', text):
-            start = m.start()
-            end = m.end()
-            # Get the next few characters after the number
-            next_part = text[end:end+6]
-            prev_part = text[max(0, start-10):start]
-            # Skip if the number is immediately followed by 'CE' or 'PE' (for options commodities)
-            if re.match(r'(CE|PE)', text[end:end+2], re.IGNORECASE):
-                continue
-            # If next part starts with a month or year, skip
-            if any(next_part.strip().startswith(month) for month in months):
-                continue
-            if re.match(r'\s*20\d{2}', next_part):  # skip if year follows
-                continue
-            if re.fullmatch(r'20\d{2}', m.group(1)):
-                continue
-            # Skip if the number is part of a price range (e.g., "at 826-828")
-            if re.search(r'at\s*\d{1,6}\s*-\s*\d{1,6}', prev_part + m.group(0) + next_part, re.IGNORECASE):
-                continue
-            return float(m.group(1))
-        return None
+    def _extract_prices(self, texts):
+        # Column-at-a-time version of the price rules: '@price' first, then the
+        # exit keywords in order, then the first loose number that is not a
+        # date, a year, an option strike or part of a price range.
+        # Object dtype keeps the matching on Python's re, whose \d and \s the
+        # rules were written against (Arrow-backed strings would use RE2).
+        valid = texts.notna() & ~texts.isin(["", "0"])
+        text = texts[valid].astype(str).astype(object).str.upper()
+        prices = pd.Series(np.nan, index=text.index)
+        for pattern in [PRICE_AT_PATTERN] + EXIT_KEYWORD_PATTERNS:
+            pending = prices.isna()
+            if not pending.any():
+                break
+            candidate = text[pending].str.extract(pattern, expand=False).dropna()
+            candidate = candidate[~candidate.str.fullmatch(YEAR_PATTERN)]
+            prices.loc[candidate.index] = candidate.astype(float)
+        pending = prices.isna()
+        if pending.any():
+            prices.loc[pending] = text[pending].map(_scan_loose_price).astype(float)
+        return prices.reindex(texts.index)
+
+    def _fallback_prices(self, values):
+        # Only real numbers count, the same way the row-wise check used isinstance().
+        if pd.api.types.is_numeric_dtype(values):
+            numbers = values.astype(float)
+        else:
+            numbers = values.map(lambda v: float(v) if isinstance(v, (int, float)) else np.nan).astype(float)
+        return numbers.where(numbers != 0)
 
     def add_exit_price_column(self):
         if self.structure is None:
             return
-        mask = self.structure['Status'] == "Closed"
-        exit_prices = []
-        for idx, row in self.structure.iterrows():
-            if not mask.loc[idx]:
-                exit_prices.append(np.nan)
+        closed = self.structure[self.structure['Status'] == "Closed"]
+        exit_price = pd.Series(np.nan, index=closed.index)
+        # First non-zero price wins: StatusDescreption, InternalRemark, CallClosedLTP, LastTradedPrice.
+        for col in ['StatusDescreption', 'InternalRemark', 'CallClosedLTP', 'LastTradedPrice']:
+            pending = exit_price.isna() | (exit_price == 0)
+            if col not in closed.columns or not pending.any():
                 continue
-            price = None
-            for col in ['StatusDescreption', 'InternalRemark']:
-                price = self._extract_price(row.get(col))
-                if price not in [None, 0]:
-                    break
-            if price in [None, 0]:
-                value = row.get('CallClosedLTP')
-                if pd.notna(value) and isinstance(value, (int, float)) and float(value) != 0.0:
-                    price = float(value)
-            if price in [None, 0]:
-                value = row.get('LastTradedPrice')
-                if pd.notna(value) and isinstance(value, (int, float)) and float(value) != 0.0:
-                    price = float(value)
-            exit_prices.append(price if price not in [None, 0] else np.nan)
-        self.structure['ExitPrice'] = exit_prices
+            if col in ['StatusDescreption', 'InternalRemark']:
+                found = self._extract_prices(closed.loc[pending, col])
+            else:
+                found = self._fallback_prices(closed.loc[pending, col])
+            found = found[found.notna() & (found != 0)]
+            exit_price.loc[found.index] = found
+        exit_price = exit_price.where(exit_price != 0)
+        self.structure['ExitPrice'] = exit_price.reindex(self.structure.index)
+
+    def _column(self, col):
+        if col in self.structure.columns:
+            return self.structure[col]
+        return pd.Series(np.nan, index=self.structure.index, dtype=object)
+
+    def _lower_text(self, col):
+        values = self._column(col)
+        return values.astype(str).astype(object).str.lower().where(values.notna(), '')
+
+    def _to_float(self, col):
+        values = self._column(col)
+        if pd.api.types.is_numeric_dtype(values):
+            return values.astype(float)
+        return values.map(_float_or_nan).astype(float)
+
+    def _trade_side(self):
+        return self._column('BuySell').astype(str).astype(object).str.strip().str.upper()
 
     def fill_exit_price_from_status(self):
         if self.structure is None:
             return
-        mask_nan_exit = self.structure['ExitPrice'].isna()
-        for idx, row in self.structure[mask_nan_exit].iterrows():
-            desc_fields = [
-                str(row.get('StatusDescreption', '')).lower() if pd.notna(row.get('StatusDescreption')) else '',
-                str(row.get('InternalRemark', '')).lower() if pd.notna(row.get('InternalRemark')) else ''
-            ]
-            found = False
-            for status_desc in desc_fields:
-                # Check for SL or stop loss or stoploss
-                if any(word in status_desc for word in ['sl', 'stop loss', 'stoploss']):
-                    stop_loss = row.get('StopLoss')
-                    if pd.notna(stop_loss) and stop_loss not in [None, 0, ""]:
-                        self.structure.at[idx, 'ExitPrice'] = stop_loss
-                        found = True
-                        break
-                # Check for Target
-                elif 'target' in status_desc:
-                    target_price = row.get('TargetPrice')
-                    if pd.notna(target_price) and target_price not in [None, 0, ""]:
-                        self.structure.at[idx, 'ExitPrice'] = target_price
-                        found = True
-                        break
-            # If nothing found, leave as NaN
+        exit_price = self.structure['ExitPrice']
+        stop_loss = self._column('StopLoss')
+        target_price = self._column('TargetPrice')
+        stop_loss_ok = stop_loss.notna() & ~stop_loss.isin([0, ""])
+        target_ok = target_price.notna() & ~target_price.isin([0, ""])
+        # StatusDescreption is checked before InternalRemark. In each text a stop
+        # loss mention wins over 'target'; a mention whose price is missing
+        # falls through to the next text.
+        desc = self._lower_text('StatusDescreption')
+        remark = self._lower_text('InternalRemark')
+        desc_sl = _mentions_any(desc, STOP_LOSS_KEYWORDS)
+        desc_target = ~desc_sl & desc.str.contains('target', regex=False)
+        remark_sl = _mentions_any(remark, STOP_LOSS_KEYWORDS)
+        remark_target = ~remark_sl & remark.str.contains('target', regex=False)
+        use_desc_target = desc_target & target_ok
+        use_stop_loss = (desc_sl & stop_loss_ok) | (~use_desc_target & remark_sl & stop_loss_ok)
+        use_target = ~use_stop_loss & (use_desc_target | (remark_target & target_ok))
+        from_status = stop_loss.where(use_stop_loss, target_price.where(use_target))
+        self.structure['ExitPrice'] = exit_price.where(exit_price.notna(), from_status).infer_objects()
 
     def add_filter_parameter_columns(self):
         if self.structure is None:
@@ -149,69 +720,31 @@ class FetchStructuredData:
                 return np.nan
         self.structure['ProfitPriceChange'] = self.structure.apply(calc_profit_price_change, axis=1)
 
+    def _price_hit(self, side, level, exit_price, buy_hit, sell_hit):
+        # 1/0 by trade direction, NaN when a price is missing or the side is unknown.
+        hit = np.select([side == 'BUY', side == 'SELL'], [buy_hit, sell_hit], default=np.nan)
+        return pd.Series(hit, index=self.structure.index).where(level.notna() & exit_price.notna())
+
     def add_stop_loss_hit_column(self):
         if self.structure is None:
             return
-        def check_stop_loss_hit(desc):
-            if pd.isna(desc):
-                return np.nan
-            desc_lower = str(desc).lower()
-            if any(word in desc_lower for word in ['sl', 'stop loss', 'stoploss']):
-                return 1
-            return np.nan
-        self.structure['StopLossHit'] = self.structure['StatusDescreption'].apply(check_stop_loss_hit)
-        mask_nan = self.structure['StopLossHit'].isna()
-        for idx, row in self.structure[mask_nan].iterrows():
-            buy_sell = str(row.get('BuySell', '')).strip().upper()
-            stop_loss = row.get('StopLoss')
-            exit_price = row.get('ExitPrice')
-            if pd.isna(stop_loss) or pd.isna(exit_price):
-                self.structure.at[idx, 'StopLossHit'] = np.nan
-                continue
-            try:
-                stop_loss = float(stop_loss)
-                exit_price = float(exit_price)
-            except Exception:
-                self.structure.at[idx, 'StopLossHit'] = np.nan
-                continue
-            if buy_sell == 'BUY':
-                self.structure.at[idx, 'StopLossHit'] = 1 if stop_loss >= exit_price else 0
-            elif buy_sell == 'SELL':
-                self.structure.at[idx, 'StopLossHit'] = 1 if stop_loss <= exit_price else 0
-            else:
-                self.structure.at[idx, 'StopLossHit'] = np.nan
+        desc = self._column('StatusDescreption')
+        mentioned = desc.notna() & _mentions_any(self._lower_text('StatusDescreption'), STOP_LOSS_KEYWORDS)
+        stop_loss = self._to_float('StopLoss')
+        exit_price = self._to_float('ExitPrice')
+        by_price = self._price_hit(self._trade_side(), stop_loss, exit_price, stop_loss >= exit_price, stop_loss <= exit_price)
+        self.structure['StopLossHit'] = by_price.mask(mentioned, 1.0)
 
     def add_target_hit_column(self):
         if self.structure is None:
             return
-        def check_target_hit(desc):
-            if pd.isna(desc):
-                return np.nan
-            # Case sensitive check for 'Target'
-            if 'Target' in str(desc):
-                return 1
-            return np.nan
-        self.structure['TargetHit'] = self.structure['StatusDescreption'].apply(check_target_hit)
-        mask_nan = self.structure['TargetHit'].isna()
-        for idx, row in self.structure[mask_nan].iterrows():
-            buy_sell = str(row.get('BuySell', '')).strip().upper()
-            target_price = row.get('TargetPrice')
-            exit_price = row.get('ExitPrice')
-            if pd.isna(target_price) or pd.isna(exit_price):
-                self.structure.at[idx, 'TargetHit'] = np.nan
-                continue
-            try:
-                target_price = float(target_price)
-                exit_price = float(exit_price)
-            except Exception:
-                self.structure.at[idx, 'TargetHit'] = np.nan
-                continue
-            if buy_sell == 'BUY':
-                self.structure.at[idx, 'TargetHit'] = 1 if exit_price >= target_price else 0
-            elif buy_sell == 'SELL':
-                self.structure.at[idx, 'TargetHit'] = 1 if exit_price <= target_price else 0
-            else:
-                self.structure.at[idx, 'TargetHit'] = np.nan
+        desc = self._column('StatusDescreption')
+        # Case sensitive check for 'Target'
+        mentioned = desc.notna() & desc.astype(str).astype(object).str.contains('Target', regex=False)
+        target_price = self._to_float('TargetPrice')
+        exit_price = self._to_float('ExitPrice')
+        by_price = self._price_hit(self._trade_side(), target_price, exit_price, exit_price >= target_price, exit_price <= target_price)
+        self.structure['TargetHit'] = by_price.mask(mentioned, 1.0)
 
     def add_target_exit_diff_column(self):
         if self.structure is None:
@@ -252,722 +785,782 @@ class FetchStructuredData:
     def add_week_str_column(self):
         if self.structure is None:
             return
-        if 'InsertionTime' in self.structure.columns:
-            def week_of_month(dt):
-                if pd.isna(dt):
-                    return np.nan
-                first_day = dt.replace(day=1)
-                dom = dt.day
-                return int(np.ceil(dom / 7.0))
-            week = self.structure['InsertionTime'].apply(week_of_month)
-            year = self.structure['InsertionTime'].dt.year
-            month = self.structure['InsertionTime'].dt.strftime('%B')
-            self.structure['WeekStr'] = 'Week ' + week.astype('Int64').astype(str) + ' ' + month + ' ' + year.astype(str)
-            self.structure['WeekNo'] = week.astype('Int64')
+        if 'WeekKey' in self.structure.columns:
+            week_key = self.structure['WeekKey']
+            self.structure['WeekStr'] = period_labels(week_key, "weekly")
+            self.structure['WeekNo'] = (week_key % 10).astype('Int64')
         else:
             print("InsertionTime column not found in the structure data.")
     
     def add_type_column(self):
         if self.structure is None:
             return
-        def get_call_type(row):
-            header = str(row.get('Header', '')).lower()
-            status_desc = str(row.get('StatusDescreption', '')).lower()
-            text = header + ' ' + status_desc
-            if 'momentum' in text:
-                return 'Momentum'
-            elif 'intraday' in text:
-                return 'Intraday'
-            elif 'positional' in text:
-                return 'Positional'
-            elif 'stock of the day' in text:
-                return 'Stock of the day'
-            elif 'btst' in text:
-                return 'BTST'
-            elif 'wealth pick' in text:
-                return 'Wealth pick'
-            else:
-                return 'Anonymous'
-        self.structure['callType'] = self.structure.apply(get_call_type, axis=1)
+        self.structure['callType'] = classify_call_types(call_type_text(self.structure))
         
+    def add_kpi_indicator_columns(self):
+        if self.structure is None:
+            return
+        df = self.structure
+        side = df['BuySell'].str.upper()
+        buy = side == "BUY"
+        sell = side == "SELL"
+        closed = df['ExitPrice'].notna()
+        neither = closed & (df['TargetHit'] != 1) & (df['StopLossHit'] != 1)
+        open_ = df['ExitPrice'].isna()
+        exit_price, price, ltp = df['ExitPrice'], df['Price'], df['LastTradedPrice']
+        indicators = {
+            "KpiTotal": pd.Series(True, index=df.index),
+            "KpiTargetHit": df['TargetHit'] == 1,
+            "KpiStopLossHit": df['StopLossHit'] == 1,
+            "KpiClosedPositive": neither & ((buy & (exit_price > price)) | (sell & (exit_price < price))),
+            "KpiClosedNegative": neither & ((buy & (exit_price < price)) | (sell & (exit_price > price))),
+            "KpiClosedRedundant": neither & (buy | sell) & (exit_price == price),
+            "KpiClosed": closed,
+            "KpiOpenPositive": open_ & ((buy & (ltp > price)) | (sell & (ltp < price))),
+            "KpiOpenNegative": open_ & ((buy & (ltp < price)) | (sell & (ltp > price))),
+            "KpiOpenRedundant": open_ & (buy | sell) & (ltp == price),
+            "KpiOpen": open_,
+        }
+        for col in KPI_COLUMNS:
+            self.structure[col] = indicators[col].astype(bool)
+
+    def compact_columns(self):
+        if self.structure is None:
+            return
+        self.memory_before = self.structure.memory_usage(deep=True)
+        self.structure = compact_structure(self.structure)
+
+    def memory_report(self):
+        return memory_report(self.memory_before, self.structure)
+
     def get_structure(self):
         return self.structure
     
+class StructureCache:
+    # The cleaned structure frame (plus the raw row hashes used by incremental
+    # reloads) stored as uncompressed Arrow IPC files, keyed by a fingerprint
+    # of the source CSV bytes and the ETL code. A warm start memory-maps the
+    # files instead of parsing the CSV and running FetchStructuredData.
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        self.enabled = pa is not None
+        if not self.enabled:
+            print("ℹ️ pyarrow is not installed, structure cache disabled.")
+
+    @staticmethod
+    def fingerprint(source_bytes):
+        return StructureCache.finish_fingerprint(hashlib.sha256(source_bytes))
+
+    @staticmethod
+    def finish_fingerprint(digest):
+        # For callers hashing the source incrementally while streaming it.
+        digest.update(ETL_CODE_VERSION.encode())
+        return digest.hexdigest()[:32]
+
+    def _paths(self, fingerprint):
+        return (os.path.join(self.directory, f"structure-{fingerprint}.arrow"),
+                os.path.join(self.directory, f"rowhash-{fingerprint}.arrow"))
+
+    def load(self, fingerprint):
+        if not self.enabled:
+            return None
+        structure_path, hash_path = self._paths(fingerprint)
+        if not os.path.exists(structure_path):
+            return None
+        try:
+            df = feather.read_table(structure_path, memory_map=True).to_pandas()
+            row_hashes = None
+            if os.path.exists(hash_path):
+                hashes = feather.read_table(hash_path, memory_map=True).to_pandas()
+                row_hashes = pd.Series(hashes["RowHash"].to_numpy(), index=hashes["StructuredCallEntryID"].to_numpy())
+            return df, row_hashes
+        except Exception as e:
+            print("⚠️ Ignoring unreadable structure cache:", e)
+            return None
+
+    def save(self, fingerprint, df, row_hashes=None):
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            structure_path, hash_path = self._paths(fingerprint)
+            self._write(pa.Table.from_pandas(df, preserve_index=True), structure_path)
+            if row_hashes is not None:
+                hashes = pd.DataFrame({"StructuredCallEntryID": row_hashes.index, "RowHash": row_hashes.to_numpy()})
+                self._write(pa.Table.from_pandas(hashes, preserve_index=False), hash_path)
+            # Only the latest fingerprint is worth keeping.
+            for path in glob.glob(os.path.join(self.directory, "*.arrow")):
+                if fingerprint not in os.path.basename(path):
+                    os.remove(path)
+        except Exception as e:
+            print("⚠️ Could not write structure cache:", e)
+
+    def _write(self, table, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+
+class CallFilterIndex:
+    # Row positions for the date range / UserID / Exchange / ExchSegment filters
+    # every query applies. Dates are looked up in an InsertionTime-sorted
+    # permutation with searchsorted, the other columns in per-value position
+    # lists. The smallest candidate set is then checked against the remaining
+    # predicates once, so a query costs about the size of its result.
+    CATEGORY_COLUMNS = ['UserID', 'Exchange', 'ExchSegment']
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.time_order = None
+        if 'InsertionTime' in df.columns:
+            times = df['InsertionTime'].to_numpy()
+            dated = np.flatnonzero(~pd.isna(times))
+            self.time_order = dated[np.argsort(times[dated], kind='stable')]
+            self.sorted_times = pd.DatetimeIndex(times[self.time_order])
+            # Rank of every row in time order, -1 for rows without a time.
+            self.time_rank = np.full(self.size, -1, dtype=np.int64)
+            self.time_rank[self.time_order] = np.arange(len(self.time_order))
+        self.categories = {}
+        for col in self.CATEGORY_COLUMNS:
+            if col in df.columns:
+                codes, uniques = pd.factorize(df[col])
+                order = np.argsort(codes, kind='stable')
+                bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+                self.categories[col] = (codes, uniques, order, bounds)
+
+    def _time_range(self, start_date, end_date):
+        lo = 0 if start_date is None else self.sorted_times.searchsorted(start_date, side='left')
+        hi = len(self.time_order) if end_date is None else self.sorted_times.searchsorted(end_date, side='right')
+        return lo, max(lo, hi)
+
+    def _wanted_codes(self, col, values):
+        codes = self.categories[col][1].get_indexer(pd.Index(values).unique())
+        return codes[codes >= 0]
+
+    def positions(self, start_date=None, end_date=None, userid=None, exchange=None, exch_segment=None):
+        # Sorted row positions matching every given filter, or None when no
+        # filter applies. Empty exchange/segment lists mean "no filter".
+        if start_date is not None or end_date is not None:
+            if self.time_order is None:
+                raise KeyError('InsertionTime')
+            time_range = self._time_range(start_date, end_date)
+        else:
+            time_range = None
+        wanted = {}
+        for col, values in (('UserID', None if userid is None else [userid]),
+                            ('Exchange', exchange), ('ExchSegment', exch_segment)):
+            if values is not None and len(values) > 0:
+                if col not in self.categories:
+                    raise KeyError(col)
+                wanted[col] = self._wanted_codes(col, values)
+        if time_range is None and not wanted:
+            return None
+
+        # Drive from the smallest candidate set.
+        sizes = {col: int(sum(self.categories[col][3][c + 1] - self.categories[col][3][c] for c in codes))
+                 for col, codes in wanted.items()}
+        if time_range is not None:
+            sizes['InsertionTime'] = time_range[1] - time_range[0]
+        driver = min(sizes, key=sizes.get)
+        if driver == 'InsertionTime':
+            positions = self.time_order[time_range[0]:time_range[1]]
+        else:
+            _, _, order, bounds = self.categories[driver]
+            positions = np.concatenate([order[bounds[c]:bounds[c + 1]] for c in wanted[driver]] or [np.empty(0, dtype=np.intp)])
+
+        keep = np.ones(len(positions), dtype=bool)
+        if time_range is not None and driver != 'InsertionTime':
+            rank = self.time_rank[positions]
+            keep &= (rank >= time_range[0]) & (rank < time_range[1])
+        for col, codes in wanted.items():
+            if col != driver:
+                keep &= np.isin(self.categories[col][0][positions], codes)
+        return np.sort(positions[keep])
+
+class CallCube:
+    # Counts of every KPI_COLUMNS and GET_DATA_ROWS indicator per
+    # day x UserID x Exchange x ExchSegment x callType, built once per loaded
+    # frame. A cell's InsertionTime is its day for calls placed exactly at
+    # midnight and day + 1ns for the rest. Bounds on a day boundary (the
+    # date pickers' midnight start and end, or a period's end_time) then
+    # select exactly the calls the raw >= / <= comparisons would.
+    DIMENSIONS = ['InsertionTime', 'UserID', 'Exchange', 'ExchSegment', 'callType']
+
+    def __init__(self, df):
+        self.frame = None
+        if df.empty or any(col not in df.columns for col in self.DIMENSIONS + GET_DATA_INPUTS + KPI_COLUMNS):
+            return
+        times = df['InsertionTime'].dt.as_unit('ns')
+        day = times.dt.normalize()
+        cell_time = day.where(times == day, day + pd.Timedelta(1, 'ns'))
+        measures = pd.concat([df[KPI_COLUMNS], get_data_indicators(df)], axis=1)
+        keys = [cell_time] + [df[col] for col in self.DIMENSIONS[1:]]
+        self.frame = measures.groupby(keys, dropna=False, observed=True).sum().reset_index()
+        # Cells carry the same integer period keys as the calls.
+        self.frame = self.frame.assign(**period_keys(self.frame['InsertionTime']))
+        self.index = CallFilterIndex(self.frame)
+
+    @staticmethod
+    def _on_day_boundary(start_date, end_date):
+        def midnight(ts):
+            return ts == ts.normalize()
+        start_ok = start_date is None or midnight(start_date)
+        end_ok = end_date is None or midnight(end_date) or midnight(end_date + pd.Timedelta(1, 'ns'))
+        return start_ok and end_ok
+
+    def select(self, start_date=None, end_date=None, userid=None, exchange=None, exch_segment=None):
+        # Matching cells, or None when the bounds split a day and only the
+        # raw calls can answer.
+        if self.frame is None or not self._on_day_boundary(start_date, end_date):
+            return None
+        positions = self.index.positions(start_date, end_date, userid, exchange, exch_segment)
+        return self.frame.copy(deep=False) if positions is None else self.frame.iloc[positions]
+
+def approx_bytes(value):
+    # Rough memory of a query result: frames by their deep memory usage,
+    # containers by their items, anything else by sys.getsizeof().
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_bytes(key) + approx_bytes(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        if value and not isinstance(value[0], (dict, list, tuple, pd.DataFrame, pd.Series)):
+            # Flat lists (the clientside payload's codes) are sized from their first item.
+            return sys.getsizeof(value) + len(value) * sys.getsizeof(value[0])
+        return sys.getsizeof(value) + sum(approx_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+class QueryCache:
+    # Bounded LRU of query results for a single data version. The first lookup
+    # made with a newer version drops everything cached for the old one. The
+    # least recently used results go once there are more than max_entries or
+    # they add up to more than max_bytes; a result bigger than that on its
+    # own is not cached at all.
+    def __init__(self, max_entries=QUERY_CACHE_SIZE, max_bytes=QUERY_CACHE_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = None
+        # key -> (result, approx_bytes(result))
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version, key):
+        with self.lock:
+            if version != self.version:
+                self._clear()
+                self.version = version
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key][0]
+            self.misses += 1
+            return False, None
+
+    def put(self, version, key, value):
+        size = approx_bytes(value)
+        with self.lock:
+            if version != self.version or size > self.max_bytes:
+                return
+            if key in self.entries:
+                self.bytes -= self.entries[key][1]
+            self.entries[key] = (value, size)
+            self.entries.move_to_end(key)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                self.bytes -= self.entries.popitem(last=False)[1][1]
+
+    def _clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def clear(self):
+        with self.lock:
+            self._clear()
+
+def _normalize_query_arg(name, value):
+    if value is None:
+        return None
+    if name in ("start_date", "end_date"):
+        return pd.Timestamp(value)
+    if name in ("exchange", "exch_segment") and not isinstance(value, str):
+        # Order and repeats don't change an isin() filter; empty means no filter.
+        return tuple(sorted(set(value), key=str)) or None
+    if name == "userid":
+        return str(value)
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+def cached_query(method):
+    # Memoizes a backend_sender query on its normalized filters and the data
+    # version. Results are shared between callers, so they must not be mutated.
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        version = self.version
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(
+            _normalize_query_arg(name, value) for name, value in list(bound.arguments.items())[1:]
+        )
+        found, result = self.query_cache.get(version, key)
+        if found:
+            return result
+        result = method(self, *args, **kwargs)
+        # Versions only go up, so an unchanged version means the method read
+        # that version's snapshot and not one published while it ran.
+        if self.version == version:
+            self.query_cache.put(version, key, result)
+        return result
+    return wrapper
+
+class DataSnapshot:
+    # Everything a query reads, published as one object. A query takes a
+    # single reference and keeps using it, so a refresh swapping in new data
+    # never changes anything under a running callback. The frame itself is
+    # never handed out: df and calls() return new frame objects over the same
+    # columns, so whatever a reader does to its frame stays with that reader
+    # and no reader needs a defensive copy. That relies on Copy-on-Write, the
+    # default from pandas 3. It is not switched on here for older pandas, as
+    # the option is process-wide; there, readers must not write in place.
+    def __init__(self, df, version):
+        self._df = df
+        self.version = version
+        self.loaded_at = time.time()
+        # Seconds from the start of the reload (download included) to publish.
+        self.load_seconds = None
+        self.index = CallFilterIndex(df)
+        self.cube = CallCube(df)
+
+    @property
+    def df(self):
+        return self._df.copy(deep=False)
+
+    def calls(self, start_date=None, end_date=None, exchange=None, exch_segment=None, userid=None):
+        # Position-based selection of the calls matching the filters.
+        positions = self.index.positions(start_date, end_date, userid, exchange, exch_segment)
+        return self.df if positions is None else self._df.iloc[positions]
+
 class backend_sender:
-    def __init__(self, file_url=None):
+    def __init__(self, file_url=None, incremental=True, use_cache=True, chunk_rows=INGEST_CHUNK_ROWS):
         # Google Drive download link
         if file_url is None:
-            file_url = "https://drive.google.com/uc?export=download&id=1AQu8o0w1I4qr1IO6AHi8BsBjA8a6k28e"
-        self.df = self.load_csv_from_drive(file_url)
-        self.columns = [
-            "Total Calls", "Target Hit", "StopLoss Hit",
-            "Neither target nor Stop loss hit - Positive",
-            "Neither target nor Stop loss hit - Negative",
-            "Neither target nor Stop loss hit - Redundant",
-            "Total Closed Calls",
-            "Open Calls - Positive", "Open Calls - Negative", "Open Calls - Redundant",
-            "Total Open Calls"
-        ]
+            file_url = DRIVE_FILE_URL
+        self.file_url = file_url
+        # The version is bumped every time a new snapshot is published, so
+        # anything derived from the data can tell whether it is stale.
+        self.snapshot = DataSnapshot(pd.DataFrame(), 0)
+        # With incremental on, a reload only runs FetchStructuredData on calls
+        # whose raw row hash changed since the previous load.
+        self.incremental = incremental
+        self._row_hashes = None
+        # With chunk_rows set, the download is streamed to a temp file and the
+        # ETL runs chunk by chunk instead of on one full raw frame.
+        self.chunk_rows = chunk_rows
+        self.cache = StructureCache() if use_cache else None
+        # merge_stage_reports() of the last load that ran the ETL; see
+        # ETL_STAGE_REPORT.
+        self.etl_report = []
+        self._stage_reports = []
+        self.query_cache = QueryCache()
+        self.columns = GET_DATA_ROWS
+        # Validators of the last successful download, for conditional requests.
+        self._etag = None
+        self._last_modified = None
+        self._source_fingerprint = None
+        self._reload_lock = threading.Lock()
+        # Called with the new version after each published snapshot but the
+        # first (gunicorn.conf.py uses it to re-fork the workers).
+        self.on_publish = []
+        self._refresher = None
+        self._stop_refresh = threading.Event()
+        self.reload()
+
+    @property
+    def df(self):
+        return self.snapshot.df
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    def reload(self):
+        # Everything up to the swap (download, ETL, index and cube) happens
+        # before the new snapshot is published with a single assignment. The
+        # on_publish callbacks run once the lock is released, so nothing they
+        # trigger (gunicorn forking workers) sees it held.
+        with self._reload_lock:
+            start = time.perf_counter()
+            df = self.load_csv_from_drive(self.file_url)
+            if df is None:
+                return self.version
+            snapshot = DataSnapshot(df, self.snapshot.version + 1)
+            snapshot.load_seconds = time.perf_counter() - start
+            self.snapshot = snapshot
+        for callback in self.on_publish:
+            try:
+                callback(snapshot.version)
+            except Exception as e:
+                print("⚠️ Publish callback failed:", e)
+        return snapshot.version
+
+    def start_refresher(self, interval=REFRESH_INTERVAL_SECONDS):
+        if interval <= 0 or self._refresher is not None:
+            return
+        def refresh_loop():
+            while not self._stop_refresh.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    print("❌ Background refresh failed:", e)
+        self._refresher = threading.Thread(target=refresh_loop, name="structure-refresher", daemon=True)
+        self._refresher.start()
+        print(f"🔄 Refreshing structure data every {interval}s in the background.")
+
+    def stop_refresher(self):
+        self._stop_refresh.set()
 
     def load_csv_from_drive(self, url):
+        # Returns the cleaned frame, or None when the current snapshot should
+        # stay: the source is unchanged, or the download failed after data was
+        # already loaded.
         try:
-            response = requests.get(url)
+            headers = {}
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+            response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS, stream=bool(self.chunk_rows))
+            if response.status_code == 304:
+                print("✅ CSV not modified, keeping current data.")
+                return None
             response.raise_for_status()
-            df = pd.read_csv(io.StringIO(response.text))
-            print("✅ CSV Loaded Successfully from Google Drive.")
-            return FetchStructuredData(df).get_structure()
+            body = None
+            try:
+                # Drive does not always send validators, so the content hash is
+                # the fallback check.
+                if self.chunk_rows:
+                    body, fingerprint = self._spool_response(response)
+                else:
+                    fingerprint = StructureCache.fingerprint(response.content)
+                if fingerprint == self._source_fingerprint:
+                    # New validators for the same bytes still have to be kept,
+                    # or every later check downloads the file again.
+                    self._store_validators(response)
+                    print("✅ CSV unchanged, keeping current data.")
+                    return None
+                cached = self.cache.load(fingerprint) if self.cache else None
+                if cached is not None:
+                    df, self._row_hashes = cached
+                    print("⚡ Loaded cleaned data from cache, ETL skipped.")
+                else:
+                    if body is not None:
+                        df = self._run_etl_chunked(body)
+                    else:
+                        df = read_structure_csv(io.StringIO(response.text))
+                        print("✅ CSV Loaded Successfully from Google Drive.")
+                        df = self._run_etl(df)
+                    if self.cache:
+                        self.cache.save(fingerprint, df, self._row_hashes)
+            finally:
+                if body is not None:
+                    body.close()
+            self._store_validators(response)
+            self._source_fingerprint = fingerprint
+            return df
         except Exception as e:
             print("❌ Failed to load CSV from Google Drive:", e)
+            if not self.df.empty:
+                return None
+            self._row_hashes = None
             return pd.DataFrame()
 
+    def _store_validators(self, response):
+        self._etag = response.headers.get("ETag")
+        self._last_modified = response.headers.get("Last-Modified")
+
+    def _spool_response(self, response):
+        # Streams the body to a temp file, hashing it on the way, so the raw
+        # bytes are never held in memory as one string.
+        body = tempfile.TemporaryFile()
+        digest = hashlib.sha256()
+        for block in response.iter_content(chunk_size=1 << 20):
+            digest.update(block)
+            body.write(block)
+        body.seek(0)
+        return body, StructureCache.finish_fingerprint(digest)
+
+    def _run_etl(self, raw):
+        self._stage_reports = []
+        structure, self._row_hashes, changed = self._etl_rows(raw, *self._previous_load())
+        if changed is not None:
+            print(f"🔁 Incremental ETL: {changed} new or changed calls out of {len(raw)}.")
+        self._publish_stage_report()
+        return structure
+
+    def _run_etl_chunked(self, body):
+        # Every ETL stage works row by row, so each chunk is cleaned on its own
+        # and only the derived frames are kept. Rows keep their CSV position as
+        # the index, exactly like a whole-file run.
+        self._stage_reports = []
+        previous_hashes, previous = self._previous_load()
+        parts, hashes, rows, changed = [], [], 0, 0
+        for raw in read_structure_csv(body, chunksize=self.chunk_rows):
+            structure, chunk_hashes, chunk_changed = self._etl_rows(raw, previous_hashes, previous)
+            parts.append(structure)
+            hashes.append(chunk_hashes)
+            rows += len(raw)
+            changed = None if chunk_changed is None or changed is None else changed + chunk_changed
+        print(f"✅ CSV streamed from Google Drive in {len(parts)} chunks of up to {self.chunk_rows} rows.")
+        if changed is not None:
+            print(f"🔁 Incremental ETL: {changed} new or changed calls out of {rows}.")
+        self._publish_stage_report()
+        self._row_hashes = None
+        if parts and all(h is not None for h in hashes):
+            row_hashes = pd.concat(hashes)
+            if not row_hashes.index.duplicated().any():
+                self._row_hashes = row_hashes
+        if not parts:
+            return pd.DataFrame()
+        return concat_structures(parts)
+
+    def _fetch_structure(self, raw):
+        etl = FetchStructuredData(raw)
+        self._stage_reports.append(etl.stage_report)
+        return etl.get_structure()
+
+    def _publish_stage_report(self):
+        report = merge_stage_reports(self._stage_reports)
+        if report:
+            self.etl_report = report
+            log_stage_report(report)
+
+    def _previous_load(self):
+        if not self.incremental or self.df.empty:
+            return None, None
+        return self._row_hashes, self.df
+
+    def _etl_rows(self, raw, previous_hashes, previous):
+        # (structure, raw row hashes, number of rows re-derived) for a raw frame
+        # or chunk. Rows whose hash matches previous_hashes are reused from
+        # previous; changed is None when nothing could be reused.
+        ids = raw['StructuredCallEntryID'] if 'StructuredCallEntryID' in raw.columns else None
+        if ids is None or ids.isna().any() or ids.duplicated().any():
+            return self._fetch_structure(raw), None, None
+        hashes = pd.Series(pd.util.hash_pandas_object(raw, index=False).to_numpy(), index=ids.to_numpy())
+        if previous_hashes is None:
+            return self._fetch_structure(raw), hashes, None
+
+        known = hashes.index.isin(previous_hashes.index)
+        unchanged = np.zeros(len(raw), dtype=bool)
+        unchanged[known] = previous_hashes.loc[hashes.index[known]].to_numpy() == hashes.to_numpy()[known]
+
+        # Rows are labelled by their position in the raw CSV, exactly like a full
+        # run, so reused and freshly derived rows slot back into the same order.
+        kept = previous[previous['StructuredCallEntryID'].isin(hashes.index[unchanged])]
+        kept = kept.set_axis(raw.index[hashes.index.get_indexer(kept['StructuredCallEntryID'])])
+        parts = [kept]
+        if (~unchanged).any():
+            parts.append(self._fetch_structure(raw[~unchanged]))
+        return concat_structures(parts).sort_index(), hashes, int((~unchanged).sum())
+
     def user_id_sender(self):
         df = self.df
         if df.empty or 'UserID' not in df.columns:
             return []
         return df['UserID'].dropna().unique().tolist()
 
-    def get_data(self, start_date=None, end_date=None, exchange=None, exch_segment=None):
-        df = self.df
-        if start_date is not None:
-            df['InsertionTime'] = pd.to_datetime(df['InsertionTime'], errors='coerce')
-            df = df[df['InsertionTime'] >= pd.to_datetime(start_date)]
-        if end_date is not None:
-            df = df[df['InsertionTime'] <= pd.to_datetime(end_date)]
-        if exchange is not None and len(exchange) > 0:
-            df = df[df['Exchange'].isin(exchange)]
-        if exch_segment is not None and len(exch_segment) > 0:
-            df = df[df['ExchSegment'].isin(exch_segment)]
-        columns = self.columns
-        data = pd.DataFrame(0, index=columns, columns=["Count"])
-        data.loc["Total Calls", "Count"] = df["StructuredCallEntryID"].count()
-        data.loc["Target Hit", "Count"] = df[df["TargetHit"] == 1]["StructuredCallEntryID"].count()
-        data.loc["StopLoss Hit", "Count"] = df[df["StopLossHit"] == 1]["StructuredCallEntryID"].count()
-        data.loc["Neither target nor Stop loss hit - Positive", "Count"] = df[(df["TargetHit"] == 0) & (df["StopLossHit"] == 0) & (df["ProfitPriceChange"] > 0)]["StructuredCallEntryID"].count()
-        data.loc["Neither target nor Stop loss hit - Negative", "Count"] = df[(df["TargetHit"] == 0) & (df["StopLossHit"] == 0) & (df["ProfitPriceChange"] < 0)]["StructuredCallEntryID"].count()
-        data.loc["Neither target nor Stop loss hit - Redundant", "Count"] = df[(df["TargetHit"] == 0) & (df["StopLossHit"] == 0) & (df["ProfitPriceChange"] == 0)]["StructuredCallEntryID"].count()
-        data.loc["Total Closed Calls", "Count"] = df[df["Status"] == "Closed"]["StructuredCallEntryID"].count()
-        data.loc["Open Calls - Positive", "Count"] = df[
-            (df["Status"] == "Open") &
-            (
-                ((df["BuySell"].str.upper() == "BUY") & (df["Price"] > df["LastTradedPrice"])) |
-                ((df["BuySell"].str.upper() == "SELL") & (df["Price"] < df["LastTradedPrice"]))
-            )
-        ]["StructuredCallEntryID"].count()
-        data.loc["Open Calls - Negative", "Count"] = df[
-            (df["Status"] == "Open") &
-            (
-                ((df["BuySell"].str.upper() == "BUY") & (df["Price"] < df["LastTradedPrice"])) |
-                ((df["BuySell"].str.upper() == "SELL") & (df["Price"] > df["LastTradedPrice"]))
-            )
-        ]["StructuredCallEntryID"].count()
-        data.loc["Open Calls - Redundant", "Count"] = df[
-            (df["Status"] == "Open") &
-            (df["Price"] == df["LastTradedPrice"])
-        ]["StructuredCallEntryID"].count()
-        data.loc["Total Open Calls", "Count"] = df[df["Status"] == "Open"]["StructuredCallEntryID"].count()
-        
+    def filter_calls(self, start_date=None, end_date=None, exchange=None, exch_segment=None, userid=None, snapshot=None):
+        snapshot = snapshot or self.snapshot
+        return snapshot.calls(
+            None if start_date is None else pd.to_datetime(start_date),
+            None if end_date is None else pd.to_datetime(end_date),
+            exchange, exch_segment, userid,
+        )
+
+    @cached_query
+    def selection(self, start_date=None, end_date=None, exchange=None, exch_segment=None, userid=None):
+        # The rows every summary of one filter set aggregates from: cube cells
+        # when the date bounds fall on day boundaries, raw calls otherwise.
+        # Both carry InsertionTime, callType and the KPI_COLUMNS. Cached per
+        # filter set and version, so the tables of a page share one filter
+        # pass (see the pages' filter stage callbacks).
+        start_date = None if start_date is None else pd.to_datetime(start_date)
+        end_date = None if end_date is None else pd.to_datetime(end_date)
+        snapshot = self.snapshot
+        cells = snapshot.cube.select(start_date, end_date, userid, exchange, exch_segment)
+        if cells is not None:
+            return cells
+        return self.filter_calls(start_date, end_date, exchange, exch_segment, userid=userid, snapshot=snapshot)
+
+    def _count_table(self, df):
+        counts = df[GET_DATA_ROWS].sum() if GET_DATA_ROWS[0] in df.columns else get_data_indicators(df).sum()
+        data = pd.DataFrame({"Count": counts.to_numpy(dtype=np.int64)}, index=self.columns)
         total_calls = data.loc["Total Calls", "Count"]
         if total_calls == 0:
             data["Percentage(%)"] = 0
         else:
             data["Percentage(%)"] = (data["Count"] / total_calls * 100).round(1).astype(str) + ' %'
         return data
-    
-    def get_data_filter_id(self, userid= None, start_date=None, end_date=None, exchange=None, exch_segment=None):
-        df = self.df
-        if userid is not None and len(userid) > 0:
-            df = df[df['UserID'] == int(userid)]
-        if start_date is not None:
-            df = df[df['InsertionTime'] >= pd.to_datetime(start_date)]
-        if end_date is not None:
-            df = df[df['InsertionTime'] <= pd.to_datetime(end_date)]
-        if exchange is not None and len(exchange) > 0:
-            df = df[df['Exchange'].isin(exchange)]
-        if exch_segment is not None and len(exch_segment) > 0:
-            df = df[df['ExchSegment'].isin(exch_segment)]
-        columns = self.columns
-        data = pd.DataFrame(0, index=columns, columns=["Count"])
-        data.loc["Total Calls", "Count"] = df["StructuredCallEntryID"].count()
-        data.loc["Target Hit", "Count"] = df[df["TargetHit"] == 1]["StructuredCallEntryID"].count()
-        data.loc["StopLoss Hit", "Count"] = df[df["StopLossHit"] == 1]["StructuredCallEntryID"].count()
-        data.loc["Neither target nor Stop loss hit - Positive", "Count"] = df[(df["TargetHit"] == 0) & (df["StopLossHit"] == 0) & (df["ProfitPriceChange"] > 0)]["StructuredCallEntryID"].count()
-        data.loc["Neither target nor Stop loss hit - Negative", "Count"] = df[(df["TargetHit"] == 0) & (df["StopLossHit"] == 0) & (df["ProfitPriceChange"] < 0)]["StructuredCallEntryID"].count()
-        data.loc["Neither target nor Stop loss hit - Redundant", "Count"] = df[(df["TargetHit"] == 0) & (df["StopLossHit"] == 0) & (df["ProfitPriceChange"] == 0)]["StructuredCallEntryID"].count()
-        data.loc["Total Closed Calls", "Count"] = df[df["Status"] == "Closed"]["StructuredCallEntryID"].count()
-        data.loc["Open Calls - Positive", "Count"] = df[
-            (df["Status"] == "Open") &
-            (
-                ((df["BuySell"].str.upper() == "BUY") & (df["Price"] > df["LastTradedPrice"])) |
-                ((df["BuySell"].str.upper() == "SELL") & (df["Price"] < df["LastTradedPrice"]))
-            )
-        ]["StructuredCallEntryID"].count()
-        data.loc["Open Calls - Negative", "Count"] = df[
-            (df["Status"] == "Open") &
-            (
-                ((df["BuySell"].str.upper() == "BUY") & (df["Price"] < df["LastTradedPrice"])) |
-                ((df["BuySell"].str.upper() == "SELL") & (df["Price"] > df["LastTradedPrice"]))
-            )
-        ]["StructuredCallEntryID"].count()
-        data.loc["Open Calls - Redundant", "Count"] = df[
-            (df["Status"] == "Open") &
-            (df["Price"] == df["LastTradedPrice"])
-        ]["StructuredCallEntryID"].count()
-        data.loc["Total Open Calls", "Count"] = df[df["Status"] == "Open"]["StructuredCallEntryID"].count()
-        
-        total_calls = data.loc["Total Calls", "Count"]
-        if total_calls == 0:
-            data["Percentage(%)"] = 0
-        else:
-            data["Percentage(%)"] = (data["Count"] / total_calls * 100).round(1).astype(str) + ' %'
-        return data
-    
-    def generate_timely_summary_rows(self, start_date=None, end_date=None, exchange=None, exch_segment=None, time=None):
-        df = self.df
-        if start_date is not None:
-            df = df[df['InsertionTime'] >= pd.to_datetime(start_date)]
-        if end_date is not None:
-            df = df[df['InsertionTime'] <= pd.to_datetime(end_date)]
-        if exchange is not None and len(exchange) > 0:
-            df = df[df['Exchange'].isin(exchange)]
-        if exch_segment is not None and len(exch_segment) > 0:
-            df = df[df['ExchSegment'].isin(exch_segment)]
-        df["InsertionTime"] = pd.to_datetime(df["InsertionTime"], errors="coerce")
-        if time == "yearly":
-            df["MonthPeriod"] = df["InsertionTime"].dt.strftime("%Y")
-        elif time == "monthly":
-            df["MonthPeriod"] = df["InsertionTime"].dt.strftime("%B-%Y")
-        elif time == "daily": 
-            df["MonthPeriod"] = df["InsertionTime"].dt.strftime("%d-%b-%Y")
 
-        rows = []
-
-        for period, sub_df in df.groupby("MonthPeriod"):
-            total_calls = len(sub_df)
-            target_hit = (sub_df["TargetHit"] == 1).sum()
-            stoploss_hit = (sub_df["StopLossHit"] == 1).sum()
-
-            closed = sub_df[sub_df["ExitPrice"].notna()]
-            neither_df = closed[(closed["TargetHit"] != 1) & (closed["StopLossHit"] != 1)]
-            n_pos = (
-                ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] > neither_df["Price"])) |
-                ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] < neither_df["Price"]))
-            ).sum()
-
-            n_neg = (
-                ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] < neither_df["Price"])) |
-                ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] > neither_df["Price"]))
-            ).sum()
-
-            n_red = (
-                ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] == neither_df["Price"])) |
-                ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] == neither_df["Price"]))
-            ).sum()
-
-            open_df = sub_df[sub_df["ExitPrice"].isna()]
-            o_pos = (
-                ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] > open_df["Price"])) |
-                ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] < open_df["Price"]))
-            ).sum()
-
-            o_neg = (
-                ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] < open_df["Price"])) |
-                ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] > open_df["Price"]))
-            ).sum()
-
-            o_red = (
-                ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] == open_df["Price"])) |
-                ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] == open_df["Price"]))
-            ).sum()
-
-            total_closed = len(closed)
-            total_open = len(open_df)
-
-            count_row = html.Tr([
-                html.Td(period, style={"border": "1px solid #000000", "fontWeight": "bold"}),
-                html.Td(total_calls,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(target_hit,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(stoploss_hit,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(n_pos,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(n_neg,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(n_red,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(total_closed,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(o_pos,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(o_neg,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(o_red,style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(total_open,style={"border": "1px solid #000000","textAlign": "right"}),
-            ])
-
-            def pct(val):
-                return f"{(val / total_calls * 100):.1f}%" if total_calls else "0.0%"
-
-            percent_row = html.Tr([
-                html.Td("%",style={"border": "1px solid #000000","fontWeight": "bold"}),
-                html.Td("100%" if total_calls else "0%",style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(target_hit),style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(stoploss_hit),style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(n_pos),style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(n_neg),style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(n_red),style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(total_closed),style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(o_pos),style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(o_neg),style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(o_red),style={"border": "1px solid #000000","textAlign": "right"}),
-                html.Td(pct(total_open),style={"border": "1px solid #000000","textAlign": "right"}),
-            ])
-            rows.append((period, count_row, percent_row))
+    @cached_query
+    def get_data(self, start_date=None, end_date=None, exchange=None, exch_segment=None):
+        return self._count_table(self.selection(start_date, end_date, exchange, exch_segment))
 
-        def period_key(period_str):
-            try:
-                if re.match(r"\d{2}-[A-Za-z]{3}-\d{4}", period_str):
-                    return pd.to_datetime(period_str, format="%d-%b-%Y")
-                elif "-" in period_str:
-                    return pd.to_datetime(period_str, format="%B-%Y")
-                else:
-                    return pd.to_datetime(period_str, format="%Y")
-            except Exception:
-                return pd.Timestamp.min
+    @cached_query
+    def get_data_filter_id(self, userid= None, start_date=None, end_date=None, exchange=None, exch_segment=None):
+        userid = int(userid) if userid is not None and len(userid) > 0 else None
+        return self._count_table(self.selection(start_date, end_date, exchange, exch_segment, userid=userid))
+
+    def _period_rows(self, df, time, newest_first=False):
+        # kpi_rows() per period, grouped and ordered on the integer period
+        # keys; only the periods returned get a display label.
+        time = time if time in PERIOD_KEYS else "monthly"
+        kpis = summarize_kpis(df, df[PERIOD_KEYS[time]])
+        if newest_first:
+            kpis = kpis.iloc[::-1]
+        return [(period_label(key, time), counts, percents) for key, counts, percents in kpi_rows(kpis)]
+
+    @cached_query
+    def generate_timely_summary_rows(self, start_date=None, end_date=None, exchange=None, exch_segment=None, time=None):
+        df = self.selection(start_date, end_date, exchange, exch_segment)
+        return self._period_rows(df, time, newest_first=True)
 
-        rows.sort(key=lambda x: period_key(x[0]), reverse=True)
-        rows = [item for row in rows for item in row[1:]]
-        return rows
-    
+    @cached_query
     def generate_timely_summary_rows_id(self, userid = None,start_date=None, end_date=None, exchange=None, exch_segment=None, time=None):
-        df = self.df
-        if userid is not None and len(userid) > 0:
-            df = df[df['UserID'] == int(userid)]
-        if start_date is not None:
-            df = df[df['InsertionTime'] >= pd.to_datetime(start_date)]
-        if end_date is not None:
-            df = df[df['InsertionTime'] <= pd.to_datetime(end_date)]
-        if exchange is not None and len(exchange) > 0:
-            df = df[df['Exchange'].isin(exchange)]
-        if exch_segment is not None and len(exch_segment) > 0:
-            df = df[df['ExchSegment'].isin(exch_segment)]
-
-        df["InsertionTime"] = pd.to_datetime(df["InsertionTime"], errors="coerce")
-        if time == "yearly":
-            df["Period"] = df["InsertionTime"].dt.strftime("%Y")
-        elif time == "monthly":
-            df["Period"] = df["InsertionTime"].dt.strftime("%B-%Y")
-        elif time == "daily":
-            df["Period"] = df["InsertionTime"].dt.strftime("%d-%b-%Y")
-        else:
-            df["Period"] = df["InsertionTime"].dt.strftime("%B-%Y")
-
-        data_rows = []
-
-        for period, sub_df in df.groupby("Period"):
-            total_calls = len(sub_df)
-            target_hit = (sub_df["TargetHit"] == 1).sum()
-            stoploss_hit = (sub_df["StopLossHit"] == 1).sum()
-
-            closed = sub_df[sub_df["ExitPrice"].notna()]
-            neither_df = closed[(closed["TargetHit"] != 1) & (closed["StopLossHit"] != 1)]
-            n_pos = (((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] > neither_df["Price"])) |
-                    ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] < neither_df["Price"]))).sum()
-            n_neg = (((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] < neither_df["Price"])) |
-                    ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] > neither_df["Price"]))).sum()
-            n_red = (((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] == neither_df["Price"])) |
-                    ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] == neither_df["Price"]))).sum()
-
-            open_df = sub_df[sub_df["ExitPrice"].isna()]
-            o_pos = (((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] > open_df["Price"])) |
-                    ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] < open_df["Price"]))).sum()
-            o_neg = (((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] < open_df["Price"])) |
-                    ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] > open_df["Price"]))).sum()
-            o_red = (((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] == open_df["Price"])) |
-                    ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] == open_df["Price"]))).sum()
-
-            total_closed = len(closed)
-            total_open = len(open_df)
-
-            values = [
-                total_calls, target_hit, stoploss_hit,
-                n_pos, n_neg, n_red,
-                total_closed,
-                o_pos, o_neg, o_red,
-                total_open
-            ]
-
-            def pct(val):
-                return f"{(val / total_calls * 100):.1f}%" if total_calls else "0.0%"
-
-            percent_values = [
-                "100%" if total_calls else "0%",
-                pct(target_hit), pct(stoploss_hit),
-                pct(n_pos), pct(n_neg), pct(n_red),
-                pct(total_closed),
-                pct(o_pos), pct(o_neg), pct(o_red),
-                pct(total_open)
-            ]
-
-            data_rows.append((period, values, percent_values))
-
-        def period_key(period_str):
-            try:
-                if re.match(r"\d{2}-[A-Za-z]{3}-\d{4}", period_str):
-                    return pd.to_datetime(period_str, format="%d-%b-%Y")
-                elif "-" in period_str: 
-                    return pd.to_datetime(period_str, format="%B-%Y")
-                else:
-                    return pd.to_datetime(period_str, format="%Y")
-            except Exception:
-                return pd.Timestamp.min
-
-        data_rows.sort(key=lambda x: period_key(x[0]), reverse=True)
-
-        return data_rows
+        userid = int(userid) if userid is not None and len(userid) > 0 else None
+        df = self.selection(start_date, end_date, exchange, exch_segment, userid=userid)
+        return self._period_rows(df, time, newest_first=True)
 
+    @cached_query
     def extract_detail_view_id(self, userid = None,start_date=None, end_date=None, exchange=None, exch_segment=None, time=None):
-        df = self.df
-        if userid is not None and userid > 0:
-            df = df[df['UserID'] == int(userid)]
-        if start_date is not None:
-            df = df[df['InsertionTime'] >= pd.to_datetime(start_date)]
-        if end_date is not None:
-            df = df[df['InsertionTime'] <= pd.to_datetime(end_date)]
-        if exchange is not None and len(exchange) > 0:
-            df = df[df['Exchange'].isin(exchange)]
-        if exch_segment is not None and len(exch_segment) > 0:
-            df = df[df['ExchSegment'].isin(exch_segment)]
-
-        df["InsertionTime"] = pd.to_datetime(df["InsertionTime"], errors="coerce")
-        if time == "yearly":
-            df["MonthPeriod"] = df["InsertionTime"].dt.strftime("%Y")
-        else:
-            df["MonthPeriod"] = df["InsertionTime"].dt.strftime("%B-%Y")
-
-        data_rows = []
-
-        for period, sub_df in df.groupby("MonthPeriod"):
-            total_calls = len(sub_df)
-            target_hit = (sub_df["TargetHit"] == 1).sum()
-            stoploss_hit = (sub_df["StopLossHit"] == 1).sum()
-
-            closed = sub_df[sub_df["ExitPrice"].notna()]
-            neither_df = closed[(closed["TargetHit"] != 1) & (closed["StopLossHit"] != 1)]
-            n_pos = (((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] > neither_df["Price"])) |
-                    ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] < neither_df["Price"]))).sum()
-            n_neg = (((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] < neither_df["Price"])) |
-                    ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] > neither_df["Price"]))).sum()
-            n_red = (((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] == neither_df["Price"])) |
-                    ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] == neither_df["Price"]))).sum()
-
-            open_df = sub_df[sub_df["ExitPrice"].isna()]
-            o_pos = (((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] > open_df["Price"])) |
-                    ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] < open_df["Price"]))).sum()
-            o_neg = (((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] < open_df["Price"])) |
-                    ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] > open_df["Price"]))).sum()
-            o_red = (((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] == open_df["Price"])) |
-                    ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] == open_df["Price"]))).sum()
-
-            total_closed = len(closed)
-            total_open = len(open_df)
-
-            values = [
-                total_calls, target_hit, stoploss_hit,
-                n_pos, n_neg, n_red,
-                total_closed,
-                o_pos, o_neg, o_red,
-                total_open
-            ]
-
-            def pct(val):
-                return f"{(val / total_calls * 100):.1f}%" if total_calls else "0.0%"
-
-            percent_values = [
-                "100%" if total_calls else "0%",
-                pct(target_hit), pct(stoploss_hit),
-                pct(n_pos), pct(n_neg), pct(n_red),
-                pct(total_closed),
-                pct(o_pos), pct(o_neg), pct(o_red),
-                pct(total_open)
-            ]
-
-            data_rows.append((period, values, percent_values))
-
-        return data_rows
+        userid = int(userid) if userid is not None and userid > 0 else None
+        df = self.selection(start_date, end_date, exchange, exch_segment, userid=userid)
+        time = "yearly" if time == "yearly" else "monthly"
+        return self._period_rows(df, time)
+
+    @cached_query
+    def period_leaderboards(self, period=None, scope=None):
+        # Everything the /details page shows for one period label: its KPI
+        # totals and, per LEADERBOARD_SLICES entry, the user_kpis() of the
+        # slice (None for an empty slice) for rank_users(). Built from the cube
+        # the first time a period is opened, then a cache lookup until the
+        # data changes.
+        scope = "monthly" if scope == "monthly" else "yearly"
+        key = period_key(period, scope)
+        snapshot = self.snapshot
+        source = snapshot.cube.frame if snapshot.cube.frame is not None else snapshot._df
+        if key is None or PERIOD_KEYS[scope] not in source.columns:
+            return None
+        rows = source[source[PERIOD_KEYS[scope]] == key]
+        if rows.empty:
+            return None
+        # One grouped sum per user x exchange x segment; every slice is then a
+        # filter and regroup of that small frame.
+        keys = ["UserID", "Exchange", "ExchSegment"]
+        users = rows.groupby(keys, observed=True, dropna=False)[KPI_COLUMNS].sum().reset_index()
+        boards = {}
+        for name, col, test in LEADERBOARD_SLICES:
+            part = users
+            if col is not None:
+                values = users[col].dropna().unique()
+                part = users[users[col].isin([value for value in values if test(str(value).upper())])]
+            boards[name] = user_kpis(part) if not part.empty else None
+        return {"counts": rows[KPI_COLUMNS].sum().tolist(), "boards": boards}
 
     def render_time_summary_data(self, time=None, exchange=None, exch_segment=None):
-        df = self.df.copy()
-
-        df["InsertionTime"] = pd.to_datetime(df["InsertionTime"], errors="coerce")
-        df["Month"] = df["InsertionTime"].dt.strftime("%B %Y")
-        df["Year"] = df["InsertionTime"].dt.year
-
-        if time == "month":
-            current_month = pd.to_datetime("today").strftime("%B %Y")
-            df = df[df["Month"] == current_month]
-        elif time == "year":
-            current_year = pd.to_datetime("today").year
-            df = df[df["Year"] == current_year]
-        if exchange is not None and len(exchange) > 0:
-            df = df[df['Exchange'].isin(exchange)]
-        if exch_segment is not None and len(exch_segment) > 0:
-            df = df[df['ExchSegment'].isin(exch_segment)]
-        if time == "yearly":
-            df["MonthPeriod"] = df["InsertionTime"].dt.strftime("%Y")
-        else:
-            df["MonthPeriod"] = df["InsertionTime"].dt.strftime("%B-%Y")
-
+        start_date = end_date = None
+        if time in ("month", "year"):
+            current = pd.Period(pd.to_datetime("today"), "M" if time == "month" else "Y")
+            start_date, end_date = current.start_time, current.end_time
+        df = self.selection(start_date, end_date, exchange, exch_segment)
+        time ="yearly" if time == "yearly" else "monthly"
         rows = []
-
-        for period, sub_df in df.groupby("MonthPeriod"):
-            total_calls = len(sub_df)
-            target_hit = (sub_df["TargetHit"] == 1).sum()
-            stoploss_hit = (sub_df["StopLossHit"] == 1).sum()
-
-            closed = sub_df[sub_df["ExitPrice"].notna()]
-            neither_df = closed[(closed["TargetHit"] != 1) & (closed["StopLossHit"] != 1)]
-            n_pos = (
-                ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] > neither_df["Price"])) |
-                ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] < neither_df["Price"]))
-            ).sum()
-
-            n_neg = (
-                ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] < neither_df["Price"])) |
-                ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] > neither_df["Price"]))
-            ).sum()
-
-            n_red = (
-                ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] == neither_df["Price"])) |
-                ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] == neither_df["Price"]))
-            ).sum()
-
-            open_df = sub_df[sub_df["ExitPrice"].isna()]
-            o_pos = (
-                ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] > open_df["Price"])) |
-                ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] < open_df["Price"]))
-            ).sum()
-
-            o_neg = (
-                ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] < open_df["Price"])) |
-                ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] > open_df["Price"]))
-            ).sum()
-
-            o_red = (
-                ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] == open_df["Price"])) |
-                ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] == open_df["Price"]))
-            ).sum()
-
-            total_closed = len(closed)
-
-            total_open = len(open_df)
-
-            count_row = html.Tr([
-                html.Td(period, style={"fontWeight": "bold"}),
-                html.Td(total_calls),
-                html.Td(target_hit),
-                html.Td(stoploss_hit),
-                html.Td(n_pos),
-                html.Td(n_neg),
-                html.Td(n_red),
-                html.Td(total_closed),
-                html.Td(o_pos),
-                html.Td(o_neg),
-                html.Td(o_red),
-                html.Td(total_open),
-            ])
-
-            # Second row: percentages
-            def pct(val):
-                return f"{(val / total_calls * 100):.1f}%" if total_calls else "0.0%"
-
-            percent_row = html.Tr([
-                html.Td(""),
-                html.Td("100%" if total_calls else "0%"),
-                html.Td(pct(target_hit)),
-                html.Td(pct(stoploss_hit)),
-                html.Td(pct(n_pos)),
-                html.Td(pct(n_neg)),
-                html.Td(pct(n_red)),
-                html.Td(pct(total_closed)),
-                html.Td(pct(o_pos)),
-                html.Td(pct(o_neg)),
-                html.Td(pct(o_red)),
-                html.Td(pct(total_open)),
+        for period, counts, percents in self._period_rows(df, time):
+            rows.extend([
+                html.Tr([html.Td(period, style={"fontWeight": "bold"})] + [html.Td(val) for val in counts]),
+                # Second row: percentages
+                html.Tr([html.Td("")] + [html.Td(p) for p in percents]),
             ])
-
-            rows.extend([count_row, percent_row])
         return rows
 
-    def render_type_data_gross(self, start_date=None, end_date=None, exchange=None, exch_segment=None):
-        df = self.df
-        if start_date is not None:
-            df['InsertionTime'] = pd.to_datetime(df['InsertionTime'], errors='coerce')
-            df = df[df['InsertionTime'] >= pd.to_datetime(start_date)]
-        if end_date is not None:
-            df = df[df['InsertionTime'] <= pd.to_datetime(end_date)]
-        if exchange is not None and len(exchange) > 0:
-            df = df[df['Exchange'].isin(exchange)]
-        if exch_segment is not None and len(exch_segment) > 0:
-            df = df[df['ExchSegment'].isin(exch_segment)]
+    def _call_type_rows(self, df):
+        label_style = {"fontWeight": "bold", "border": "1px solid #000000", "textAlign": "center"}
         rows = []
-
-        for call_type, sub_df in df.groupby("callType"):
-            total_calls = len(sub_df)
-            target_hit = (sub_df["TargetHit"] == 1).sum()
-            stoploss_hit = (sub_df["StopLossHit"] == 1).sum()
-
-            closed = sub_df[sub_df["ExitPrice"].notna()]
-            neither_df = closed[(closed["TargetHit"] != 1) & (closed["StopLossHit"] != 1)]
-            n_pos = (
-            ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] > neither_df["Price"])) |
-            ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] < neither_df["Price"]))
-            ).sum()
-
-            n_neg = (
-            ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] < neither_df["Price"])) |
-            ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] > neither_df["Price"]))
-            ).sum()
-
-            n_red = (
-            ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] == neither_df["Price"])) |
-            ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] == neither_df["Price"]))
-            ).sum()
-
-            open_df = sub_df[sub_df["ExitPrice"].isna()]
-            o_pos = (
-            ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] > open_df["Price"])) |
-            ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] < open_df["Price"]))
-            ).sum()
-
-            o_neg = (
-            ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] < open_df["Price"])) |
-            ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] > open_df["Price"]))
-            ).sum()
-
-            o_red = (
-            ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] == open_df["Price"])) |
-            ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] == open_df["Price"]))
-            ).sum()
-
-            total_closed = len(closed)
-            total_open = len(open_df)
-
-            count_row = html.Tr([
-            html.Td(call_type, style={"fontWeight": "bold","border": "1px solid #000000","textAlign": "center"}),
-            html.Td(total_calls,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(target_hit,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(stoploss_hit,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(n_pos,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(n_neg,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(n_red,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(total_closed,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(o_pos,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(o_neg,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(o_red,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(total_open,style={"border": "1px solid #000000","textAlign": "right"}),
-            ])
-
-            def pct(val):
-                return f"{(val / total_calls * 100):.1f}%" if total_calls else "0.0%"
-
-            percent_row = html.Tr([
-            html.Td("",style={"border": "1px solid #000000","fontWeight": "bold","textAlign": "center"}),
-            html.Td("100%" if total_calls else "0%",style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(target_hit),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(stoploss_hit),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(n_pos),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(n_neg),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(n_red),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(total_closed),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(o_pos),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(o_neg),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(o_red),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(total_open),style={"border": "1px solid #000000","textAlign": "right"}),
-            ])
-
-            rows.extend([count_row, percent_row])
+        for call_type, counts, percents in kpi_rows(summarize_kpis(df, "callType")):
+            rows.extend(kpi_table_rows(call_type, counts, percents, label_style, percent_label=""))
         return rows
-    
-    def render_type_data_gross_id(self, userid = None, start_date=None, end_date=None, exchange=None, exch_segment=None):
-        df = self.df
-        if userid is not None and len(str(userid)) > 0:
-            df = df[df['UserID'] == int(userid)]
-        if start_date is not None:
-            df = df[df['InsertionTime'] >= pd.to_datetime(start_date)]
-        if end_date is not None:
-            df = df[df['InsertionTime'] <= pd.to_datetime(end_date)]
-        if exchange is not None and len(exchange) > 0:
-            df = df[df['Exchange'].isin(exchange)]
-        if exch_segment is not None and len(exch_segment) > 0:
-            df = df[df['ExchSegment'].isin(exch_segment)]
-        rows = []
-
-        for call_type, sub_df in df.groupby("callType"):
-            total_calls = len(sub_df)
-            target_hit = (sub_df["TargetHit"] == 1).sum()
-            stoploss_hit = (sub_df["StopLossHit"] == 1).sum()
-
-            closed = sub_df[sub_df["ExitPrice"].notna()]
-            neither_df = closed[(closed["TargetHit"] != 1) & (closed["StopLossHit"] != 1)]
-            n_pos = (
-            ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] > neither_df["Price"])) |
-            ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] < neither_df["Price"]))
-            ).sum()
-
-            n_neg = (
-            ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] < neither_df["Price"])) |
-            ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] > neither_df["Price"]))
-            ).sum()
-
-            n_red = (
-            ((neither_df["BuySell"].str.upper() == "BUY") & (neither_df["ExitPrice"] == neither_df["Price"])) |
-            ((neither_df["BuySell"].str.upper() == "SELL") & (neither_df["ExitPrice"] == neither_df["Price"]))
-            ).sum()
-
-            open_df = sub_df[sub_df["ExitPrice"].isna()]
-            o_pos = (
-            ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] > open_df["Price"])) |
-            ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] < open_df["Price"]))
-            ).sum()
-
-            o_neg = (
-            ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] < open_df["Price"])) |
-            ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] > open_df["Price"]))
-            ).sum()
-
-            o_red = (
-            ((open_df["BuySell"].str.upper() == "BUY") & (open_df["LastTradedPrice"] == open_df["Price"])) |
-            ((open_df["BuySell"].str.upper() == "SELL") & (open_df["LastTradedPrice"] == open_df["Price"]))
-            ).sum()
-
-            total_closed = len(closed)
-            total_open = len(open_df)
-
-            count_row = html.Tr([
-            html.Td(call_type, style={"fontWeight": "bold","border": "1px solid #000000","textAlign": "center"}),
-            html.Td(total_calls,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(target_hit,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(stoploss_hit,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(n_pos,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(n_neg,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(n_red,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(total_closed,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(o_pos,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(o_neg,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(o_red,style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(total_open,style={"border": "1px solid #000000","textAlign": "right"}),
-            ])
 
-            def pct(val):
-                return f"{(val / total_calls * 100):.1f}%" if total_calls else "0.0%"
-
-            percent_row = html.Tr([
-            html.Td("",style={"border": "1px solid #000000","fontWeight": "bold","textAlign": "center"}),
-            html.Td("100%" if total_calls else "0%",style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(target_hit),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(stoploss_hit),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(n_pos),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(n_neg),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(n_red),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(total_closed),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(o_pos),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(o_neg),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(o_red),style={"border": "1px solid #000000","textAlign": "right"}),
-            html.Td(pct(total_open),style={"border": "1px solid #000000","textAlign": "right"}),
-            ])
+    @cached_query
+    def render_type_data_gross(self, start_date=None, end_date=None, exchange=None, exch_segment=None):
+        df = self.selection(start_date, end_date, exchange, exch_segment)
+        return self._call_type_rows(df)
 
-            rows.extend([count_row, percent_row])
-        return rows        
+    @cached_query
+    def render_type_data_gross_id(self, userid = None, start_date=None, end_date=None, exchange=None, exch_segment=None):
+        userid = int(userid) if userid is not None and len(str(userid)) > 0 else None
+        df = self.selection(start_date, end_date, exchange, exch_segment, userid=userid)
+        return self._call_type_rows(df)
+
+    @cached_query
+    def clientside_payload(self):
+        # The call cube for assets/clientside_filters.js. Every cell is a
+        # column of codes: its day, UserID, Exchange, ExchSegment and callType
+        # index into "labels" (-1 when missing), and its measures index into
+        # the distinct "kpi"/"counts" rows, which most cells share. Days are
+        # DayKey * 2, + 1 unless the cell's calls sit exactly at midnight, so
+        # the date pickers' midnight bounds select the same cells as on the
+        # server. The pages always filter on dates; undated cells are left out.
+        frame = self.snapshot.cube.frame
+        if frame is None:
+            return None
+        cells = frame[frame['InsertionTime'].notna()]
+        times = cells['InsertionTime']
+        late = (times != times.dt.normalize()).astype(np.int64)
+        dimensions = {
+            "day": cells['DayKey'].astype(np.int64) * 2 + late,
+            "user": cells['UserID'],
+            "exchange": cells['Exchange'],
+            "segment": cells['ExchSegment'],
+            "callType": cells['callType'],
+        }
+        payload = {"labels": {}}
+        for key, values in dimensions.items():
+            codes, labels = pd.factorize(values, sort=True)
+            payload[key] = codes.tolist()
+            payload["labels"][key] = [label.item() if hasattr(label, "item") else label for label in labels]
+        measures = KPI_COLUMNS + GET_DATA_ROWS
+        payload["cell"] = cells.groupby(measures, sort=False).ngroup().tolist()
+        profiles = cells.drop_duplicates(measures)
+        payload["kpi"] = profiles[KPI_COLUMNS].to_numpy(dtype=np.int64).tolist()
+        payload["counts"] = profiles[GET_DATA_ROWS].to_numpy(dtype=np.int64).tolist()
+        # Lets a browser that already holds this payload skip the download.
+        cell_hashes = pd.util.hash_pandas_object(cells, index=False).to_numpy()
+        payload["tag"] = hashlib.sha256(cell_hashes.tobytes()).hexdigest()[:16]
+        return payload
+
+def filter_callback(*args, **kwargs):
+    # dash.callback for the page callbacks assets/clientside_filters.js takes
+    # over; with CLIENTSIDE_FILTERS on they are left unregistered.
+    if CLIENTSIDE_FILTERS:
+        return lambda func: func
+    return callback(*args, **kwargs)
+
+# One backend per process: every page and callback reads from the same frame,
+# so the Drive download and the FetchStructuredData pipeline run only once.
+_shared_backend = None
+_shared_backend_lock = threading.Lock()
+
+def get_backend():
+    global _shared_backend
+    if _shared_backend is None:
+        with _shared_backend_lock:
+            if _shared_backend is None:
+                _shared_backend = backend_sender()
+                _shared_backend.start_refresher()
+    return _shared_backend
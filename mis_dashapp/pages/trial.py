@@ -1,28 +1,17 @@
 import pandas as pd
+from pages import structure_call_data_ELT
 
+# The ETL's call types plus BULLION, checked just before 'wealth pick' as
+# this script always did.
+CALL_TYPE_KEYWORDS = {}
+for keyword, call_type in structure_call_data_ELT.CALL_TYPE_KEYWORDS.items():
+    if keyword == "wealth pick":
+        CALL_TYPE_KEYWORDS["bullion"] = "BULLION"
+    CALL_TYPE_KEYWORDS[keyword] = call_type
 
 def add_type_column(df):
-    def get_call_type(row):
-        header = str(row.get('Header', '')).lower()
-        status_desc = str(row.get('StatusDescreption', '')).lower()
-        text = header + ' ' + status_desc
-        if 'momentum' in text:
-            return 'Momentum'
-        elif 'intraday' in text:
-            return 'Intraday'
-        elif 'positional' in text:
-            return 'Positional'
-        elif 'stock of the day' in text:
-            return 'Stock of the day'
-        elif 'btst' in text:
-            return 'BTST'
-        elif 'bullion' in text:
-            return 'BULLION'
-        elif 'wealth pick' in text:
-            return 'Wealth pick'
-        else:
-            return 'Anonymous'
-    df['callType'] = df.apply(get_call_type, axis=1)
+    text = structure_call_data_ELT.call_type_text(df)
+    df['callType'] = structure_call_data_ELT.classify_call_types(text, CALL_TYPE_KEYWORDS)
     return df
 
 df = pd.read_csv('data/StructureCallEntries.csv')
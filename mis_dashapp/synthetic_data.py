@@ -0,0 +1,187 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Seeded, made-up StructureCallEntries.csv files, since the real data is
+# private. The same rows and seed always give the same file, so benchmark
+# runs on different machines or commits read identical input.
+#
+#   python synthetic_data.py 1000000 /tmp/calls_1m.csv --seed 0
+
+CHUNK_ROWS = 250_000
+# The ETL keeps calls from December 2024 on.
+START = "2024-12-01"
+END = "2025-12-31"
+
+USERS = [101, 102, 103, 104, 105, 106, 201, 202, 203, 301, 302, 401]
+SEGMENTS = {
+    "NSE": (["EQUITY", "FUTIDX", "FUTSTK", "OPTIDX", "OPTSTK", "OPT"], [0.35, 0.12, 0.13, 0.15, 0.15, 0.10]),
+    "MCX": (["FUTCOMM", "OPTCOMM"], [0.7, 0.3]),
+}
+SYMBOLS = {
+    "NSE": ["RELIANCE", "TCS", "INFY", "HDFCBANK", "ICICIBANK", "SBIN", "NIFTY", "BANKNIFTY", "TATAMOTORS"],
+    "MCX": ["CRUDEOIL", "GOLD", "SILVER", "NATURALGAS", "COPPER"],
+}
+HEADERS = [
+    "Momentum call", "Intraday Buy", "Intraday Sell", "Positional pick", "Stock of the day",
+    "BTST idea", "Wealth Pick", "Bullion update", "Nifty view", "Crude oil update", "",
+]
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+def _text(values):
+    return pd.Series(values).map(lambda value: f"{value:g}").to_numpy(dtype=object)
+
+# Character positions of "dd-mm-yyyy HH:MM:SS" in an ISO "yyyy-mm-ddTHH:MM:SS".
+ISO_TO_CSV = [8, 9, 7, 5, 6, 4, 0, 1, 2, 3, 10] + list(range(11, 19))
+
+def _timestamps(values):
+    # The CSV's timestamp text. strftime takes most of the generation time,
+    # so this reorders the characters of numpy's ISO strings instead.
+    iso = np.datetime_as_string(pd.DatetimeIndex(values).to_numpy(dtype="datetime64[s]"), unit="s")
+    chars = iso.astype("U19").view("U1").reshape(-1, 19)[:, ISO_TO_CSV]
+    chars[:, 10] = " "
+    return np.ascontiguousarray(chars).view("U19").ravel().astype(object)
+
+def make_structure_calls(rows, seed=0, first_id=1, start=START, end=END):
+    # One frame of raw calls, shaped like the CSV export: every text column
+    # is what the file would hold, prices and IDs are numbers.
+    rng = np.random.default_rng([seed, first_id])
+    n = rows
+    inserted = pd.to_datetime(rng.integers(pd.Timestamp(start).value, pd.Timestamp(end).value, n)).floor("s")
+    # Some calls are entered at exactly midnight, like back-dated entries.
+    midnight = rng.random(n) < 0.02
+    inserted = inserted.where(~midnight, inserted.normalize())
+
+    exchange = rng.choice(["NSE", "MCX"], n, p=[0.75, 0.25])
+    segment = np.empty(n, dtype=object)
+    symbol = np.empty(n, dtype=object)
+    for name, (segments, weights) in SEGMENTS.items():
+        mask = exchange == name
+        segment[mask] = rng.choice(segments, mask.sum(), p=weights)
+        symbol[mask] = rng.choice(SYMBOLS[name], mask.sum())
+
+    side = rng.choice(["BUY", "SELL", "Buy", "Sell"], n, p=[0.45, 0.3, 0.15, 0.1])
+    sign = np.where(np.char.upper(side.astype(str)) == "BUY", 1, -1)
+    price = np.round(rng.uniform(20, 5000, n), 1)
+    stop_loss = np.round(price * (1 - sign * rng.uniform(0.01, 0.05, n)), 1)
+    target = np.round(price * (1 + sign * rng.uniform(0.02, 0.12, n)), 1)
+    ltp = np.round(price * (1 + rng.normal(0, 0.04, n)), 2)
+    flat = rng.random(n) < 0.03
+    ltp[flat] = price[flat]
+
+    # How the call ended decides the exit price and how the analyst worded it.
+    outcome = rng.choice(["target", "stoploss", "exit", "open"], n, p=[0.3, 0.25, 0.2, 0.25])
+    exit_price = np.where(outcome == "target", target, np.where(outcome == "stoploss", stop_loss, price * (1 + rng.normal(0, 0.03, n))))
+    exit_price = np.round(exit_price, 1)
+    status = np.where(outcome == "open", "Open", "Closed")
+
+    exit_text = _text(exit_price)
+    range_end = _text(np.round(exit_price + rng.integers(1, 20, n), 0))
+    day = rng.integers(1, 29, n).astype(str).astype(object)
+    month = rng.choice(MONTHS, n).astype(object)
+    strike = (rng.integers(40, 520, n) * 50).astype(str).astype(object)
+    option = rng.choice(["CE", "PE", " CE", " PE", "ce"], n).astype(object)
+    phrasings = {
+        "target": [
+            "Target achieved @" + exit_text,
+            "Book profit at " + exit_text,
+            "Target hit, book profit @ " + exit_text,
+            "Exit at " + exit_text + " on " + day + " " + month,
+        ],
+        "stoploss": [
+            "SL hit at " + exit_text,
+            "Stop loss hit @ " + exit_text,
+            "sl triggered",
+            "Stoploss hit, exit " + exit_text,
+        ],
+        "exit": [
+            "Exit at " + exit_text,
+            "Exited at " + exit_text + "-" + range_end + " as per view",
+            symbol.astype(object) + " " + day + " " + month + " " + strike + option + " exit " + exit_text,
+            "Partial profit booked @" + exit_text,
+            "closed @2025 levels " + exit_text,
+            "exit " + day + "-" + month + "-2025",
+        ],
+        "open": [
+            "Hold with SL " + _text(stop_loss),
+            "Call active, target " + _text(target),
+            "",
+        ],
+    }
+    description = np.empty(n, dtype=object)
+    for name, texts in phrasings.items():
+        mask = outcome == name
+        pick = rng.integers(0, len(texts), n)
+        for i, text in enumerate(texts):
+            chosen = mask & (pick == i)
+            description[chosen] = text[chosen] if isinstance(text, np.ndarray) else text
+    description[rng.random(n) < 0.03] = None
+
+    remark = np.full(n, None, dtype=object)
+    remark_kind = rng.integers(0, 8, n)
+    remark[remark_kind == 0] = ("Exit @" + exit_text)[remark_kind == 0]
+    remark[remark_kind == 1] = "stoploss"
+    remark[remark_kind == 2] = "target hit"
+
+    header = rng.choice(HEADERS, n).astype(object)
+    tagged = rng.random(n) < 0.25
+    header[tagged] = header[tagged] + " " + rng.choice(["intraday", "btst", "positional", "momentum"], tagged.sum())
+    closed_ltp = np.where(status == "Closed", np.round(exit_price + rng.normal(0, 1, n), 2), np.nan)
+    modified = inserted + pd.to_timedelta(rng.integers(60, 86400 * 5, n), unit="s")
+
+    return pd.DataFrame({
+        "StructuredCallEntryID": np.arange(first_id, first_id + n),
+        "UserID": rng.choice(USERS, n),
+        "Header": header,
+        "Exchange": exchange,
+        "ExchSegment": segment,
+        "Symbol": symbol,
+        "BuySell": side,
+        "Price": price,
+        "StopLoss": stop_loss,
+        "TargetPrice": np.where(rng.random(n) < 0.03, np.nan, target),
+        "LastTradedPrice": ltp,
+        "CallClosedLTP": closed_ltp,
+        "Status": status,
+        "StatusDescreption": description,
+        "InternalRemark": remark,
+        "RRRValue": np.round(rng.uniform(1, 3, n), 2),
+        "CallType": rng.choice(["Equity", "Derivative", "Commodity"], n),
+        "Attachment": None,
+        "ImageURL": None,
+        "SendTo": "All",
+        "CallClosedBy": rng.choice([1, 2], n),
+        "CallClosedDT": _timestamps(modified),
+        "InsertionTime": _timestamps(inserted),
+        "Validity": _timestamps(inserted + pd.to_timedelta(rng.integers(1, 30, n), unit="D")),
+        "ModifiedDT": _timestamps(modified),
+    })
+
+def write_structure_csv(path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    # Written chunk by chunk, so 10M rows never sit in memory at once.
+    written = 0
+    with open(path, "w", newline="") as out:
+        while written < rows:
+            part = make_structure_calls(min(chunk_rows, rows - written), seed=seed, first_id=written + 1)
+            part.to_csv(out, index=False, header=written == 0)
+            written += len(part)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic StructureCallEntries CSV.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    write_structure_csv(args.path, args.rows, seed=args.seed)
+    size_mb = os.path.getsize(args.path) / (1024 * 1024)
+    print(f"✅ {args.rows} calls written to {args.path} ({size_mb:.0f} MB) in {time.perf_counter() - start:.1f}s.")
+
+if __name__ == "__main__":
+    main()
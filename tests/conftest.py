@@ -0,0 +1,96 @@
+import io
+import os
+import sys
+
+import pytest
+
+# The app imports its modules relative to mis_dashapp/ (`from pages import
+# ...`), so the tests do the same.
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mis_dashapp")
+sys.path.insert(0, APP_DIR)
+
+# No background refresher and no per-stage ETL printout during tests.
+os.environ.setdefault("REFRESH_INTERVAL_SECONDS", "0")
+os.environ.setdefault("ETL_STAGE_REPORT", "0")
+
+from pages import structure_call_data_ELT as etl
+import synthetic_data
+
+class UncompactedFetch(etl.FetchStructuredData):
+    # The pipeline without its last stage: the cleaned frame with the plain
+    # dtypes every stage computes in.
+    STAGES = [stage for stage in etl.FetchStructuredData.STAGES if stage != "compact_columns"]
+
+def csv_bytes(calls):
+    out = io.StringIO()
+    calls.to_csv(out, index=False)
+    return out.getvalue().encode()
+
+def make_csv(rows, seed=0):
+    return csv_bytes(synthetic_data.make_structure_calls(rows, seed=seed))
+
+class FakeResponse:
+    def __init__(self, body, status_code=200, headers=None):
+        self.content = body
+        self.text = body.decode()
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise etl.requests.HTTPError(f"{self.status_code} error")
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+class CsvServer:
+    # Stands in for the Drive download: serves `body` with `headers`, answers
+    # 304 to a matching If-None-Match and records the headers of every request.
+    def __init__(self):
+        self.body = b""
+        self.headers = {}
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append(headers)
+        etag = self.headers.get("ETag")
+        if etag is not None and headers.get("If-None-Match") == etag:
+            return FakeResponse(b"", status_code=304, headers=self.headers)
+        return FakeResponse(self.body, headers=dict(self.headers))
+
+@pytest.fixture(scope="session")
+def raw_csv():
+    return make_csv(4000, seed=7)
+
+@pytest.fixture(scope="session")
+def raw_calls(raw_csv):
+    return etl.read_structure_csv(io.StringIO(raw_csv.decode()))
+
+@pytest.fixture(scope="session")
+def structure(raw_calls):
+    return etl.FetchStructuredData(raw_calls).get_structure()
+
+@pytest.fixture(scope="session")
+def uncompacted_structure(raw_calls):
+    return UncompactedFetch(raw_calls).get_structure()
+
+@pytest.fixture
+def csv_server(monkeypatch):
+    server = CsvServer()
+    monkeypatch.setattr(etl.requests, "get", server.get)
+    return server
+
+@pytest.fixture(scope="session")
+def dash_app(raw_csv):
+    # The Dash app over the raw_csv data. The pages bind the shared backend
+    # when they are imported, so it is set up before the first import.
+    server = CsvServer()
+    server.body = raw_csv
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(etl.requests, "get", server.get)
+        if etl._shared_backend is None:
+            etl._shared_backend = etl.backend_sender(use_cache=False)
+        import app
+    return app
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from pages import structure_call_data_ELT as etl
+from test_filter_index import raw_filter, random_filters
+
+def day_boundary_filters(df, n, seed):
+    # Bounds the cube answers: a midnight start, and a midnight end or the
+    # last nanosecond of a day (a period's end_time).
+    for i, filters in enumerate(random_filters(df, n, seed)):
+        start, end = filters['start_date'], filters['end_date']
+        filters['start_date'] = None if start is None else start.normalize()
+        if end is not None:
+            end = end.normalize()
+            filters['end_date'] = end + pd.Timedelta(1, 'D') - pd.Timedelta(1, 'ns') if i % 2 else end
+        yield filters
+
+def assert_same_sums(cells, calls, by=None):
+    measures = etl.KPI_COLUMNS + etl.GET_DATA_ROWS
+    call_measures = pd.concat([calls[etl.KPI_COLUMNS], etl.get_data_indicators(calls)], axis=1)
+    if by is None:
+        assert cells[measures].sum().tolist() == call_measures.sum().tolist()
+    else:
+        got = cells[measures].groupby(cells[by], observed=True).sum().astype(np.int64)
+        expected = call_measures.groupby(calls[by], observed=True).sum().astype(np.int64)
+        pd.testing.assert_frame_equal(got, expected, check_index_type=False)
+
+def test_cube_cells_add_up_to_raw_filters(structure):
+    cube = etl.CallCube(structure)
+    for filters in day_boundary_filters(structure, 150, seed=2):
+        cells = cube.select(**filters)
+        assert cells is not None, filters
+        calls = raw_filter(structure, **filters)
+        assert_same_sums(cells, calls)
+
+def test_cube_periods_and_call_types_match_raw_calls(structure):
+    cube = etl.CallCube(structure)
+    for filters in day_boundary_filters(structure, 20, seed=3):
+        cells, calls = cube.select(**filters), raw_filter(structure, **filters)
+        for by in ['MonthKey', 'DayKey', 'callType', 'UserID']:
+            assert_same_sums(cells, calls, by)
+
+def test_bounds_inside_a_day_are_left_to_the_raw_calls(structure):
+    cube = etl.CallCube(structure)
+    assert cube.select(start_date=pd.Timestamp("2025-03-01 09:30")) is None
+    assert cube.select(end_date=pd.Timestamp("2025-03-01 12:00")) is None
+    assert cube.select(start_date=pd.Timestamp("2025-03-01"), end_date=pd.Timestamp("2025-03-31 23:59:59.999999999")) is not None
+
+def test_empty_frame_has_no_cube():
+    assert etl.CallCube(pd.DataFrame()).select() is None
@@ -0,0 +1,69 @@
+import importlib
+import random
+import sys
+
+import pandas as pd
+
+from pages import structure_call_data_ELT as etl
+
+# The row-wise add_type_column the one-pass classifier replaced, frozen as it
+# was before user-014.
+
+def row_wise_call_type(row):
+    header = str(row.get('Header', '')).lower()
+    status_desc = str(row.get('StatusDescreption', '')).lower()
+    text = header + ' ' + status_desc
+    if 'momentum' in text:
+        return 'Momentum'
+    elif 'intraday' in text:
+        return 'Intraday'
+    elif 'positional' in text:
+        return 'Positional'
+    elif 'stock of the day' in text:
+        return 'Stock of the day'
+    elif 'btst' in text:
+        return 'BTST'
+    elif 'wealth pick' in text:
+        return 'Wealth pick'
+    else:
+        return 'Anonymous'
+
+def random_texts(n, seed):
+    rnd = random.Random(seed)
+    words = ['Momentum', 'INTRADAY', 'positional', 'Stock of the Day', 'stock of the', 'BTST', 'btst idea',
+             'Wealth Pick', 'wealthpick', 'Nifty', 'call', '', 'momentu m', 'Intra-day']
+    def text():
+        if rnd.random() < 0.1:
+            return None
+        return ' '.join(rnd.choice(words) for _ in range(rnd.randint(0, 4)))
+    return pd.DataFrame({'Header': [text() for _ in range(n)], 'StatusDescreption': [text() for _ in range(n)]},
+                        dtype=object)
+
+def test_call_types_match_row_wise():
+    calls = random_texts(4000, seed=0)
+    expected = calls.apply(row_wise_call_type, axis=1)
+    got = etl.classify_call_types(etl.call_type_text(calls))
+    assert got.tolist() == expected.tolist()
+
+def test_keyword_table_order_is_priority():
+    text = pd.Series(["wealth pick btst", "nothing here", "gold bullion", "momentum bullion"])
+    keywords = {**etl.CALL_TYPE_KEYWORDS, "bullion": "BULLION"}
+    assert etl.classify_call_types(text, keywords).tolist() == ["BTST", "Anonymous", "BULLION", "Momentum"]
+    assert etl.classify_call_types(text, {}).tolist() == [etl.DEFAULT_CALL_TYPE] * 4
+
+def test_missing_text_columns():
+    calls = pd.DataFrame({'Header': ["BTST call", None]})
+    assert etl.classify_call_types(etl.call_type_text(calls)).tolist() == ["BTST", "Anonymous"]
+
+def test_trial_checks_bullion_before_wealth_pick(monkeypatch, capsys):
+    # pages/trial.py is a script over data/StructureCallEntries.csv; it reads
+    # a small frame instead.
+    columns = ['InsertionTime', 'Header', 'Price', 'StopLoss', 'StatusDescreption', 'LastTradedPrice']
+    calls = pd.DataFrame([["", "Wealth Pick bullion", 1, 1, "", 1], ["", "Wealth Pick", 1, 1, "BTST bullion", 1]],
+                         columns=columns)
+    monkeypatch.setattr(pd, "read_csv", lambda *args, **kwargs: calls.copy())
+    monkeypatch.delitem(sys.modules, "pages.trial", raising=False)
+    trial = importlib.import_module("pages.trial")
+    capsys.readouterr()
+    assert list(trial.CALL_TYPE_KEYWORDS)[-2:] == ["bullion", "wealth pick"]
+    assert trial.df['callType'].tolist() == ["BULLION", "BTST"]
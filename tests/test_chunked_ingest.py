@@ -0,0 +1,35 @@
+import io
+
+import pandas as pd
+import pytest
+
+from pages import structure_call_data_ELT as etl
+
+@pytest.mark.parametrize("chunk_rows", [333, 999, 1000, 5000])
+def test_chunked_read_matches_one_shot(raw_csv, raw_calls, chunk_rows):
+    chunks = list(etl.read_structure_csv(io.StringIO(raw_csv.decode()), chunksize=chunk_rows))
+    pd.testing.assert_frame_equal(pd.concat(chunks), raw_calls)
+
+def test_bad_value_in_a_later_chunk(raw_csv, capsys):
+    lines = raw_csv.decode().splitlines(keepends=True)
+    header = lines[0].split(",")
+    row = lines[2500].split(",")
+    row[header.index("Price")] = "abc"
+    text = "".join(lines[:2500] + [",".join(row)] + lines[2501:])
+
+    whole = etl.read_structure_csv(io.StringIO(text))
+    chunked = pd.concat(etl.read_structure_csv(io.StringIO(text), chunksize=1000))
+    pd.testing.assert_frame_equal(chunked, whole)
+    assert pd.isna(whole["Price"].iloc[2499])
+    assert "Price: 1 values do not fit float64" in capsys.readouterr().out
+
+def test_concat_structures_matches_one_shot_etl(raw_calls, structure):
+    parts = [etl.FetchStructuredData(raw_calls.iloc[start:start + 700]).get_structure()
+             for start in range(0, len(raw_calls), 700)]
+    pd.testing.assert_frame_equal(etl.concat_structures(parts), structure)
+
+def test_chunked_backend_matches_whole_file_backend(csv_server, raw_csv):
+    csv_server.body = raw_csv
+    whole = etl.backend_sender(use_cache=False, chunk_rows=0)
+    chunked = etl.backend_sender(use_cache=False, chunk_rows=1500)
+    pd.testing.assert_frame_equal(chunked.snapshot._df, whole.snapshot._df)
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from contextvars import copy_context
+from itertools import cycle
+
+import dash
+import numpy as np
+import plotly.utils
+import pytest
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+
+from conftest import APP_DIR
+from pages import structure_call_data_ELT as etl
+
+DATE_RANGES = [["2024-11-01", "2025-12-31"], ["2025-01-15", "2025-03-10"], ["2025-06-01", "2025-06-01"],
+               ["2025-06-01", "2025-06-02"], ["2025-05-01", "2025-04-01"], ["2024-12-30", "2025-01-02"],
+               # End dates with calls at exactly midnight in the raw_csv data.
+               ["2025-01-09", "2025-03-02"], ["2025-08-01", "2025-08-25"]]
+EXCHANGES = [None, ["NSE"], ["MCX", "NSE"], ["BSE"]]
+SEGMENTS = [None, ["EQUITY"], ["OPT", "FUTCOMM"]]
+
+def filter_sets():
+    for date_range in DATE_RANGES:
+        for exchanges in EXCHANGES:
+            for segments in SEGMENTS:
+                yield date_range, exchanges, segments
+
+def decode_cells(payload, start, end, exchanges, segments, userid=None):
+    # The Python reading of the payload: the cells whose codes pass the
+    # filters, like selectCells() in clientside_filters.js.
+    labels = payload["labels"]
+    def ok(key, test):
+        return np.array([test(label) for label in labels[key]] + [False])[payload[key]]
+    day = lambda code: int(code.replace("-", "")) * 2
+    keep = ok("day", lambda code: day(start) <= code <= day(end))
+    if exchanges:
+        keep &= ok("exchange", lambda label: label in exchanges)
+    if segments:
+        keep &= ok("segment", lambda label: label in segments)
+    if userid is not None:
+        keep &= ok("user", lambda label: label == userid)
+    return np.array(payload["cell"])[keep]
+
+def test_payload_cells_add_up_to_the_server_counts(dash_app):
+    backend = etl.get_backend()
+    payload = backend.clientside_payload()
+    user = backend.user_id_sender()[0]
+    for (start, end), exchanges, segments in filter_sets():
+        for userid in [None, user]:
+            cells = decode_cells(payload, start, end, exchanges, segments, userid)
+            counts = np.array(payload["counts"], dtype=np.int64).reshape(-1, len(etl.GET_DATA_ROWS))[cells].sum(axis=0)
+            kpis = np.array(payload["kpi"], dtype=np.int64).reshape(-1, len(etl.KPI_COLUMNS))[cells].sum(axis=0)
+            if userid is None:
+                table = backend.get_data(start, end, exchanges, segments)
+            else:
+                table = backend.get_data_filter_id(str(userid), start, end, exchanges, segments)
+            assert counts.tolist() == table["Count"].tolist()
+            calls = backend.filter_calls(etl.pd.Timestamp(start), etl.pd.Timestamp(end), exchanges, segments, userid=userid)
+            assert kpis.tolist() == calls[etl.KPI_COLUMNS].sum().astype(np.int64).tolist()
+
+# Runs the window.dash_clientside.mis functions on the payload under node and
+# prints their outputs as JSON.
+NODE_RUNNER = """
+const fs = require("fs");
+global.window = {dash_clientside: {no_update: "NO_UPDATE", callback_context: {triggered: []}}};
+require(process.argv[2]);
+const {payload, cases} = JSON.parse(fs.readFileSync(process.argv[3]));
+const mis = window.dash_clientside.mis;
+console.log(JSON.stringify(cases.map(c => mis[c.fn](...c.args, payload))));
+"""
+
+def run_page_callback(func, *args):
+    # A server callback outside a request, triggered by a filter input.
+    def run():
+        context_value.set(AttributeDict(triggered_inputs=[{"prop_id": "filter.value", "value": None}]))
+        return func(*args)
+    return copy_context().run(run)
+
+def as_json(value):
+    value = ["NO_UPDATE" if item is dash.no_update else item for item in value] if isinstance(value, tuple) else value
+    return json.loads(json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder))
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_clientside_filters_match_the_server_callbacks(dash_app, tmp_path):
+    gross = sys.modules["pages.gross_structure_calls"]
+    analyst = sys.modules["pages.analyst_structure_calls"]
+    backend = etl.get_backend()
+    user = str(backend.user_id_sender()[0])
+    cases, expected = [], []
+    for time_range, (date_range, exchanges, segments) in zip(cycle(["Yearly", "Monthly", "Daily"]), filter_sets()):
+        filters, _ = run_page_callback(gross.update_gross_filters, None, date_range, exchanges, segments, None)
+        cases += [
+            {"fn": "grossSummary", "args": [None, date_range, exchanges, segments]},
+            {"fn": "grossTimeRange", "args": [time_range, date_range, exchanges, segments]},
+            {"fn": "grossTypeSummary", "args": [time_range, None, date_range, exchanges, segments]},
+        ]
+        expected += [
+            [gross.update_gross_summary_table(filters), dash.no_update],
+            gross.update_gross_time_range_summary_table(time_range, filters),
+            gross.update_gross_type_summary_table(filters),
+        ]
+        filters, _ = run_page_callback(analyst.update_analyst_filters, user, None, date_range, exchanges, segments, None)
+        cases += [
+            {"fn": "analystSummary", "args": [user, None, date_range, exchanges, segments]},
+            {"fn": "analystTimeRange", "args": [time_range, user, None, date_range, exchanges, segments]},
+            {"fn": "analystTypeSummary", "args": [user, None, date_range, exchanges, segments]},
+        ]
+        expected += [
+            [analyst.update_analyst_summary_table(filters), dash.no_update],
+            analyst.update_analyst_time_range_summary_table(time_range, filters),
+            [analyst.update_analyst_type_range_summary_table(filters), dash.no_update],
+        ]
+    runner, cases_file = tmp_path / "run.js", tmp_path / "cases.json"
+    runner.write_text(NODE_RUNNER)
+    cases_file.write_text(json.dumps({"payload": as_json(backend.clientside_payload()), "cases": cases}))
+    script = os.path.join(APP_DIR, "assets", "clientside_filters.js")
+    out = subprocess.run(["node", str(runner), script, str(cases_file)], capture_output=True, text=True, check=True)
+    got = json.loads(out.stdout)
+    for case, result, want in zip(cases, got, expected):
+        assert result == as_json(tuple(want) if isinstance(want, list) else want), case
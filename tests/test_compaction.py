@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages import structure_call_data_ELT as etl
+
+def plain_index(kpis):
+    # Categorical and Int8 group labels compare as their plain values.
+    return kpis.set_axis(pd.Index(kpis.index.to_list()))
+
+@pytest.mark.parametrize("by", ["callType", "UserID", "MonthKey", "WeekStr", ["Exchange", "ExchSegment"]], ids=str)
+def test_compacted_frame_gives_the_same_kpis(structure, uncompacted_structure, by):
+    compact = etl.summarize_kpis(structure, by)
+    plain = etl.summarize_kpis(uncompacted_structure, by)
+    pd.testing.assert_frame_equal(plain_index(compact), plain_index(plain), check_dtype=False)
+
+def test_compacted_frame_gives_the_same_get_data_counts(structure, uncompacted_structure):
+    pd.testing.assert_frame_equal(etl.get_data_indicators(structure), etl.get_data_indicators(uncompacted_structure))
+
+def test_compaction_keeps_every_value(structure, uncompacted_structure):
+    plain = uncompacted_structure.drop(columns=etl.ETL_ONLY_COLUMNS)
+    assert list(structure.columns) == list(plain.columns)
+    widened = etl._widen_prices(structure)
+    for col in plain.columns:
+        if col in etl.DERIVED_FLOAT_COLUMNS:
+            # float32 keeps the sign, the only thing read from these.
+            assert (np.sign(widened[col]).fillna(9) == np.sign(plain[col]).fillna(9)).all(), col
+        else:
+            pd.testing.assert_series_equal(widened[col], plain[col], check_dtype=False, check_categorical=False)
+
+def test_compaction_is_idempotent_and_smaller(structure, uncompacted_structure):
+    pd.testing.assert_frame_equal(etl.compact_structure(structure), structure)
+    assert structure.memory_usage(deep=True).sum() < uncompacted_structure.memory_usage(deep=True).sum() / 2
+
+def test_prices_stay_float64_when_float32_would_round(uncompacted_structure):
+    prices = uncompacted_structure.assign(Price=uncompacted_structure["Price"] + 0.001)
+    assert etl.compact_structure(prices)["Price"].dtype == np.float64
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+def detail_tables_request(dash_app, href):
+    # POSTs the details page callback the way the browser does.
+    client = dash_app.server.test_client()
+    output = next(dependency["output"] for dependency in client.get("/_dash-dependencies").json
+                  if "..summary-table.children..." in dependency["output"])
+    outputs = [dict(zip(["id", "property"], part.split("."))) for part in output.strip(".").split("...")]
+    body = {
+        "output": output,
+        "outputs": outputs,
+        "inputs": [{"id": "details-url", "property": "href", "value": href}],
+        "changedPropIds": ["details-url.href"],
+    }
+    return client.post("/_dash-update-component", json=body), outputs
+
+@pytest.mark.parametrize("href", [
+    "http://x/details?scope=monthly&period=Foo",
+    "http://x/details?scope=yearly&period=1999",
+    "http://x/details?scope=monthly&period=June-2025",
+])
+def test_every_period_fills_all_seven_tables(dash_app, href):
+    response, outputs = detail_tables_request(dash_app, href)
+    assert response.status_code == 200
+    tables = json.loads(response.data)["response"]
+    assert len(outputs) == 7
+    assert sorted(tables) == sorted(output["id"] for output in outputs)
+
+def test_unknown_period_says_there_is_no_data(dash_app):
+    response, _ = detail_tables_request(dash_app, "http://x/details?scope=monthly&period=Foo")
+    tables = json.loads(response.data)["response"]
+    assert tables["summary-table"]["children"]["props"]["children"] == "No data for Foo"
@@ -0,0 +1,140 @@
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages import structure_call_data_ELT as etl
+
+# The row-wise exit price code the vectorized version replaced, frozen as it
+# was before user-002.
+
+def row_wise_extract_price(text):
+    if pd.isna(text) or text in ["", "0"]:
+        return None
+    text = str(text).upper()
+    match = re.search(r'@\s*(\d{1,6}(?:\.\d{1,2})?)', text)
+    if match:
+        price_candidate = match.group(1)
+        if not re.fullmatch(r'20\d{2}', price_candidate):
+            return float(price_candidate)
+    keywords = ['EXIT AT', 'BOOK PROFIT AT', 'SL HIT AT', 'EXIT', 'BOOK PROFIT']
+    for keyword in keywords:
+        pattern = rf'{keyword}\s*(\d{{1,6}}(?:\.\d{{1,2}})?)'
+        match = re.search(pattern, text)
+        if match:
+            price_candidate = match.group(1)
+            if not re.fullmatch(r'20\d{2}', price_candidate):
+                return float(price_candidate)
+    months = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+    for m in re.finditer(r'(\d{2,6}(?:\.\d{1,2})?)', text):
+        start = m.start()
+        end = m.end()
+        next_part = text[end:end+6]
+        prev_part = text[max(0, start-10):start]
+        if re.match(r'(CE|PE)', text[end:end+2], re.IGNORECASE):
+            continue
+        if any(next_part.strip().startswith(month) for month in months):
+            continue
+        if re.match(r'\s*20\d{2}', next_part):
+            continue
+        if re.fullmatch(r'20\d{2}', m.group(1)):
+            continue
+        if re.search(r'at\s*\d{1,6}\s*-\s*\d{1,6}', prev_part + m.group(0) + next_part, re.IGNORECASE):
+            continue
+        return float(m.group(1))
+    return None
+
+def row_wise_exit_prices(structure):
+    mask = structure['Status'] == "Closed"
+    exit_prices = []
+    for idx, row in structure.iterrows():
+        if not mask.loc[idx]:
+            exit_prices.append(np.nan)
+            continue
+        price = None
+        for col in ['StatusDescreption', 'InternalRemark']:
+            price = row_wise_extract_price(row.get(col))
+            if price not in [None, 0]:
+                break
+        if price in [None, 0]:
+            value = row.get('CallClosedLTP')
+            if pd.notna(value) and isinstance(value, (int, float)) and float(value) != 0.0:
+                price = float(value)
+        if price in [None, 0]:
+            value = row.get('LastTradedPrice')
+            if pd.notna(value) and isinstance(value, (int, float)) and float(value) != 0.0:
+                price = float(value)
+        exit_prices.append(price if price not in [None, 0] else np.nan)
+    return pd.Series(exit_prices, index=structure.index, dtype=float)
+
+TRICKY_TEXTS = [
+    None, "", "0", "   ",
+    "Target achieved @1520.5",
+    "Book profit at 245.75 and 250",
+    "Exit at 826-828",
+    "exited at 826 - 828 as per view",
+    "Exit @2025",
+    "@ 2025 levels, exit 1890.25",
+    "SL hit at 99.5",
+    "sl triggered",
+    "Stoploss hit, exit 412",
+    "Target hit, book profit @ 3100",
+    "NIFTY 12 DEC 24500CE exit 180.5",
+    "BANKNIFTY 25 jan 2025 48000 pe exit 95",
+    "closed @2025 levels 1450",
+    "exit 12-DEC-2025",
+    "Partial profit booked @1234.567",
+    "price 1234567 then 88",
+    "bought 20 lots, exit 2024 then 1999.99",
+    "book profit 75.5",
+    "BOOK PROFIT AT45",
+    "Hold with SL 410",
+    "multiple @ 100 @ 200 exit at 300",
+    "at 10-20 then 30",
+    "9",
+]
+
+def fuzzed_texts(n, seed=0):
+    rnd = random.Random(seed)
+    tokens = ['@', '@ ', 'exit at', 'EXIT', 'book profit', 'Book Profit At', 'sl hit at', ' at ', '-', ' - ',
+              'jan', ' MAR', '  dec', 'CE', 'pe', ' ', '\t', '.', 'target', 'nifty', '2025', ' 2024', '20', '0']
+    def number():
+        r = rnd.random()
+        if r < 0.4:
+            return str(rnd.randint(0, 9999))
+        if r < 0.8:
+            return f"{rnd.randint(0, 99999)}.{rnd.randint(0, 999)}"
+        return str(rnd.randint(0, 9999999))
+    return [''.join(rnd.choice(tokens) if rnd.random() < 0.6 else number() for _ in range(rnd.randint(0, 8)))
+            for _ in range(n)]
+
+def bare_fetch():
+    # The stages as methods, without running the pipeline in __init__.
+    return etl.FetchStructuredData.__new__(etl.FetchStructuredData)
+
+def assert_same_prices(got, expected):
+    pd.testing.assert_series_equal(got.astype(float), expected.astype(float), check_names=False)
+
+@pytest.mark.parametrize("texts", [TRICKY_TEXTS, fuzzed_texts(3000)], ids=["tricky", "fuzzed"])
+def test_extract_prices_matches_row_wise(texts):
+    expected = pd.Series([row_wise_extract_price(text) for text in texts], dtype=float)
+    assert_same_prices(bare_fetch()._extract_prices(pd.Series(texts, dtype=object)), expected)
+
+def test_exit_price_column_matches_row_wise():
+    rnd = random.Random(1)
+    texts = TRICKY_TEXTS + fuzzed_texts(500, seed=2)
+    n = len(texts)
+    structure = pd.DataFrame({
+        "Status": [rnd.choice(["Closed", "Closed", "Open", "closed", None]) for _ in range(n)],
+        "StatusDescreption": pd.Series(texts, dtype=object),
+        "InternalRemark": pd.Series([rnd.choice([None, "Exit @" + str(rnd.randint(1, 999)), "target hit", "0"])
+                                     for _ in range(n)], dtype=object),
+        "CallClosedLTP": pd.Series([rnd.choice([None, np.nan, 0, 12, 13.5, "14", True]) for _ in range(n)], dtype=object),
+        "LastTradedPrice": [rnd.choice([np.nan, 0.0, 101.25]) for _ in range(n)],
+    }, index=pd.RangeIndex(5, 5 + n))
+    fetch = bare_fetch()
+    fetch.structure = structure.copy()
+    fetch.add_exit_price_column()
+    assert_same_prices(fetch.structure["ExitPrice"], row_wise_exit_prices(structure))
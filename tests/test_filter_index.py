@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages import structure_call_data_ELT as etl
+
+def raw_filter(df, start_date=None, end_date=None, userid=None, exchange=None, exch_segment=None):
+    # The plain DataFrame filters the index replaced.
+    if start_date is not None:
+        df = df[df['InsertionTime'] >= start_date]
+    if end_date is not None:
+        df = df[df['InsertionTime'] <= end_date]
+    if userid is not None:
+        df = df[df['UserID'] == userid]
+    if exchange is not None and len(exchange) > 0:
+        df = df[df['Exchange'].isin(exchange)]
+    if exch_segment is not None and len(exch_segment) > 0:
+        df = df[df['ExchSegment'].isin(exch_segment)]
+    return df
+
+def random_filters(df, n, seed):
+    rng = np.random.default_rng(seed)
+    times = df['InsertionTime'].dropna()
+    lo, hi = times.min().value, times.max().value
+    users = df['UserID'].dropna().unique().tolist() + [999]
+    exchanges = ['NSE', 'MCX', 'BSE']
+    segments = df['ExchSegment'].dropna().unique().tolist() + ['UNKNOWN']
+    def subset(values):
+        r = rng.random()
+        if r < 0.3:
+            return None
+        if r < 0.4:
+            return []
+        return list(rng.choice(values, rng.integers(1, len(values) + 1), replace=False))
+    def moment():
+        if rng.random() < 0.25:
+            return None
+        stamp = pd.Timestamp(int(rng.integers(lo, hi))).floor("s")
+        # Date pickers send midnight; other callers send any time.
+        return stamp.normalize() if rng.random() < 0.5 else stamp
+    for _ in range(n):
+        start, end = moment(), moment()
+        userid = int(rng.choice(users)) if rng.random() < 0.3 else None
+        yield dict(start_date=start, end_date=end, userid=userid, exchange=subset(exchanges), exch_segment=subset(segments))
+
+@pytest.fixture(scope="module")
+def calls(structure):
+    # A few calls without a time, which only unfiltered dates keep.
+    undated = structure.index[::97]
+    return structure.assign(InsertionTime=structure['InsertionTime'].mask(structure.index.isin(undated)))
+
+def test_positions_match_raw_filters(calls):
+    index = etl.CallFilterIndex(calls)
+    for filters in random_filters(calls, 200, seed=0):
+        positions = index.positions(**filters)
+        expected = raw_filter(calls, **filters)
+        got = calls if positions is None else calls.iloc[positions]
+        assert got.index.tolist() == expected.index.tolist(), filters
+
+def test_no_filters_mean_no_positions(calls):
+    index = etl.CallFilterIndex(calls)
+    assert index.positions() is None
+    assert index.positions(exchange=[], exch_segment=[]) is None
+
+def test_snapshot_calls_match_raw_filters(calls):
+    snapshot = etl.DataSnapshot(calls, 1)
+    for filters in random_filters(calls, 20, seed=1):
+        got = snapshot.calls(filters['start_date'], filters['end_date'], filters['exchange'],
+                             filters['exch_segment'], filters['userid'])
+        pd.testing.assert_frame_equal(got, raw_filter(calls, **filters))
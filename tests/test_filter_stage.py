@@ -0,0 +1,57 @@
+import sys
+
+import dash
+import pandas as pd
+
+from pages import structure_call_data_ELT as etl
+from test_clientside_payload import as_json, run_page_callback
+from test_filter_index import raw_filter, random_filters
+
+def as_text(stamp):
+    return None if stamp is None else str(stamp)
+
+def test_queries_on_the_shared_selection_match_raw_filters(dash_app, structure):
+    backend = etl.get_backend()
+    for filters in random_filters(structure, 60, seed=4):
+        start, end = as_text(filters['start_date']), as_text(filters['end_date'])
+        exchange, segment, userid = filters['exchange'], filters['exch_segment'], filters['userid']
+        calls = raw_filter(structure, **filters)
+        if userid is None:
+            table = backend.get_data(start, end, exchange, segment)
+            type_rows = backend.render_type_data_gross(start, end, exchange, segment)
+        else:
+            table = backend.get_data_filter_id(str(userid), start, end, exchange, segment)
+            type_rows = backend.render_type_data_gross_id(str(userid), start, end, exchange, segment)
+        pd.testing.assert_frame_equal(table, backend._count_table(calls))
+        assert as_json(type_rows) == as_json(backend._call_type_rows(calls))
+        for time in ['yearly', 'monthly', 'daily']:
+            if userid is None:
+                rows = backend.generate_timely_summary_rows(start, end, exchange, segment, time=time)
+            else:
+                rows = backend.generate_timely_summary_rows_id(str(userid), start, end, exchange, segment, time=time)
+            assert rows == backend._period_rows(calls, time, newest_first=True)
+
+def test_page_tables_read_the_filter_stage_selection(dash_app, structure):
+    gross = sys.modules["pages.gross_structure_calls"]
+    analyst = sys.modules["pages.analyst_structure_calls"]
+    backend = etl.get_backend()
+    user = str(structure['UserID'].iloc[0])
+    date_range, exchanges, segments = ["2025-02-01", "2025-09-30"], ["MCX", "NSE"], ["OPT", "FUTCOMM"]
+    calls = raw_filter(structure, pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1]),
+                       exchange=exchanges, exch_segment=segments)
+    backend.query_cache.clear()
+    filters, picker = run_page_callback(gross.update_gross_filters, None, date_range, exchanges, segments, None)
+    assert picker is dash.no_update
+    # The tables find the stage's selection in the cache instead of filtering again.
+    misses = backend.query_cache.misses
+    table = gross.update_gross_time_range_summary_table("Monthly", filters)
+    assert as_json(table) == as_json(etl.kpi_grid(backend._period_rows(calls, "monthly", newest_first=True)))
+    assert backend.query_cache.misses == misses + 1
+    assert backend.query_cache.hits > 0
+    # An unchanged filter set does not wake the tables.
+    assert run_page_callback(gross.update_gross_filters, None, date_range, exchanges, segments, filters)[0] is dash.no_update
+
+    filters, _ = run_page_callback(analyst.update_analyst_filters, user, None, date_range, exchanges, segments, None)
+    rows = backend.generate_timely_summary_rows_id(user, **{key: filters[key] for key in
+                                                           ['start_date', 'end_date', 'exchange', 'exch_segment']}, time="daily")
+    assert rows == backend._period_rows(calls[calls['UserID'] == int(user)], "daily", newest_first=True)
@@ -0,0 +1,102 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages import structure_call_data_ELT as etl
+
+# The row-wise status fill and hit checks the masks replaced, frozen as they
+# were before user-003.
+
+def row_wise_fill_exit_price(structure):
+    for idx, row in structure[structure['ExitPrice'].isna()].iterrows():
+        desc_fields = [
+            str(row.get('StatusDescreption', '')).lower() if pd.notna(row.get('StatusDescreption')) else '',
+            str(row.get('InternalRemark', '')).lower() if pd.notna(row.get('InternalRemark')) else ''
+        ]
+        for status_desc in desc_fields:
+            if any(word in status_desc for word in ['sl', 'stop loss', 'stoploss']):
+                stop_loss = row.get('StopLoss')
+                if pd.notna(stop_loss) and stop_loss not in [None, 0, ""]:
+                    structure.at[idx, 'ExitPrice'] = stop_loss
+                    break
+            elif 'target' in status_desc:
+                target_price = row.get('TargetPrice')
+                if pd.notna(target_price) and target_price not in [None, 0, ""]:
+                    structure.at[idx, 'ExitPrice'] = target_price
+                    break
+
+def row_wise_hit(structure, level_col, mentioned, buy_hit, sell_hit):
+    hits = structure['StatusDescreption'].apply(lambda desc: np.nan if pd.isna(desc) else (1 if mentioned(str(desc)) else np.nan))
+    for idx, row in structure[hits.isna()].iterrows():
+        buy_sell = str(row.get('BuySell', '')).strip().upper()
+        level = row.get(level_col)
+        exit_price = row.get('ExitPrice')
+        if pd.isna(level) or pd.isna(exit_price):
+            continue
+        try:
+            level = float(level)
+            exit_price = float(exit_price)
+        except Exception:
+            continue
+        if buy_sell == 'BUY':
+            hits.at[idx] = 1 if buy_hit(level, exit_price) else 0
+        elif buy_sell == 'SELL':
+            hits.at[idx] = 1 if sell_hit(level, exit_price) else 0
+    return hits.astype(float)
+
+def row_wise_stop_loss_hit(structure):
+    return row_wise_hit(structure, 'StopLoss', lambda desc: any(word in desc.lower() for word in ['sl', 'stop loss', 'stoploss']),
+                        lambda level, exit_price: level >= exit_price, lambda level, exit_price: level <= exit_price)
+
+def row_wise_target_hit(structure):
+    return row_wise_hit(structure, 'TargetPrice', lambda desc: 'Target' in desc,
+                        lambda level, exit_price: exit_price >= level, lambda level, exit_price: exit_price <= level)
+
+def random_structure(n, seed, object_prices=False):
+    rnd = random.Random(seed)
+    words = ['SL hit', 'sl', 'Stop Loss', 'stoploss', 'Target', 'target', 'TARGET', 'exit', '', 'isle', 'Targeted']
+    def text():
+        return None if rnd.random() < 0.1 else ' '.join(rnd.choice(words) for _ in range(rnd.randint(0, 3)))
+    def price():
+        return rnd.choice([np.nan, 0, 0.0, 100.0, 105.0, 95.0] + ([None, 7] if object_prices else []))
+    price_dtype = object if object_prices else float
+    return pd.DataFrame({
+        'StatusDescreption': pd.Series([text() for _ in range(n)], dtype=object),
+        'InternalRemark': pd.Series([text() for _ in range(n)], dtype=object),
+        'BuySell': pd.Series([rnd.choice(['BUY', 'Sell', ' buy ', 'x', None]) for _ in range(n)], dtype=object),
+        'StopLoss': pd.Series([price() for _ in range(n)], dtype=price_dtype),
+        'TargetPrice': pd.Series([price() for _ in range(n)], dtype=price_dtype),
+        'ExitPrice': [rnd.choice([np.nan, np.nan, 100.0, 96.0, 110.0]) for _ in range(n)],
+    })
+
+def run_stages(structure, *stages):
+    fetch = etl.FetchStructuredData.__new__(etl.FetchStructuredData)
+    fetch.structure = structure.copy()
+    for stage in stages:
+        getattr(fetch, stage)()
+    return fetch.structure
+
+@pytest.mark.parametrize("object_prices", [False, True], ids=["float-prices", "object-prices"])
+def test_hit_columns_match_row_wise(object_prices):
+    structure = random_structure(3000, seed=int(object_prices), object_prices=object_prices)
+    got = run_stages(structure, 'fill_exit_price_from_status', 'add_stop_loss_hit_column', 'add_target_hit_column')
+
+    expected = structure.copy()
+    row_wise_fill_exit_price(expected)
+    pd.testing.assert_series_equal(got['ExitPrice'].astype(float), expected['ExitPrice'].astype(float))
+    pd.testing.assert_series_equal(got['StopLossHit'], row_wise_stop_loss_hit(expected), check_names=False)
+    pd.testing.assert_series_equal(got['TargetHit'], row_wise_target_hit(expected), check_names=False)
+
+def test_stop_loss_mention_wins_over_target():
+    structure = pd.DataFrame({
+        'StatusDescreption': ["Target missed, SL hit", "target done", None],
+        'InternalRemark': [None, "sl", "Target hit"],
+        'BuySell': ["BUY", "SELL", "BUY"],
+        'StopLoss': [90.0, 110.0, 90.0],
+        'TargetPrice': [120.0, 80.0, 120.0],
+        'ExitPrice': [np.nan, np.nan, np.nan],
+    })
+    got = run_stages(structure, 'fill_exit_price_from_status')
+    assert got['ExitPrice'].tolist() == [90.0, 80.0, 120.0]
@@ -0,0 +1,62 @@
+import io
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages import structure_call_data_ELT as etl
+import synthetic_data
+from conftest import csv_bytes
+
+def edited_calls(calls, seed=1):
+    # The next day's export: some calls closed or re-worded, some deleted
+    # and some new ones appended.
+    rng = np.random.default_rng(seed)
+    calls = calls.copy()
+    edited = rng.choice(len(calls), 120, replace=False)
+    calls.loc[edited, "Status"] = "Closed"
+    calls.loc[edited, "StatusDescreption"] = "SL hit at 123.5"
+    calls.loc[edited[:30], "Header"] = "btst idea"
+    calls = calls.drop(index=rng.choice(len(calls), 60, replace=False))
+    appended = synthetic_data.make_structure_calls(200, seed=seed, first_id=10_000_000)
+    return pd.concat([calls, appended], ignore_index=True), len(edited), len(appended)
+
+@pytest.mark.parametrize("chunk_rows", [0, 700], ids=["whole-file", "chunked"])
+def test_incremental_reload_matches_full_etl(csv_server, capsys, chunk_rows):
+    calls = synthetic_data.make_structure_calls(3000, seed=3)
+    csv_server.body = csv_bytes(calls)
+    backend = etl.backend_sender(use_cache=False, chunk_rows=chunk_rows)
+    assert backend.version == 1
+
+    updated, edited, appended = edited_calls(calls)
+    csv_server.body = csv_bytes(updated)
+    capsys.readouterr()
+    assert backend.reload() == 2
+
+    changed = re.search(r"Incremental ETL: (\d+) new or changed calls", capsys.readouterr().out)
+    # Deleted calls may have been among the edited ones.
+    assert changed is not None and appended <= int(changed.group(1)) <= edited + appended
+
+    full = etl.backend_sender(use_cache=False, incremental=False, chunk_rows=chunk_rows)
+    pd.testing.assert_frame_equal(backend.snapshot._df, full.snapshot._df)
+
+def test_unchanged_ids_reuse_previous_rows(csv_server, capsys):
+    calls = synthetic_data.make_structure_calls(1000, seed=4)
+    csv_server.body = csv_bytes(calls)
+    backend = etl.backend_sender(use_cache=False)
+    # Same calls in a different file (an extra column): nothing to re-derive.
+    csv_server.body = csv_bytes(calls.assign(Extra="x"))
+    capsys.readouterr()
+    backend.reload()
+    assert "Incremental ETL: 0 new or changed calls" in capsys.readouterr().out
+
+def test_duplicate_ids_fall_back_to_full_etl(csv_server):
+    calls = synthetic_data.make_structure_calls(500, seed=5)
+    csv_server.body = csv_bytes(calls)
+    backend = etl.backend_sender(use_cache=False)
+    duplicated = pd.concat([calls, calls.iloc[:10]], ignore_index=True)
+    csv_server.body = csv_bytes(duplicated)
+    backend.reload()
+    expected = etl.FetchStructuredData(etl.read_structure_csv(io.StringIO(csv_bytes(duplicated).decode())))
+    pd.testing.assert_frame_equal(backend.snapshot._df, expected.get_structure())
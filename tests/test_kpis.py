@@ -0,0 +1,88 @@
+import numpy as np
+
+from pages import structure_call_data_ELT as etl
+
+# The per-period and get_data() counting the grouped sums replaced, frozen as
+# it was before user-004.
+
+def by_side(frame, price_col, buy_test, sell_test):
+    side = frame["BuySell"].str.upper()
+    return int((((side == "BUY") & buy_test(frame[price_col], frame["Price"])) |
+                ((side == "SELL") & sell_test(frame[price_col], frame["Price"]))).sum())
+
+def above(a, b):
+    return a > b
+
+def below(a, b):
+    return a < b
+
+def equal(a, b):
+    return a == b
+
+def row_wise_period_counts(sub_df):
+    closed = sub_df[sub_df["ExitPrice"].notna()]
+    neither = closed[(closed["TargetHit"] != 1) & (closed["StopLossHit"] != 1)]
+    open_df = sub_df[sub_df["ExitPrice"].isna()]
+    return [
+        len(sub_df), int((sub_df["TargetHit"] == 1).sum()), int((sub_df["StopLossHit"] == 1).sum()),
+        by_side(neither, "ExitPrice", above, below), by_side(neither, "ExitPrice", below, above),
+        by_side(neither, "ExitPrice", equal, equal), len(closed),
+        by_side(open_df, "LastTradedPrice", above, below), by_side(open_df, "LastTradedPrice", below, above),
+        by_side(open_df, "LastTradedPrice", equal, equal), len(open_df),
+    ]
+
+def row_wise_get_data_counts(df):
+    ids = df["StructuredCallEntryID"]
+    neither = (df["TargetHit"] == 0) & (df["StopLossHit"] == 0)
+    is_open = df["Status"] == "Open"
+    buy = df["BuySell"].str.upper() == "BUY"
+    sell = df["BuySell"].str.upper() == "SELL"
+    price, ltp = df["Price"], df["LastTradedPrice"]
+    return [
+        ids.count(),
+        ids[df["TargetHit"] == 1].count(),
+        ids[df["StopLossHit"] == 1].count(),
+        ids[neither & (df["ProfitPriceChange"] > 0)].count(),
+        ids[neither & (df["ProfitPriceChange"] < 0)].count(),
+        ids[neither & (df["ProfitPriceChange"] == 0)].count(),
+        ids[df["Status"] == "Closed"].count(),
+        ids[is_open & ((buy & (price > ltp)) | (sell & (price < ltp)))].count(),
+        ids[is_open & ((buy & (price < ltp)) | (sell & (price > ltp)))].count(),
+        ids[is_open & (price == ltp)].count(),
+        ids[is_open].count(),
+    ]
+
+def test_summarize_kpis_matches_row_wise_periods(uncompacted_structure):
+    df = uncompacted_structure
+    periods = df["InsertionTime"].dt.strftime("%B-%Y")
+    kpis = etl.summarize_kpis(df, periods)
+    expected = {period: row_wise_period_counts(sub_df) for period, sub_df in df.groupby(periods)}
+    assert sorted(kpis.index) == sorted(expected)
+    for period, counts in expected.items():
+        assert kpis.loc[period].tolist() == counts, period
+
+def test_summarize_kpis_by_several_columns(uncompacted_structure):
+    df = uncompacted_structure
+    kpis = etl.summarize_kpis(df, ["UserID", "callType"])
+    for (user, call_type), sub_df in df.groupby(["UserID", "callType"]):
+        assert kpis.loc[(user, call_type)].tolist() == row_wise_period_counts(sub_df)
+
+def test_get_data_indicators_match_row_wise_counts(uncompacted_structure):
+    df = uncompacted_structure
+    for sub_df in [df, df[df["Exchange"] == "MCX"], df.iloc[:0]]:
+        counts = etl.get_data_indicators(sub_df).sum()
+        assert counts.index.tolist() == etl.GET_DATA_ROWS
+        assert counts.to_numpy(dtype=np.int64).tolist() == row_wise_get_data_counts(sub_df)
+
+def test_kpi_percentages():
+    assert etl.kpi_percentages([0] * 11) == ["0%"] + ["0.0%"] * 10
+    assert etl.kpi_percentages([3, 1, 2] + [0] * 8)[:3] == ["100%", "33.3%", "66.7%"]
+
+def test_rank_users(uncompacted_structure):
+    kpis = etl.user_kpis(uncompacted_structure)
+    ranked = etl.rank_users(kpis)
+    assert ranked["TargetHitPct"].is_monotonic_decreasing
+    assert ranked.index.tolist() == etl.rank_users(kpis, by=("TargetHitPct",)).index.tolist()
+    assert ranked.index[:3].tolist() == etl.rank_users(kpis, top_n=3).index.tolist()
+    assert (etl.rank_users(kpis, min_calls=340)["KpiTotal"] >= 340).all()
+    assert etl.LEADERBOARD_ORDER == ["TargetHitPct"]
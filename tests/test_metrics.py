@@ -0,0 +1,55 @@
+import re
+
+import metrics
+
+from test_details_view import detail_tables_request
+
+def scrape(dash_app):
+    response = dash_app.server.test_client().get("/metrics")
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+def series(text, name, callback):
+    match = re.search(rf'^{name}{{callback="{callback}",pid="\d+"}} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+def test_callback_requests_are_counted_as_they_finish(dash_app):
+    before = scrape(dash_app)
+    for period in ["June-2025", "Foo", "March-2025"]:
+        detail_tables_request(dash_app, f"http://x/details?scope=monthly&period={period}")
+    after = scrape(dash_app)
+    for name in ["mis_callback_duration_seconds_count", "mis_callback_response_bytes_count"]:
+        assert series(after, name, "render_detail_tables") == series(before, name, "render_detail_tables") + 3
+    assert series(after, "mis_callback_response_bytes_sum", "render_detail_tables") > 0
+    # A second scrape with no requests in between reports the same numbers.
+    assert series(scrape(dash_app), "mis_callback_duration_seconds_count", "render_detail_tables") == \
+        series(after, "mis_callback_duration_seconds_count", "render_detail_tables")
+
+def test_posts_for_unknown_outputs_count_as_unknown_errors(dash_app):
+    before = series(scrape(dash_app), "mis_callback_errors_total", "unknown")
+    client = dash_app.server.test_client()
+    response = client.post("/_dash-update-component", json={"output": "nope.children", "outputs": {}, "inputs": []})
+    assert response.status_code >= 400
+    assert series(scrape(dash_app), "mis_callback_errors_total", "unknown") == before + 1
+
+def test_observed_requests_need_no_scrape(dash_app):
+    recorder = metrics.DashMetrics(dash_app.app)
+    for seconds in [0.001, 0.2, 30]:
+        recorder.observe("nope.children", seconds, 2_000, 200)
+    recorder.observe("nope.children", 0.2, 2_000, 500)
+    # One request at a time borrows and returns the same shard.
+    assert len(recorder.shards) == 1
+    total = recorder.totals()
+    assert total.latency["unknown"].counts == [1, 0, 0, 0, 0, 2] + [0] * 5 + [1]
+    assert total.sizes["unknown"].sum == 8_000
+    assert total.errors == {"unknown": 1}
+
+def test_requests_finishing_together_get_their_own_shards(dash_app):
+    recorder = metrics.DashMetrics(dash_app.app)
+    recorder.observe("nope.children", 0.01, 100, 200)
+    # A shard still borrowed by another request is not shared.
+    borrowed = recorder.free_shards.pop()
+    recorder.observe("nope.children", 0.01, 100, 200)
+    recorder.free_shards.append(borrowed)
+    assert len(recorder.shards) == 2
+    assert sum(recorder.totals().latency["unknown"].counts) == 2
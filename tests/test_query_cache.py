@@ -0,0 +1,45 @@
+import pandas as pd
+
+from pages import structure_call_data_ELT as etl
+
+def frame(rows):
+    return pd.DataFrame({"a": range(rows), "b": [float(i) for i in range(rows)]})
+
+def test_evicts_least_recently_used_by_bytes():
+    size = etl.approx_bytes(frame(1000))
+    cache = etl.QueryCache(max_entries=100, max_bytes=int(size * 2.5))
+    cache.get(1, "first")
+    for key in ["first", "second"]:
+        cache.put(1, key, frame(1000))
+    assert cache.get(1, "first")[0]
+    cache.put(1, "third", frame(1000))
+    # "first" was used more recently than "second".
+    assert [key for key in cache.entries] == ["first", "third"]
+    assert cache.bytes == 2 * size
+
+def test_result_bigger_than_the_budget_is_not_cached():
+    cache = etl.QueryCache(max_bytes=1000)
+    cache.get(1, "big")
+    cache.put(1, "big", frame(1000))
+    assert cache.get(1, "big") == (False, None)
+    assert cache.bytes == 0
+
+def test_replacing_an_entry_and_a_new_version_keep_bytes_in_step():
+    cache = etl.QueryCache()
+    cache.get(1, "key")
+    cache.put(1, "key", frame(10))
+    cache.put(1, "key", frame(100))
+    assert cache.bytes == etl.approx_bytes(frame(100))
+    assert cache.get(2, "key") == (False, None)
+    assert cache.bytes == 0 and not cache.entries
+
+def test_entry_count_still_bounds_small_results():
+    cache = etl.QueryCache(max_entries=3)
+    cache.get(1, 0)
+    for key in range(5):
+        cache.put(1, key, key)
+    assert list(cache.entries) == [2, 3, 4]
+
+def test_approx_bytes_counts_nested_frames():
+    result = {"counts": [1, 2, 3], "boards": {"overall": frame(1000), "nse": None}}
+    assert etl.approx_bytes(result) > etl.approx_bytes(frame(1000))
@@ -0,0 +1,56 @@
+from pages import structure_call_data_ELT as etl
+
+def test_new_validators_for_unchanged_bytes_are_kept(csv_server, raw_csv):
+    csv_server.body = raw_csv
+    csv_server.headers = {"ETag": '"v1"', "Last-Modified": "Mon, 06 Oct 2025 10:00:00 GMT"}
+    backend = etl.backend_sender(use_cache=False)
+    assert backend.version == 1
+
+    # The server re-stamps the same file.
+    csv_server.headers = {"ETag": '"v2"', "Last-Modified": "Tue, 07 Oct 2025 10:00:00 GMT"}
+    assert backend.reload() == 1
+    assert csv_server.requests[-1]["If-None-Match"] == '"v1"'
+
+    # The next check is conditional on the new validators and gets a 304.
+    assert backend.reload() == 1
+    assert csv_server.requests[-1] == {"If-None-Match": '"v2"', "If-Modified-Since": "Tue, 07 Oct 2025 10:00:00 GMT"}
+
+def test_changed_bytes_publish_a_new_snapshot(csv_server, raw_csv):
+    csv_server.body = raw_csv
+    csv_server.headers = {"ETag": '"v1"'}
+    backend = etl.backend_sender(use_cache=False)
+    first = backend.snapshot
+
+    lines = raw_csv.decode().splitlines(keepends=True)
+    csv_server.body = "".join(lines[:-100]).encode()
+    csv_server.headers = {"ETag": '"v2"'}
+    assert backend.reload() == 2
+    assert len(backend.snapshot._df) < len(first._df)
+    # Readers holding the old snapshot keep their data.
+    assert first.version == 1 and len(first._df) > len(backend.snapshot._df)
+
+def test_failed_download_keeps_the_loaded_data(csv_server, raw_csv, monkeypatch):
+    csv_server.body = raw_csv
+    backend = etl.backend_sender(use_cache=False)
+    def fail(*args, **kwargs):
+        raise etl.requests.ConnectionError("offline")
+    monkeypatch.setattr(etl.requests, "get", fail)
+    assert backend.reload() == 1
+    assert not backend.df.empty
+
+def test_publish_callbacks_run_after_the_reload_lock_is_released(csv_server, raw_csv):
+    csv_server.body = raw_csv
+    backend = etl.backend_sender(use_cache=False)
+    seen = []
+    def on_publish(version):
+        free = backend._reload_lock.acquire(blocking=False)
+        if free:
+            backend._reload_lock.release()
+        seen.append((version, free))
+    backend.on_publish.append(on_publish)
+
+    csv_server.body = raw_csv + raw_csv.splitlines(keepends=True)[-1]
+    assert backend.reload() == 2
+    # An unchanged file publishes nothing.
+    assert backend.reload() == 2
+    assert seen == [(2, True)]
@@ -0,0 +1,45 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from pages import structure_call_data_ELT as etl
+
+def test_typed_read_keeps_only_schema_columns(raw_calls):
+    assert list(raw_calls.columns) == [col for col in raw_calls.columns if col in etl.STRUCTURE_SCHEMA]
+    assert "RRRValue" not in raw_calls.columns and "Attachment" not in raw_calls.columns
+    assert str(raw_calls["UserID"].dtype) == "Int64"
+    assert raw_calls["Price"].dtype == np.float64
+
+def test_typed_read_gives_the_same_etl_output_as_an_untyped_read(raw_csv, structure):
+    # The pre-schema load: every column, dtypes inferred, timestamps parsed
+    # day-first. The ETL output must not depend on which one fed it.
+    untyped = etl.FetchStructuredData(pd.read_csv(io.StringIO(raw_csv.decode()))).get_structure()
+    pd.testing.assert_frame_equal(untyped, structure, check_dtype=False, check_categorical=False)
+
+def test_parse_timestamps_fixed_format():
+    values = pd.Series(["04-03-2025 10:15:00", "31-12-2024 23:59:59", None, "31-02-2025 10:00:00", "2025-03-04"])
+    parsed = etl.parse_timestamps(values, "InsertionTime")
+    assert parsed.iloc[0] == pd.Timestamp("2025-03-04 10:15:00")
+    assert parsed.iloc[1] == pd.Timestamp("2024-12-31 23:59:59")
+    # Missing, impossible (31 February) and other layouts are left empty.
+    assert parsed.iloc[2:].isna().all()
+
+def test_parse_timestamps_infers_a_different_layout(capsys):
+    values = pd.Series(["04/03/2025 10:15", "31/12/2025 08:00"])
+    parsed = etl.parse_timestamps(values, "InsertionTime")
+    assert parsed.tolist() == [pd.Timestamp("2025-03-04 10:15:00"), pd.Timestamp("2025-12-31 08:00:00")]
+    assert "inferring the format" in capsys.readouterr().out
+
+def test_values_that_do_not_fit_are_left_empty(raw_csv, raw_calls, capsys):
+    raw = pd.read_csv(io.StringIO(raw_csv.decode()))
+    raw["UserID"] = raw["UserID"].astype(object)
+    raw.loc[10, "UserID"] = "12.5"
+    raw["StopLoss"] = raw["StopLoss"].astype(object)
+    raw.loc[20, "StopLoss"] = "abc"
+    calls = etl.read_structure_csv(io.StringIO(raw.to_csv(index=False)))
+    assert pd.isna(calls.loc[10, "UserID"]) and pd.isna(calls.loc[20, "StopLoss"])
+    unchanged = ~calls.index.isin([10, 20])
+    pd.testing.assert_frame_equal(calls[unchanged], raw_calls[unchanged])
+    out = capsys.readouterr().out
+    assert "UserID: 1 values do not fit Int64" in out and "StopLoss: 1 values do not fit float64" in out
@@ -0,0 +1,60 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from pages import structure_call_data_ELT as etl
+
+pytestmark = pytest.mark.skipif(int(pd.__version__.split(".")[0]) < 3,
+                                reason="snapshot isolation relies on Copy-on-Write, the default from pandas 3")
+
+def make_backend(df):
+    backend = etl.backend_sender.__new__(etl.backend_sender)
+    backend.snapshot = etl.DataSnapshot(df, 1)
+    backend.query_cache = etl.QueryCache()
+    backend.columns = etl.GET_DATA_ROWS
+    return backend
+
+def test_reader_writes_stay_with_the_reader(structure):
+    backend = make_backend(structure)
+    before = structure.copy(deep=True)
+    counts = backend.get_data("2025-01-01", "2025-06-30")
+
+    frame = backend.df
+    frame["Price"] = 0.0
+    frame.loc[frame.index[:100], "Status"] = "Open"
+    frame["New"] = 1
+    calls = backend.filter_calls("2025-01-01 10:00", "2025-03-01", ["NSE"], None)
+    calls.loc[calls.index[:50], "LastTradedPrice"] = 1.0
+    cells = backend.snapshot.cube.select()
+    cells["KpiTotal"] = 0
+    with pytest.raises(ValueError):
+        backend.df["Price"].to_numpy()[0] = 1
+
+    pd.testing.assert_frame_equal(backend.df, before)
+    backend.query_cache.clear()
+    pd.testing.assert_frame_equal(backend.get_data("2025-01-01", "2025-06-30"), counts)
+
+def test_readers_during_snapshot_swaps(structure):
+    backend = make_backend(structure)
+    users = [str(user) for user in backend.user_id_sender()[:3]]
+    expected = {user: backend.get_data_filter_id(user, "2025-01-01", "2025-12-31") for user in users}
+    errors = []
+    def reader():
+        try:
+            for i in range(20):
+                user = users[i % len(users)]
+                pd.testing.assert_frame_equal(backend.get_data_filter_id(user, "2025-01-01", "2025-12-31"), expected[user])
+                frame = backend.df
+                frame["x"] = i
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=reader) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for _ in range(10):
+        backend.snapshot = etl.DataSnapshot(structure, backend.version + 1)
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert "x" not in backend.df.columns
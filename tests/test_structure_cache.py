@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from pages import structure_call_data_ELT as etl
+
+pytestmark = pytest.mark.skipif(etl.pa is None, reason="the structure cache needs pyarrow")
+
+def test_round_trip_keeps_frame_and_row_hashes(tmp_path, structure):
+    cache = etl.StructureCache(str(tmp_path))
+    row_hashes = pd.Series(range(len(structure)), index=structure["StructuredCallEntryID"].to_numpy(), dtype="uint64")
+    cache.save("abc", structure, row_hashes)
+
+    df, hashes = cache.load("abc")
+    pd.testing.assert_frame_equal(df, structure)
+    pd.testing.assert_series_equal(hashes, row_hashes, check_names=False, check_index_type=False)
+    assert cache.load("other") is None
+
+def test_save_keeps_only_the_latest_fingerprint(tmp_path, structure):
+    cache = etl.StructureCache(str(tmp_path))
+    cache.save("old", structure.head(10))
+    cache.save("new", structure.head(20))
+    assert cache.load("old") is None
+    assert len(cache.load("new")[0]) == 20
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["structure-new.arrow"]
+
+def test_etl_code_version_is_part_of_the_fingerprint(monkeypatch):
+    before = etl.StructureCache.fingerprint(b"same bytes")
+    monkeypatch.setattr(etl, "ETL_CODE_VERSION", "0" * 16)
+    assert etl.StructureCache.fingerprint(b"same bytes") != before
+
+def test_warm_start_skips_etl_until_code_version_changes(tmp_path, monkeypatch, csv_server, raw_csv, capsys):
+    class TmpCache(etl.StructureCache):
+        def __init__(self):
+            super().__init__(str(tmp_path))
+    monkeypatch.setattr(etl, "StructureCache", TmpCache)
+    csv_server.body = raw_csv
+    cold = etl.backend_sender(chunk_rows=0)
+    assert "from cache" not in capsys.readouterr().out
+
+    warm = etl.backend_sender(chunk_rows=0)
+    assert "Loaded cleaned data from cache" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(warm.snapshot._df, cold.snapshot._df)
+
+    # An edit to the ETL module bumps ETL_CODE_VERSION: the cache is stale.
+    monkeypatch.setattr(etl, "ETL_CODE_VERSION", "0" * 16)
+    rebuilt = etl.backend_sender(chunk_rows=0)
+    assert "from cache" not in capsys.readouterr().out
+    pd.testing.assert_frame_equal(rebuilt.snapshot._df, cold.snapshot._df)